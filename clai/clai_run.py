@@ -8,7 +8,10 @@
 import errno
 import socket
 
+from clai.datasource.server_status_datasource import current_status_datasource
 from clai.server.clai_server import ClaiServer
+from clai.server.logger import current_logger as logger
+from clai.server.unix_socket_server_connector import UnixSocketServerConnector
 from clai.server.web_socket_server_connector import WebSocketServerConnector
 
 START_DIRECTIVE = 'start'
@@ -34,8 +37,11 @@ def is_port_busy(host, port, reconnect):
 
 
 def create_server_socket(host, port, websocket):
+    logger.start()
     if websocket:
         server = ClaiServer(connector=WebSocketServerConnector())
+    elif hasattr(socket, 'AF_UNIX'):
+        server = ClaiServer(connector=UnixSocketServerConnector(current_status_datasource))
     else:
         server = ClaiServer()
 
@@ -5,12 +5,12 @@
 # of this source tree for licensing information.
 #
 
-import multiprocessing as mp
 from typing import Optional, List, Union
 
-import requests
 from clai.remote_storage.model_api import TerminalReplayMemoryApi, StateApi, RecordToSendApi
 
+from clai.datasource.telemetry_dispatcher import telemetry_dispatcher
+from clai.datasource.telemetry_uploader import TelemetryUploader
 from clai.server.agent_datasource import AgentDatasource
 from clai.server.command_message import TerminalReplayMemory, Action, State
 from clai.server.logger import current_logger as logger
@@ -24,10 +24,7 @@ URL_SERVER = "https://service.us.apiconnect.ibmcloud.com/gws/apigateway/api/" \
 class ActionRemoteStorage:
     _instance = None
 
-    manager = None
-    queue = None
-    consumer_task = None
-    pool = None
+    uploader = None
     report_enable = None
     anonymizer = None
 
@@ -38,41 +35,30 @@ class ActionRemoteStorage:
         return cls._instance
 
     def init(self):
-        self.manager = mp.Manager()
-        self.queue = self.manager.Queue()
-        self.consumer_task = None
-        self.pool = mp.Pool(1)
+        self.uploader = None
         self.report_enable = False
         self.anonymizer = Anonymizer()
 
-    @staticmethod
-    def consumer(queue):
-        while True:
-            data = queue.get()
-
-            if data is None:
-                break
-
-            logger.info(f"consume: {data}")
-            headers = {'Content-type': 'application/json'}
-            response = requests.post(url=URL_SERVER, data=data, headers=headers)
-            logger.info(f"[Sent] {response.status_code} message {response.text}")
-            queue.task_done()
-        logger.info("----STOP CONSUMING-----")
-
     def start(self, agent_datasource: AgentDatasource):
         logger.info(f"-Start sender-")
         self.report_enable = agent_datasource.get_report_enable()
-        if self.report_enable:
-            self.consumer_task = self.pool.map_async(self.consumer, (self.queue,))
+        if self.report_enable and self.uploader is None:
+            self.uploader = TelemetryUploader(URL_SERVER)
 
     def wait(self):
-        if self.report_enable:
-            self.queue.put(None)
-            self.consumer_task.wait(timeout=3)
+        if self.uploader is not None:
+            self.uploader.close()
+            self.uploader = None
 
     def store(self, message: TerminalReplayMemory):
-        if not self.report_enable:
+        if not self.report_enable or self.uploader is None:
+            return
+
+        telemetry_dispatcher.dispatch(self.__send, message)
+
+    def __send(self, message: TerminalReplayMemory):
+        uploader = self.uploader
+        if uploader is None:
             return
 
         try:
@@ -85,12 +71,12 @@ class ActionRemoteStorage:
                 suggested_command=self.__parse_actions__(message.suggested_command),
             )
 
-            logger.info(f"store -> {message.command.command_id}")
+            logger.debug("store -> %s", message.command.command_id)
 
             message_to_send = RecordToSendApi(
                 bashbot_info=message_as_json
             )
-            self.queue.put(message_to_send.json())
+            uploader.submit(message_to_send.json())
         # pylint: disable=broad-except
         except Exception as err:
             logger.info(f"error sending: {err}")
@@ -5,18 +5,37 @@
 # of this source tree for licensing information.
 #
 
+import atexit
 import json
 import os
-from typing import List, Optional
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
 
 import clai.datasource
 from clai.datasource.model.plugin_config import PluginConfig, PluginConfigJson
 
 
 class ConfigStorage:
+    """
+    Keeps configPlugins.json in memory. The file is parsed again only when its
+    mtime or size change (checked at most every CHANGE_CHECK_INTERVAL seconds),
+    and the changes are written WRITE_DELAY seconds later in a single atomic
+    replace of the file, or at exit.
+    """
+    CHANGE_CHECK_INTERVAL = 1
+    WRITE_DELAY = 0.5
 
     def __init__(self, alternate_path: Optional[str] = None):
         self.alternate_path = alternate_path
+        self.__config: Optional[PluginConfigJson] = None
+        self.__signature: Optional[Tuple[int, int]] = None
+        self.__last_check = 0.0
+        self.__dirty = False
+        self.__write_timer: Optional[threading.Timer] = None
+        self.__lock = threading.RLock()
+        atexit.register(self.flush)
 
     def get_config_path(self):
         if self.alternate_path:
@@ -27,6 +46,32 @@ class ConfigStorage:
         return filename
 
     def read_all_user_config(self) -> PluginConfigJson:
+        with self.__lock:
+            if self.__config is None or self.__has_changed():
+                self.__config = self.__read_file()
+            return self.__config.copy(deep=True)
+
+    def __has_changed(self) -> bool:
+        if self.__dirty:
+            return False
+
+        now = time.monotonic()
+        if now - self.__last_check < self.CHANGE_CHECK_INTERVAL:
+            return False
+
+        self.__last_check = now
+        return self.__file_signature() != self.__signature
+
+    def __file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.get_config_path())
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def __read_file(self) -> PluginConfigJson:
+        self.__signature = self.__file_signature()
+        self.__last_check = time.monotonic()
         with open(self.get_config_path(), "r") as json_file:
             loaded = json.load(json_file)
             config_for_all_users = PluginConfigJson(**loaded)
@@ -49,20 +94,50 @@ class ConfigStorage:
             default_orchestrator=config_for_all_users.default_orchestrator,
             installed=config_for_all_users.installed,
             report_enable=config_for_all_users.report_enable,
-            user_install=config_for_all_users.user_install
+            user_install=config_for_all_users.user_install,
+            shadow_orchestrators=config_for_all_users.shadow_orchestrators
         )
 
     def store_config(self, config: PluginConfig, user_name: str = None):
-        current_config = self.read_all_user_config()
-        with open(self.get_config_path(), 'w') as json_file:
+        with self.__lock:
+            current_config = self.read_all_user_config()
             if user_name:
-                current_config.selected[user_name] = config.selected
-            current_config.installed = config.installed
+                current_config.selected[user_name] = list(config.selected)
+            current_config.installed = list(config.installed)
             current_config.report_enable = config.report_enable
             current_config.orchestrator = config.orchestrator
             current_config.user_install = config.user_install
-            json_as_string = str(current_config.json())
-            json_file.write(json_as_string)
+            self.__config = current_config
+            self.__dirty = True
+            if self.__write_timer is None:
+                self.__write_timer = threading.Timer(self.WRITE_DELAY, self.flush)
+                self.__write_timer.daemon = True
+                self.__write_timer.start()
+
+    def flush(self):
+        with self.__lock:
+            if self.__write_timer is not None:
+                self.__write_timer.cancel()
+                self.__write_timer = None
+            if not self.__dirty:
+                return
+
+            config_path = self.get_config_path()
+            file_descriptor, temporal_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(config_path)), prefix='.configPlugins')
+            try:
+                with os.fdopen(file_descriptor, 'w') as json_file:
+                    json_file.write(str(self.__config.json()))
+                if os.path.exists(config_path):
+                    os.chmod(temporal_path, os.stat(config_path).st_mode)
+                os.replace(temporal_path, config_path)
+            except OSError:
+                if os.path.exists(temporal_path):
+                    os.unlink(temporal_path)
+                raise
+
+            self.__dirty = False
+            self.__signature = self.__file_signature()
 
     def load_installed(self) -> List[str]:
         current_config = self.read_all_user_config()
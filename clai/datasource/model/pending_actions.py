@@ -5,6 +5,7 @@
 # of this source tree for licensing information.
 #
 
+import time
 from typing import List, Optional
 
 from clai.server.command_message import Action
@@ -15,6 +16,7 @@ class PendingActions:
         self.command_id = command_id
         self.current_action = 0
         self.pending_actions = pending_actions
+        self.stored_at = time.monotonic()
 
     def next(self) -> Optional[Action]:
         if self.current_action >= len(self.pending_actions):
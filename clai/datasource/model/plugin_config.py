@@ -19,7 +19,8 @@ class PluginConfig:
                  installed: List[str] = [],
                  report_enable: bool = False,
                  default_orchestrator: str = "",
-                 user_install: bool = False):
+                 user_install: bool = False,
+                 shadow_orchestrators: List[str] = []):
         self.selected = selected
         self.default = default
         self.installed = installed
@@ -27,6 +28,7 @@ class PluginConfig:
         self.default_orchestrator = default_orchestrator
         self.orchestrator = orchestrator
         self.user_install = user_install
+        self.shadow_orchestrators = shadow_orchestrators
 
 
 class PluginConfigJson(BaseModel):
@@ -37,3 +39,4 @@ class PluginConfigJson(BaseModel):
     report_enable: bool = False
     orchestrator: Optional[str] = None
     user_install: bool = False
+    shadow_orchestrators: List[str] = []
@@ -5,27 +5,60 @@
 # of this source tree for licensing information.
 #
 
-from typing import Dict, List
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
 from clai.datasource.model.pending_actions import PendingActions
 from clai.server.command_message import Action
 
 
 class ServerPendingActionsDatasource:
-    def __init__(self):
-        self.__pending_actions: Dict[str, List[PendingActions]] = {}
+    """
+    Actions still to be returned for the commands of every user, by command_id.
+    The commands whose actions were all returned are removed, and so are the
+    oldest ones after max_commands or once they are older than ttl seconds.
+    """
+    MAX_COMMANDS_BY_USER = 50
+    TTL = 3600
 
-    def store_pending_actions(self, command_id: str, actions: List[Action], user_name: str) -> Action:
+    def __init__(self, max_commands: int = MAX_COMMANDS_BY_USER, ttl: float = TTL):
+        self.max_commands = max_commands
+        self.ttl = ttl
+        self.__pending_actions: Dict[str, 'OrderedDict[str, PendingActions]'] = {}
+
+    def store_pending_actions(self, command_id: str, actions: List[Action], user_name: str) -> Optional[Action]:
         actions_by_user = self.__find_pending_actions_by_user(user_name)
-        actions_by_user.append(PendingActions(command_id, actions))
+        actions_by_user.pop(command_id, None)
+        actions_by_user[command_id] = PendingActions(command_id, actions)
+        while len(actions_by_user) > self.max_commands:
+            actions_by_user.popitem(last=False)
         return self.get_next_action(command_id, user_name)
 
-    def get_next_action(self, command_id: str, user_name: str) -> Action:
+    def get_next_action(self, command_id: str, user_name: str) -> Optional[Action]:
         actions_by_user = self.__find_pending_actions_by_user(user_name)
-        pending_actions = next(filter(lambda x: x.command_id == command_id, actions_by_user), None)
-        return pending_actions.next()
+        pending_actions = actions_by_user.get(command_id)
+        if pending_actions is None:
+            return None
+
+        action = pending_actions.next()
+        if action is None or not action.pending_actions:
+            del actions_by_user[command_id]
+        if not actions_by_user:
+            del self.__pending_actions[user_name]
+        return action
 
-    def __find_pending_actions_by_user(self, user_name: str) -> List[PendingActions]:
+    def __find_pending_actions_by_user(self, user_name: str) -> 'OrderedDict[str, PendingActions]':
         if user_name not in self.__pending_actions:
-            self.__pending_actions[user_name] = []
-        return self.__pending_actions[user_name]
+            self.__pending_actions[user_name] = OrderedDict()
+        actions_by_user = self.__pending_actions[user_name]
+        self.__remove_expired(actions_by_user)
+        return actions_by_user
+
+    def __remove_expired(self, actions_by_user: 'OrderedDict[str, PendingActions]'):
+        expired_before = time.monotonic() - self.ttl
+        while actions_by_user:
+            oldest = next(iter(actions_by_user.values()))
+            if oldest.stored_at > expired_before:
+                return
+            actions_by_user.popitem(last=False)
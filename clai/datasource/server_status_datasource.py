@@ -5,25 +5,56 @@
 # of this source tree for licensing information.
 #
 
+import os
 from collections import deque
 from typing import Optional, Dict
 
 from clai.server.command_message import State
 
+HISTORY_DEPTH = int(os.getenv('CLAI_HISTORY_DEPTH', '50'))
+
+
+class MessagesByUser:
+    """
+    last messages of a user in order, indexed by command_id. The previous_execution
+    chain of the messages ends at the oldest message kept, so the history of a user
+    never holds more than depth messages.
+    """
+
+    def __init__(self, depth: int):
+        self.messages: deque = deque(maxlen=depth)
+        self.index: Dict[str, State] = {}
+
+    def append(self, message: State):
+        evicted = None
+        if len(self.messages) == self.messages.maxlen:
+            evicted = self.messages[0]
+            if self.index.get(evicted.command_id) is evicted:
+                del self.index[evicted.command_id]
+
+        self.messages.append(message)
+        self.index[message.command_id] = message
+        if evicted is not None and self.messages:
+            self.messages[0].previous_execution = None
+
+    def find(self, command_id: str) -> Optional[State]:
+        return self.index.get(command_id)
+
 
 class ServerStatusDatasource:
-    def __init__(self):
+    def __init__(self, history_depth: int = HISTORY_DEPTH):
         self.__power = False
-        self.__messages_store: Dict[str, deque] = {}
+        self.__messages_store: Dict[str, MessagesByUser] = {}
+        self.history_depth = history_depth
         self.running = False
 
     def __store_info_by_user(self, message: State, user_name: str):
         messages_by_user = self.__find_messages_by_user(user_name)
         messages_by_user.append(message)
 
-    def __find_messages_by_user(self, user_name: str):
+    def __find_messages_by_user(self, user_name: str) -> MessagesByUser:
         if user_name not in self.__messages_store:
-            self.__messages_store[user_name] = deque(maxlen=50)
+            self.__messages_store[user_name] = MessagesByUser(self.history_depth)
         return self.__messages_store[user_name]
 
     def set_power(self, power: bool):
@@ -33,11 +64,11 @@ class ServerStatusDatasource:
         return self.__power
 
     def get_last_messages(self, user_name: str):
-        return self.__find_messages_by_user(user_name)
+        return self.__find_messages_by_user(user_name).messages
 
     def get_last_message(self, user_name: str, offset: int = 0) -> State:
         last_message = None
-        messages_by_user = self.__find_messages_by_user(user_name)
+        messages_by_user = self.__find_messages_by_user(user_name).messages
         if messages_by_user and len(messages_by_user) > 1 + offset:
             last_message = messages_by_user[-2 - offset]
         return last_message
@@ -52,8 +83,7 @@ class ServerStatusDatasource:
         return message
 
     def find_message_stored(self, id_to_find: str, user_mame: str) -> Optional[State]:
-        messages_by_user = self.__find_messages_by_user(user_mame)
-        return next(filter(lambda x: x.command_id == id_to_find, messages_by_user), None)
+        return self.__find_messages_by_user(user_mame).find(id_to_find)
 
 
 # pylint: disable= invalid-name
@@ -5,11 +5,10 @@
 # of this source tree for licensing information.
 #
 
-import multiprocessing as mp
-
 import amplitude
 
 from clai.datasource.model.stat_event import StatEvent
+from clai.datasource.telemetry_dispatcher import telemetry_dispatcher
 from clai.server.agent_datasource import AgentDatasource
 from clai.server.logger import current_logger as logger
 from clai.tools.anonymizer import Anonymizer
@@ -29,102 +28,76 @@ def __send_event__(event: StatEvent):
 
 
 class StatsTracker:
+    """
+    Usage events of the skills. With sync the events are sent right away (for
+    the installer), otherwise they are sent by the telemetry dispatcher. Nothing
+    is anonymized or sent when the reporting is disabled.
+    """
     _instance = None
 
-    manager = None
-    queue = None
-    pool = None
-    consumer_stats = None
+    sync = None
     anonymizer = None
     report_enable = None
 
-    def __new__(cls, sync=False, anonymizer: Anonymizer = Anonymizer()):
+    def __new__(cls, sync=False, anonymizer: Anonymizer = None):
         if cls._instance is None:
             cls._instance = super(StatsTracker, cls).__new__(cls)
-            cls._instance.init(sync, anonymizer)
+            cls._instance.init(sync, anonymizer or Anonymizer())
         return cls._instance
 
     def init(self, sync, anonymizer):
-        if not sync:
-            self.manager = mp.Manager()
-            self.queue = self.manager.Queue()
-            self.pool = mp.Pool(1)
-            self.consumer_stats = None
-
+        self.sync = sync
         self.anonymizer = anonymizer
         self.report_enable = False
 
-    @staticmethod
-    def consumer(queue):
-        while True:
-            event = queue.get()
-
-            if event is None:
-                break
-
-            logger.info(f"send_event: {event}")
-            __send_event__(event)
-            queue.task_done()
-        logger.info("----STOP CONSUMING-----")
-
     def start(self, agent_datasource: AgentDatasource):
         logger.info(f"-Start tracker-")
         self.report_enable = agent_datasource.get_report_enable()
-        if self.report_enable:
-            self.consumer_stats = self.pool.map_async(self.consumer, (self.queue,))
-
-    def wait(self):
-        if self.report_enable:
-            self.__store__(None)
-            self.consumer_stats.wait(timeout=3)
 
     def log_activate_skills(self, user: str, skill_name: str):
-        event = StatEvent(
+        self.__store__(StatEvent(
             event_type="activate",
-            user=self.anonymizer.anonymize(user),
+            user=user,
             data={"skill": f"{skill_name}"}
-        )
-        self.__store__(event)
+        ))
 
     def log_deactivate_skills(self, user: str, skill_name: str):
-        event = StatEvent(
+        self.__store__(StatEvent(
             event_type="deactivate",
-            user=self.anonymizer.anonymize(user),
+            user=user,
             data={"skill": f"{skill_name}"}
-        )
-        self.__store__(event)
+        ))
 
     def log_install(self, user: str):
         if not self.report_enable:
             return
 
-        event = StatEvent(
+        self.__send__(StatEvent(
             event_type="install",
-            user=self.anonymizer.anonymize(user),
+            user=user,
             data={}
-        )
-
-        __send_event__(event)
+        ))
 
     def log_uninstall(self, user: str):
         if not self.report_enable:
             return
 
-        event = StatEvent(
+        self.__send__(StatEvent(
             event_type="uninstall",
-            user=self.anonymizer.anonymize(user),
+            user=user,
             data={}
-        )
-
-        __send_event__(event)
+        ))
 
     def __store__(self, event: StatEvent):
         if not self.report_enable:
             return
 
-        try:
-            logger.info(f"record stats -> {event}")
-            self.queue.put(event)
-        # pylint: disable=broad-except
-        except Exception as err:
-            logger.info(f"error sending: {err}")
+        if self.sync:
+            self.__send__(event)
+        else:
+            telemetry_dispatcher.dispatch(self.__send__, event)
+
+    def __send__(self, event: StatEvent):
+        event.user = self.anonymizer.anonymize(event.user)
+        logger.info(f"send_event: {event.event_type}")
+        __send_event__(event)
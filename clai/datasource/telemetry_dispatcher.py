@@ -0,0 +1,86 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import queue
+import threading
+from typing import Any, Callable
+
+from clai.server.logger import current_logger as logger
+
+
+class TelemetryDispatcher:
+    """
+    Background thread shared by the telemetry sinks (the usage stats and the
+    replay records). The events are handed to their sink in the order they were
+    dispatched, and the thread is only started with the first event, so nothing
+    runs when the reporting is disabled. When the queue is full the new events
+    are dropped. The server closes it once on shutdown, the events already queued
+    are delivered before the thread stops.
+    """
+    QUEUE_SIZE = 1000
+
+    def __init__(self):
+        self.__events = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.__thread = None
+        self.__stop = None
+        self.__lock = threading.Lock()
+
+    def dispatch(self, sink: Callable[[Any], None], event: Any):
+        self.__start()
+        try:
+            self.__events.put_nowait((sink, event))
+        except queue.Full:
+            logger.info("telemetry dispatcher is behind, event dropped")
+
+    def running(self) -> bool:
+        return self.__thread is not None
+
+    def wait(self):
+        """blocks until the events dispatched are delivered to their sink"""
+        self.__events.join()
+
+    def close(self, timeout: float = 3):
+        """stops the thread once the events queued are delivered, waiting at most timeout seconds"""
+        with self.__lock:
+            thread = self.__thread
+            if thread is None:
+                return
+            self.__thread = None
+            self.__stop.set()
+            try:
+                self.__events.put_nowait((None, None))
+            except queue.Full:
+                logger.info("telemetry dispatcher is behind, it stops once the queue is drained")
+
+        thread.join(timeout)
+
+    def __start(self):
+        with self.__lock:
+            if self.__thread is None:
+                self.__stop = threading.Event()
+                self.__thread = threading.Thread(target=self.__loop, args=(self.__stop,),
+                                                 name='telemetry-dispatcher', daemon=True)
+                self.__thread.start()
+
+    def __loop(self, stop: threading.Event):
+        while True:
+            sink, event = self.__events.get()
+            try:
+                if sink is None:
+                    return
+                sink(event)
+            # pylint: disable=broad-except
+            except Exception as err:
+                logger.info(f"error delivering telemetry: {err}")
+            finally:
+                self.__events.task_done()
+            if stop.is_set() and self.__events.empty():
+                return
+
+
+# pylint: disable= invalid-name
+telemetry_dispatcher = TelemetryDispatcher()
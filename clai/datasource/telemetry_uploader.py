@@ -0,0 +1,220 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import gzip
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+import requests
+
+from clai.server.command_message import BASEDIR
+from clai.server.logger import current_logger as logger
+
+SPOOL_DIR = os.path.join(BASEDIR, 'telemetry_spool')
+HEADERS = {'Content-type': 'application/json', 'Content-Encoding': 'gzip'}
+
+
+# pylint: disable=too-many-instance-attributes
+class TelemetryUploader:
+    """
+    Sends json records to the telemetry endpoint from a background thread. The
+    records are sent as a gzip compressed json list once BATCH_SIZE records or
+    BATCH_BYTES are waiting, or every FLUSH_INTERVAL seconds, through a keep
+    alive session.
+
+    When the endpoint can't be reached the batches are written to a spool folder
+    of up to MAX_SPOOL_BYTES, dropping the oldest ones, and the endpoint is tried
+    again with an exponential backoff between BACKOFF_MIN and BACKOFF_MAX seconds.
+    The spooled batches are sent first once it answers. No more than MAX_PENDING
+    records wait in memory, the oldest are dropped if the endpoint is too slow.
+    """
+    BATCH_SIZE = 50
+    BATCH_BYTES = 256 * 1024
+    FLUSH_INTERVAL = 10
+    MAX_PENDING = 1000
+    MAX_SPOOL_BYTES = 10 * 1024 * 1024
+    TIMEOUT = 10
+    BACKOFF_MIN = 1
+    BACKOFF_MAX = 300
+
+    def __init__(self, url: str, spool_dir: str = SPOOL_DIR):
+        self.url = url
+        self.spool_dir = spool_dir
+        self.dropped = 0
+        self.__pending: Deque[str] = deque()
+        self.__pending_bytes = 0
+        self.__condition = threading.Condition()
+        self.__flush_requested = False
+        self.__stopping = False
+        self.__sending = False
+        self.__thread = None
+        self.__session = None
+        self.__backoff = 0
+        self.__retry_at = 0.0
+        self.__spool_lock = threading.Lock()
+        self.__spooled = 0
+
+    def submit(self, record: str):
+        with self.__condition:
+            if self.__stopping:
+                return
+
+            if len(self.__pending) >= self.MAX_PENDING:
+                self.__pending_bytes -= len(self.__pending.popleft())
+                self.dropped += 1
+            self.__pending.append(record)
+            self.__pending_bytes += len(record)
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, name='telemetry-uploader', daemon=True)
+                self.__thread.start()
+            if self.__batch_ready():
+                self.__condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """sends or spools the records received, returns False if it takes longer than timeout"""
+        with self.__condition:
+            if self.__thread is None:
+                return True
+            self.__flush_requested = True
+            self.__condition.notify_all()
+            return self.__condition.wait_for(lambda: not self.__pending and not self.__sending, timeout)
+
+    def close(self, timeout: float = 3):
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+            thread = self.__thread
+
+        if thread is not None:
+            thread.join(timeout)
+
+        with self.__condition:
+            pending = list(self.__pending)
+            self.__pending.clear()
+            self.__pending_bytes = 0
+
+        # the thread may still be spooling if it did not stop in time
+        if pending:
+            self.__spool(self.__encode(pending))
+
+    def __batch_ready(self) -> bool:
+        return self.__stopping or (bool(self.__pending) and (self.__flush_requested
+                                                             or len(self.__pending) >= self.BATCH_SIZE
+                                                             or self.__pending_bytes >= self.BATCH_BYTES))
+
+    def __take_batch(self) -> List[str]:
+        batch = []
+        batch_bytes = 0
+        while self.__pending and len(batch) < self.BATCH_SIZE and batch_bytes < self.BATCH_BYTES:
+            record = self.__pending.popleft()
+            self.__pending_bytes -= len(record)
+            batch_bytes += len(record)
+            batch.append(record)
+
+        if not self.__pending:
+            self.__flush_requested = False
+        return batch
+
+    def __loop(self):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(self.__batch_ready, timeout=self.FLUSH_INTERVAL)
+                batch = self.__take_batch()
+                if self.__stopping and not batch:
+                    return
+                self.__sending = True
+
+            try:
+                # the spooled batches are older, they are sent first
+                self.__send_spooled()
+                if batch:
+                    self.__deliver(self.__encode(batch))
+            # pylint: disable=broad-except
+            except Exception as err:
+                logger.info(f"error uploading telemetry: {err}")
+            finally:
+                with self.__condition:
+                    self.__sending = False
+                    self.__condition.notify_all()
+
+    @staticmethod
+    def __encode(batch: List[str]) -> bytes:
+        return gzip.compress(('[' + ','.join(batch) + ']').encode('utf8'))
+
+    def __deliver(self, body: bytes):
+        if self.__waiting_backoff() or not self.__post(body):
+            self.__spool(body)
+
+    def __waiting_backoff(self) -> bool:
+        return time.monotonic() < self.__retry_at
+
+    def __post(self, body: bytes) -> bool:
+        """True when the endpoint took the batch, or rejected it and it must not be sent again"""
+        try:
+            if self.__session is None:
+                self.__session = requests.Session()
+            response = self.__session.post(url=self.url, data=body, headers=HEADERS, timeout=self.TIMEOUT)
+            if response.status_code < 500 and response.status_code != 429:
+                if response.status_code >= 400:
+                    logger.info(f"telemetry batch rejected: {response.status_code}")
+                self.__backoff = 0
+                return True
+            logger.info(f"telemetry endpoint unavailable: {response.status_code}")
+        except requests.RequestException as err:
+            logger.info(f"telemetry endpoint unreachable: {err}")
+
+        self.__backoff = min(max(self.__backoff * 2, self.BACKOFF_MIN), self.BACKOFF_MAX)
+        self.__retry_at = time.monotonic() + self.__backoff
+        return False
+
+    def spooled_files(self) -> List[str]:
+        if not os.path.isdir(self.spool_dir):
+            return []
+        return sorted(os.path.join(self.spool_dir, filename) for filename in os.listdir(self.spool_dir)
+                      if filename.endswith('.gz') and not filename.startswith('.'))
+
+    def __spool(self, body: bytes):
+        with self.__spool_lock:
+            try:
+                os.makedirs(self.spool_dir, exist_ok=True)
+                self.__spooled += 1
+                path = os.path.join(self.spool_dir, f'{int(time.time() * 1000000):020d}-{self.__spooled:06d}.gz')
+                file_descriptor, temporal_path = tempfile.mkstemp(dir=self.spool_dir, prefix='.spool')
+                with os.fdopen(file_descriptor, 'wb') as file:
+                    file.write(body)
+                os.replace(temporal_path, path)
+
+                spooled = [(path, os.path.getsize(path)) for path in self.spooled_files()]
+                spool_bytes = sum(size for _, size in spooled)
+                while spooled and spool_bytes > self.MAX_SPOOL_BYTES:
+                    oldest, size = spooled.pop(0)
+                    os.remove(oldest)
+                    spool_bytes -= size
+                    with self.__condition:
+                        self.dropped += 1
+            except OSError as err:
+                logger.info(f"error spooling telemetry: {err}")
+
+    def __send_spooled(self):
+        for path in self.spooled_files():
+            if self.__waiting_backoff():
+                return
+
+            try:
+                with open(path, 'rb') as file:
+                    body = file.read()
+            except OSError:
+                continue
+
+            if not self.__post(body):
+                return
+            os.remove(path)
@@ -5,7 +5,6 @@
 # of this source tree for licensing information.
 #
 
-import io
 import sys
 
 from typing import Optional
@@ -15,7 +14,7 @@ from clai.server.clai_message_builder import create_message_help, create_message
 from clai.server.command_message import Action, NOOP_COMMAND
 from clai.server.message_handler import STOP_COMMAND
 from clai.tools.colorize_console import Colorize
-from clai.tools.file_util import get_history_file_name, read_history
+from clai.tools.file_util import append_to_last_history_line
 
 COMMAND_START_SERVER = 'clai start'
 COMMAND_BASE = 'clai'
@@ -24,15 +23,7 @@ START_SERVER_COMMAND_TO_EXECUTE = 'nohup $CLAI_PATH/bin/clai-run start &'
 
 
 def override_last_command(last_command):
-    lines = read_history()
-
-    if lines:
-        new_last_line = (lines[-1].rstrip() + last_command)
-        lines[-1] = new_last_line
-    else:
-        lines.append(last_command)
-
-    io.open(get_history_file_name(), 'w').writelines(lines)
+    append_to_last_history_line(last_command)
 
 
 def is_yes_command(input_command):
@@ -5,16 +5,33 @@
 # of this source tree for licensing information.
 #
 
-import io
+import os
 
-from clai.tools.file_util import read_history, get_history_file_name
+from clai.tools.file_util import get_history_file_name, read_lines_backwards
 
 
 def restore_history(original_command: str):
-    lines = read_history()
-
-    new_lines = __remove_clai_history__(lines, original_command + '\n')
-    io.open(get_history_file_name(), 'w').writelines(new_lines)
+    history_file_name = get_history_file_name()
+    if not os.path.isfile(history_file_name):
+        return
+
+    command_line = original_command + '\n'
+    with open(history_file_name, 'r+b') as file:
+        # only the lines after the last execution of the command and the line before it are needed
+        offsets, lines = [], []
+        command_found = False
+        for offset, line in read_lines_backwards(file):
+            offsets.append(offset)
+            lines.append(line.decode('utf-8', errors='ignore'))
+            if command_found:
+                break
+            command_found = lines[-1] == command_line
+
+        offsets.reverse()
+        lines.reverse()
+        new_lines = __remove_clai_history__(lines, command_line)
+        if len(new_lines) < len(lines):
+            file.truncate(offsets[len(new_lines)])
 
 
 def __remove_clai_history__(lines, original_command):
@@ -6,26 +6,34 @@
 #
 
 from abc import ABC, abstractmethod
-from typing import Union, List
-import pickle
+from typing import Optional, Union, List
+import inspect
 import os
-import shutil
 
+from clai.server.checkpoint_manager import checkpoint_manager
 from clai.server.command_message import State, Action, BASEDIR
+from clai.tools.async_utils import run_coroutine
 
 
 # pylint: disable=too-few-public-methods,bare-except
 class Agent(ABC):
+    # seconds the agent may take before its answer is discarded (None: the executor limit)
+    latency_budget: Optional[float] = None
+    # the orchestrator may answer as soon as a decisive agent responds
+    decisive: bool = False
 
     def __init__(self):
         self.agent_name = self.__class__.__name__
         self.ready = False
         self._save_basedir = os.path.join(BASEDIR, 'saved_agents')
         self._save_dirpath = os.path.join(self._save_basedir, self.agent_name)
+        checkpoint_manager.register(self)
 
     def execute(self, state: State) -> Union[Action, List[Action]]:
         try:
             action_to_return = self.get_next_action(state)
+            if inspect.isawaitable(action_to_return):
+                action_to_return = run_coroutine(action_to_return)
         # pylint: disable=broad-except
         except:
             action_to_return = Action()
@@ -44,7 +52,7 @@ class Agent(ABC):
 
     @abstractmethod
     def get_next_action(self, state: State) -> Union[Action, List[Action]]:
-        """Provide next action to execute in the bash console"""
+        """Provide next action to execute in the bash console, it can be a coroutine"""
 
     def init_agent(self):
         """Add here all heavy task for initialize the """
@@ -54,61 +62,19 @@ class Agent(ABC):
         """Returns the agent state to be saved for future loading"""
         return {}
 
-    def __prepare_state_folder__(self):
-
-        os.makedirs(self._save_dirpath, exist_ok=True)
-
-        for file in os.listdir(self._save_dirpath):
-            path = os.path.join(self._save_dirpath, file)
-            try:
-                shutil.rmtree(path)
-            except OSError:
-                os.remove(path)
-
     def save_agent(self) -> bool:
         """Saves agent state into persisting memory"""
-        try:
-            state = self.get_agent_state()
-            if not state:
-                return True
+        return checkpoint_manager.save(self._save_dirpath, self.get_agent_state())
 
-            self.__prepare_state_folder__()
-
-            for var_name, var_val in state.items():
-                with open('{}/{}.p'.format(self._save_dirpath, var_name), 'wb') as file:
-                    pickle.dump(var_val, file)
-
-        # pylint: disable=broad-except
-        except Exception:
-            return False
-        else:
-            return True
+    def save_checkpoint(self) -> bool:
+        return self.save_agent()
 
     def load_saved_state(self) -> dict:
-
-        agent_state = {}
-
-        filenames = []
-        if os.path.exists(self._save_dirpath):
-            filenames = [file for file in os.listdir(self._save_dirpath)
-                         if os.path.isfile(os.path.join(self._save_dirpath, file))]
-
-        for filename in filenames:
-            try:
-                key = os.path.splitext(filename)[0]        # filename without extension
-                with open(os.path.join(self._save_dirpath, filename), 'rb') as file:
-                    agent_state[key] = pickle.load(file)
-            except:
-                pass
-
-        return agent_state
+        return checkpoint_manager.load(self._save_dirpath)
 
     def extract_name_without_extension(self, filename):
         return os.path.splitext(filename)[0]
 
-    def __del__(self):
-        self.save_agent()
-
 
 class ClaiIdentity(Agent):
 
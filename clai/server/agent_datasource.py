@@ -11,6 +11,7 @@ import importlib
 import inspect
 import os
 import pkgutil as pkg
+import threading
 from typing import List, Optional, Dict
 
 import clai.server.plugins
@@ -20,6 +21,7 @@ from clai.server.agent import Agent, ClaiIdentity
 from clai.server.agent_datasource_executor import thread_agent_datasource_executor as agent_datasource_executor
 from clai.server.command_runner.agent_descriptor import AgentDescriptor
 from clai.server.logger import current_logger as logger
+from clai.server.process_agent import PROCESS_ISOLATION, THREAD_ISOLATION, ProcessAgent
 
 
 class AgentDatasource:
@@ -30,6 +32,10 @@ class AgentDatasource:
         self.num_workers = 4
         self.config_storage = config_storage
         self.current_orchestrator = None
+        self.__descriptors: Optional[List[AgentDescriptor]] = None
+        self.__descriptors_by_name: Dict[str, AgentDescriptor] = {}
+        self.__modules: Dict[str, pkg.ModuleInfo] = {}
+        self.__registry_lock = threading.Lock()
 
     @staticmethod
     def get_path():
@@ -48,6 +54,13 @@ class AgentDatasource:
 
     def load_agent(self, name: str):
         try:
+            descriptor = self.__find_descriptor(name)
+            if descriptor is None or descriptor.pkg_name != name:
+                descriptor = self.load_descriptors(os.path.join(self.get_path()[0], name), name)
+            if descriptor.isolation == PROCESS_ISOLATION:
+                self.load_process_agent(descriptor)
+                return
+
             plugin = importlib.import_module(
                 f'clai.server.plugins.{name}.{name}', package=name)
 
@@ -59,6 +72,8 @@ class AgentDatasource:
                     member = class_member()
                     if not member:
                         member = ClaiIdentity()
+                    member.latency_budget = descriptor.latency_budget
+                    member.decisive = descriptor.decisive
                     self.__plugins[name] = member
                     member.init_agent()
                     member.ready = True
@@ -67,6 +82,18 @@ class AgentDatasource:
         except Exception as ex:
             logger.info(f'load agent exception: {ex}')
 
+    def load_process_agent(self, descriptor: AgentDescriptor):
+        member = ProcessAgent(descriptor.pkg_name)
+        member.latency_budget = descriptor.latency_budget
+        member.decisive = descriptor.decisive
+        member.init_agent()
+        previous = self.__plugins.get(descriptor.pkg_name)
+        if isinstance(previous, ProcessAgent):
+            previous.close()
+        self.__plugins[descriptor.pkg_name] = member
+        member.ready = True
+        logger.info(f"{descriptor.pkg_name} is ready in process {member.agent_name}")
+
     def get_instances(self, user_name: str, agent_to_select: str = None) -> List[Agent]:
         select_plugins_by_user = self.__get_selected_by_user(user_name)
 
@@ -84,15 +111,6 @@ class AgentDatasource:
                 filter(lambda value: value.name == agent_descriptor_selected.pkg_name,
                        select_plugins_by_user))
 
-        if agent_to_select:
-            agent_descriptor_selected = self.get_agent_descriptor(agent_to_select)
-            if agent_descriptor_selected is None:
-                return [ClaiIdentity()]
-
-            select_plugins_by_user = list(
-                filter(lambda value: value.name == agent_descriptor_selected.pkg_name,
-                       select_plugins_by_user))
-
         agents = []
         for select_plugin_by_user in select_plugins_by_user:
             if select_plugin_by_user.name in self.__plugins:
@@ -123,13 +141,28 @@ class AgentDatasource:
             if config_parser.has_option('DEFAULT', 'exclude'):
                 exclude = config_parser.get('DEFAULT', 'exclude').lower().split()
 
+            latency_budget = None
+            if config_parser.has_option('DEFAULT', 'latency_budget'):
+                latency_budget = config_parser.getfloat('DEFAULT', 'latency_budget')
+
+            decisive = False
+            if config_parser.has_option('DEFAULT', 'decisive'):
+                decisive = config_parser.getboolean('DEFAULT', 'decisive')
+
+            isolation = THREAD_ISOLATION
+            if config_parser.has_option('DEFAULT', 'isolation'):
+                isolation = config_parser.get('DEFAULT', 'isolation').strip().lower()
+
             return AgentDescriptor(
                 pkg_name=name,
                 name=config_parser['DEFAULT']['name'],
                 description=config_parser['DEFAULT']['description'],
                 exclude=exclude,
                 default=default,
-                z_default=z_default
+                z_default=z_default,
+                latency_budget=latency_budget,
+                decisive=decisive,
+                isolation=isolation
             )
 
         return AgentDescriptor(
@@ -157,27 +190,45 @@ class AgentDatasource:
         os_name = os.uname().sysname.lower()
         return list(filter(lambda agent: os_name not in agent.exclude, agent_descriptors))
 
-    def all_plugins(self) -> List[AgentDescriptor]:
+    def __load_registry(self):
+        modules = {module.name: module for module in pkg.iter_modules(self.get_path())}
         agent_descriptors = list(
-            self.load_descriptors(os.path.join(importer.path, name), name)
-            for importer, name, _
-            in pkg.iter_modules(self.get_path()))
-
+            self.load_descriptors(os.path.join(module.module_finder.path, name), name)
+            for name, module in modules.items())
         agent_descriptors = self.filter_by_platform(agent_descriptors)
 
-        plugins_installed = self.config_storage.load_installed()
-
+        descriptors_by_name = {}
         for agent_descriptor in agent_descriptors:
-            agent_descriptor.installed = agent_descriptor.name in plugins_installed
+            descriptors_by_name.setdefault(agent_descriptor.name, agent_descriptor)
+            descriptors_by_name.setdefault(agent_descriptor.pkg_name, agent_descriptor)
+
+        self.__modules = modules
+        self.__descriptors_by_name = descriptors_by_name
+        self.__descriptors = agent_descriptors
+
+    def __get_registry(self) -> List[AgentDescriptor]:
+        with self.__registry_lock:
+            if self.__descriptors is None:
+                self.__load_registry()
+            return self.__descriptors
+
+    def __find_descriptor(self, plugin_to_select: str) -> Optional[AgentDescriptor]:
+        self.__get_registry()
+        return self.__descriptors_by_name.get(plugin_to_select)
+
+    def __update_status(self, agent_descriptor: AgentDescriptor, plugins_installed: List[str]):
+        agent_descriptor.installed = agent_descriptor.name in plugins_installed
+        agent = self.__plugins.get(agent_descriptor.pkg_name)
+        agent_descriptor.ready = agent.ready if agent is not None else False
+
+    def all_plugins(self) -> List[AgentDescriptor]:
+        agent_descriptors = list(self.__get_registry())
+
+        plugins_installed = self.config_storage.load_installed()
 
         logger.info(f"agents runned: {self.__plugins}")
         for agent_descriptor in agent_descriptors:
-            if agent_descriptor.pkg_name in self.__plugins:
-                logger.info(f"{agent_descriptor.pkg_name} is {self.__plugins[agent_descriptor.pkg_name].ready}")
-                agent_descriptor.ready = self.__plugins[agent_descriptor.pkg_name].ready
-            else:
-                logger.info(f"{agent_descriptor.pkg_name} not iniciate.")
-                agent_descriptor.ready = False
+            self.__update_status(agent_descriptor, plugins_installed)
 
         return agent_descriptors
 
@@ -190,6 +241,9 @@ class AgentDatasource:
 
         return self.current_orchestrator
 
+    def get_shadow_orchestrators(self) -> List[str]:
+        return list(self.config_storage.read_config().shadow_orchestrators)
+
     def select_orchestrator(self, orchestrator_name: str):
         plugin_config = self.config_storage.read_config()
         self.current_orchestrator = orchestrator_name
@@ -215,38 +269,34 @@ class AgentDatasource:
         return plugin_config
 
     def get_agent_descriptor(self, plugin_to_select) -> Optional[AgentDescriptor]:
-        all_plugins = self.all_plugins()
-
-        for plugin in all_plugins:
-            if plugin_to_select in (plugin.name, plugin.pkg_name):
-                return plugin
-        return None
+        agent_descriptor = self.__find_descriptor(plugin_to_select)
+        if agent_descriptor is not None:
+            self.__update_status(agent_descriptor, self.config_storage.load_installed())
+        return agent_descriptor
 
     def select_plugin(self, plugin_to_select: str, user_name: str) -> Optional[pkg.ModuleInfo]:
         agent_descriptor_selected = self.get_agent_descriptor(plugin_to_select)
         if agent_descriptor_selected is None:
             return None
 
-        for module in pkg.iter_modules(self.get_path()):
-            if module.name == agent_descriptor_selected.pkg_name:
-                self.__select_plugin_for_user(module, user_name)
-                if agent_descriptor_selected.pkg_name not in self.__plugins:
-                    self.start_agent(agent_descriptor_selected)
-                return module
+        module = self.__modules.get(agent_descriptor_selected.pkg_name)
+        if module is None:
+            return None
 
-        return None
+        self.__select_plugin_for_user(module, user_name)
+        if agent_descriptor_selected.pkg_name not in self.__plugins:
+            self.start_agent(agent_descriptor_selected)
+        return module
 
     def unselect_plugin(self, plugin_to_select: str, user_name: str) -> Optional[pkg.ModuleInfo]:
         agent_descriptor_selected = self.get_agent_descriptor(plugin_to_select)
         if agent_descriptor_selected is None:
             return None
 
-        for module in pkg.iter_modules(self.get_path()):
-            if module.name == agent_descriptor_selected.pkg_name:
-                self.__unselect_plugin_for_user(module, user_name)
-                return module
-
-        return None
+        module = self.__modules.get(agent_descriptor_selected.pkg_name)
+        if module is not None:
+            self.__unselect_plugin_for_user(module, user_name)
+        return module
 
     def __select_plugin_for_user(self, plugin_to_select, user_name):
         if user_name in self.__selected_plugin:
@@ -265,5 +315,10 @@ class AgentDatasource:
         return None
 
     def reload(self):
+        for agent in self.__plugins.values():
+            if isinstance(agent, ProcessAgent):
+                agent.close()
         self.__plugins.clear()
+        with self.__registry_lock:
+            self.__descriptors = None
         self.preload_plugins()
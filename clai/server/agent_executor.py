@@ -5,37 +5,114 @@
 # of this source tree for licensing information.
 #
 
+import threading
+import time
 from abc import ABC, abstractmethod
 from concurrent import futures
-from functools import partial
-from operator import is_not
-from typing import List, Union
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 from clai.server.agent import Agent
 from clai.server.command_message import Action, State
+from clai.server.logger import current_logger as logger
+from clai.server.tracer import current_tracer as tracer
 
 
 # pylint: disable=too-few-public-methods
 class AgentExecutor(ABC):
     @abstractmethod
-    def execute_agents(self, command: State, agents: List[Agent]) -> List[Action]:
-        """execute all agents in parallel and return the actions"""
+    def execute_agents(self, command: State, agents: List[Agent],
+                       can_decide: Optional[Callable[[List[Action]], bool]] = None
+                       ) -> List[Optional[Union[Action, List[Action]]]]:
+        """
+        execute all agents in parallel and return their actions in the order of agents, None for the agents
+        without an answer; can_decide tells when to stop waiting
+        """
 
 
 class ThreadExecutor(AgentExecutor):
+    """
+    Runs the agents in a pool of threads shared by all the commands. Every agent
+    has until its latency_budget (capped by MAX_TIME_PLUGIN_EXECUTION) to answer:
+    the late results are discarded, and an agent is skipped while its overdue
+    execution keeps running so it can't take over the pool. The wait ends early
+    when can_decide accepts the actions received so far.
+    """
     MAX_TIME_PLUGIN_EXECUTION = 4
-    NUM_WORKERS = 4
-
-    def execute_agents(self, command: State, agents: List[Agent]) -> List[Union[Action, List[Action]]]:
-        with futures.ThreadPoolExecutor(max_workers=self.NUM_WORKERS) as executor:
-            done, _ = futures.wait(
-                [executor.submit(plugin_instance.execute, command) for plugin_instance in agents],
-                timeout=self.MAX_TIME_PLUGIN_EXECUTION)
-            if not done:
-                return []
-            results = map(lambda future: future.result(), done)
-            candidate_actions = list(filter(partial(is_not, None), results))
-        return candidate_actions
+    NUM_WORKERS = 8
+
+    def __init__(self):
+        self.executor = futures.ThreadPoolExecutor(max_workers=self.NUM_WORKERS)
+        self.__overdue: Dict[str, futures.Future] = {}
+        self.__lock = threading.Lock()
+
+    def execute_agents(self, command: State, agents: List[Agent],
+                       can_decide: Optional[Callable[[List[Action]], bool]] = None
+                       ) -> List[Optional[Union[Action, List[Action]]]]:
+        start = time.monotonic()
+        submitted: List[Optional[futures.Future]] = []
+        deadlines = {}
+        with self.__lock:
+            for plugin_instance in agents:
+                if self.__is_overdue(plugin_instance.agent_name):
+                    logger.info("%s is still running a previous command, skipped", plugin_instance.agent_name)
+                    submitted.append(None)
+                    continue
+                future = self.executor.submit(tracer.wrap(self.__execute), plugin_instance, command)
+                submitted.append(future)
+                deadlines[future] = start + self.__budget(plugin_instance)
+
+        pending = set(deadlines)
+        while pending:
+            now = time.monotonic()
+            expired = {future for future in pending if deadlines[future] <= now}
+            pending -= expired
+            if not pending:
+                break
+
+            _, pending = futures.wait(pending, timeout=min(deadlines[future] for future in pending) - now,
+                                      return_when=futures.FIRST_COMPLETED)
+            if pending and can_decide and can_decide(
+                    [action for action in self.__collect(submitted) if action is not None]):
+                logger.info("orchestrator decided, the rest of the agents are not awaited")
+                break
+
+        with self.__lock:
+            for plugin_instance, future in zip(agents, submitted):
+                if future is None:
+                    continue
+                if not future.done() and not future.cancel() and deadlines[future] <= time.monotonic():
+                    logger.info("%s exceeded its latency budget, result discarded", plugin_instance.agent_name)
+                    self.__overdue[plugin_instance.agent_name] = future
+
+        return self.__collect(submitted)
+
+    @staticmethod
+    def __execute(plugin_instance: Agent, command: State) -> Union[Action, List[Action]]:
+        with tracer.span('agent.execute', agent=plugin_instance.agent_name):
+            return plugin_instance.execute(command)
+
+    def __budget(self, agent: Agent) -> float:
+        latency_budget = getattr(agent, 'latency_budget', None)
+        if latency_budget is None:
+            return self.MAX_TIME_PLUGIN_EXECUTION
+        return min(latency_budget, self.MAX_TIME_PLUGIN_EXECUTION)
+
+    @staticmethod
+    def __collect(submitted: Iterable[Optional[futures.Future]]) -> List[Optional[Union[Action, List[Action]]]]:
+        return [future.result() if future is not None and future.done() and not future.cancelled()
+                and future.exception() is None else None
+                for future in submitted]
+
+    def __is_overdue(self, agent_name: str) -> bool:
+        future = self.__overdue.get(agent_name)
+        if future is None:
+            return False
+
+        if future.done():
+            del self.__overdue[agent_name]
+            return False
+
+        return True
 
 
 # pylint: disable= invalid-name
@@ -5,7 +5,9 @@
 # of this source tree for licensing information.
 #
 
-from typing import Optional, List, Union
+import inspect
+import threading
+from typing import Callable, Optional, List, Tuple, Union
 
 from clai.datasource.action_remote_storage import ActionRemoteStorage
 from clai.server.agent_datasource import AgentDatasource
@@ -14,6 +16,8 @@ from clai.server.agent import Agent
 from clai.server.agent_executor import thread_executor as agent_executor
 from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
 from clai.server.orchestration.orchestrator_storage import OrchestratorStorage
+from clai.server.tracer import current_tracer as tracer
+from clai.tools.async_utils import run_coroutine
 
 
 class AgentRunner:
@@ -24,7 +28,9 @@ class AgentRunner:
         self.agent_datasource = agent_datasource
         self.orchestrator_provider = orchestrator_provider
         self.remote_storage = ActionRemoteStorage()
-        self.orchestrator_storage = OrchestratorStorage(orchestrator_provider, self.remote_storage)
+        self._orchestrator_lock = threading.Lock()
+        self.orchestrator_storage = OrchestratorStorage(orchestrator_provider, self.remote_storage,
+                                                        self._orchestrator_lock)
 
         self._pre_exec_id = "pre"
         self._post_exec_id = "post"
@@ -40,7 +46,8 @@ class AgentRunner:
         agent_names = [agent.agent_name for agent in agent_list]
         state = TerminalReplayMemory(command, agent_names, candidate_actions,
                                      force_response, suggested_command)
-        self.orchestrator_storage.store_pre(state)
+        with tracer.span('replay.store', pre_post_state=self._pre_exec_id):
+            self.orchestrator_storage.store_pre(state)
 
     # pylint: disable=too-many-arguments
     def store_post_orchestrator_memory(self,
@@ -53,7 +60,8 @@ class AgentRunner:
         agent_names = [agent.agent_name for agent in agent_list]
         state = TerminalReplayMemory(command, agent_names, candidate_actions,
                                      force_response, suggested_command)
-        self.orchestrator_storage.store_post(state)
+        with tracer.span('replay.store', pre_post_state=self._post_exec_id):
+            self.orchestrator_storage.store_post(state)
 
     # pylint: disable=too-many-arguments
     def select_best_candidate(self, command: State, agent_list: List[Agent],
@@ -62,15 +70,33 @@ class AgentRunner:
         agent_names = [agent.agent_name for agent in agent_list]
 
         orchestrator = self.orchestrator_provider.get_current_orchestrator()
-        suggested_command = orchestrator.choose_action(
-            command=command, agent_names=agent_names, candidate_actions=candidate_actions,
-            force_response=force_response, pre_post_state=pre_post_state)
+        with tracer.span('choose_action', orchestrator=orchestrator.orchestrator_name, pre_post_state=pre_post_state):
+            suggested_command = orchestrator.choose_action(
+                command=command, agent_names=agent_names, candidate_actions=candidate_actions,
+                force_response=force_response, pre_post_state=pre_post_state)
 
         if not suggested_command:
             suggested_command = Action()
 
+        self.orchestrator_storage.shadows.choose_action(command, agent_names, candidate_actions, force_response,
+                                                        pre_post_state, suggested_command)
         return suggested_command
 
+    def __decision_check(self, agent_list: List[Agent]) -> Optional[Callable[[List[Action]], bool]]:
+        decisive_agents = [agent.agent_name for agent in agent_list if agent.decisive]
+        if not decisive_agents:
+            return None
+
+        orchestrator = self.orchestrator_provider.get_current_orchestrator()
+        return lambda candidate_actions: orchestrator.can_decide(candidate_actions, decisive_agents)
+
+    @staticmethod
+    def __answered(agent_list: List[Agent], results: List[Optional[Union[Action, List[Action]]]]
+                   ) -> Tuple[List[Agent], List[Union[Action, List[Action]]]]:
+        """keep the agents that answered with their actions, in the same order, for the orchestrator"""
+        answered = [(agent, result) for agent, result in zip(agent_list, results) if result is not None]
+        return [agent for agent, _ in answered], [result for _, result in answered]
+
     def process(self,
                 command: State,
                 ignore_threshold: bool,
@@ -81,16 +107,19 @@ class AgentRunner:
         else:
             plugin_instances = self.agent_datasource.get_instances(command.user_name)
 
-        candidate_actions = agent_executor.execute_agents(command, plugin_instances)
+        results = agent_executor.execute_agents(command, plugin_instances,
+                                                self.__decision_check(plugin_instances))
+        answered_agents, candidate_actions = self.__answered(plugin_instances, results)
 
-        suggested_command = self.select_best_candidate(command, plugin_instances, candidate_actions,
-                                                       ignore_threshold, self._pre_exec_id)
+        with self._orchestrator_lock:
+            suggested_command = self.select_best_candidate(command, answered_agents, candidate_actions,
+                                                           ignore_threshold, self._pre_exec_id)
 
-        if not suggested_command:
-            suggested_command = Action()
+            if not suggested_command:
+                suggested_command = Action()
 
-        self.store_pre_orchestrator_memory(command, plugin_instances, candidate_actions, ignore_threshold,
-                                           suggested_command)
+            self.store_pre_orchestrator_memory(command, answered_agents, candidate_actions, ignore_threshold,
+                                               suggested_command)
 
         if isinstance(suggested_command, Action):
             if not suggested_command.suggested_command:
@@ -104,18 +133,22 @@ class AgentRunner:
 
     def process_post(self, command: State, ignore_threshold: bool) -> Optional[Action]:
         plugin_instances = self.agent_datasource.get_instances(command.user_name)
-        candidate_actions = []
+        results = []
         for plugin_instance in plugin_instances:
             action_post_executed = plugin_instance.post_execute(command)
-            action_post_executed.agent_owner = plugin_instance.agent_name
+            if inspect.isawaitable(action_post_executed):
+                action_post_executed = run_coroutine(action_post_executed)
             if action_post_executed:
-                candidate_actions.append(action_post_executed)
+                action_post_executed.agent_owner = plugin_instance.agent_name
+            results.append(action_post_executed)
+        answered_agents, candidate_actions = self.__answered(plugin_instances, results)
 
-        suggested_command = self.select_best_candidate(command, plugin_instances, candidate_actions,
-                                                       ignore_threshold, self._post_exec_id)
+        with self._orchestrator_lock:
+            suggested_command = self.select_best_candidate(command, answered_agents, candidate_actions,
+                                                           ignore_threshold, self._post_exec_id)
 
-        self.store_post_orchestrator_memory(command, plugin_instances, candidate_actions, ignore_threshold,
-                                            suggested_command)
+            self.store_post_orchestrator_memory(command, answered_agents, candidate_actions, ignore_threshold,
+                                                suggested_command)
 
         if not suggested_command:
             suggested_command = Action()
@@ -124,3 +157,8 @@ class AgentRunner:
             suggested_command.suggested_command = command.command
 
         return suggested_command
+
+    def wait(self):
+        """waits for the orchestrator learning in progress and saves the orchestrators"""
+        self.orchestrator_storage.shadows.wait()
+        self.orchestrator_storage.learner.wait()
@@ -0,0 +1,186 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import atexit
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from clai.server.logger import current_logger as logger
+
+
+class CheckpointManager:
+    """
+    Saves the state of the agents and the orchestrators. Every variable of the
+    state goes to its own pickle file, written to a temporary file and renamed,
+    and only the variables that changed since the last checkpoint are written.
+
+    The components call mark_dirty when their state changes and they are saved
+    every CHECKPOINT_INTERVAL seconds; all the registered components are saved
+    at exit through their save_checkpoint method. A component changed by other
+    threads is registered with the lock that guards its state, the lock is held
+    while it is saved so the checkpoint never sees a half applied change.
+    """
+    CHECKPOINT_INTERVAL = 60
+    EXTENSION = '.p'
+
+    def __init__(self):
+        self.__components = weakref.WeakSet()
+        self.__dirty = weakref.WeakSet()
+        self.__locks = weakref.WeakKeyDictionary()
+        self.__digests: Dict[str, Dict[str, str]] = {}
+        self.__lock = threading.RLock()
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.__read_only = 0
+        atexit.register(self.close)
+
+    def register(self, component, lock: Optional[threading.Lock] = None):
+        with self.__lock:
+            self.__components.add(component)
+            if lock is not None:
+                self.__locks[component] = lock
+
+    def unregister(self, component):
+        with self.__lock:
+            self.__components.discard(component)
+            self.__dirty.discard(component)
+            self.__locks.pop(component, None)
+
+    def mark_dirty(self, component, lock: Optional[threading.Lock] = None):
+        with self.__lock:
+            self.register(component, lock)
+            self.__dirty.add(component)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, name='checkpoint-manager', daemon=True)
+                self.__thread.start()
+
+    def checkpoint(self, all_components: bool = False):
+        with self.__lock:
+            components = list(self.__components if all_components else self.__dirty)
+            self.__dirty.clear()
+
+        for component in components:
+            try:
+                saved = self.__save_checkpoint(component)
+            # pylint: disable=broad-except
+            except Exception as err:
+                logger.info(f"error saving the checkpoint of {component}: {err}")
+                saved = False
+
+            if saved is False and not all_components:
+                with self.__lock:
+                    self.__dirty.add(component)
+
+    def __save_checkpoint(self, component):
+        with self.__lock:
+            lock = self.__locks.get(component)
+
+        if lock is None:
+            return component.save_checkpoint()
+        with lock:
+            return component.save_checkpoint()
+
+    def close(self):
+        self.__stopped.set()
+        self.checkpoint(all_components=True)
+
+    @contextmanager
+    def read_only(self):
+        """nothing is written while it is active, for the tools that use the saved states without changing them"""
+        with self.__lock:
+            self.__read_only += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.__read_only -= 1
+
+    def save(self, dirpath: str, state: dict) -> bool:
+        try:
+            with self.__lock:
+                if not state or self.__read_only:
+                    return True
+
+                digests = self.__digests.get(dirpath)
+                if digests is None:
+                    digests = self.__digests[dirpath] = self.__saved_digests(dirpath)
+
+                os.makedirs(dirpath, exist_ok=True)
+                for var_name, value in state.items():
+                    data = pickle.dumps(value)
+                    digest = hashlib.sha1(data).hexdigest()
+                    if digests.get(var_name) != digest:
+                        self.__write_atomically(os.path.join(dirpath, var_name + self.EXTENSION), data)
+                        digests[var_name] = digest
+
+                for var_name in set(digests) - set(state):
+                    os.remove(os.path.join(dirpath, var_name + self.EXTENSION))
+                    del digests[var_name]
+        # pylint: disable=broad-except
+        except Exception as err:
+            logger.info(f"error saving {dirpath}: {err}")
+            self.__digests.pop(dirpath, None)
+            return False
+        return True
+
+    def load(self, dirpath: str) -> dict:
+        state = {}
+        filenames = []
+        if os.path.exists(dirpath):
+            filenames = [file for file in os.listdir(dirpath)
+                         if file.endswith(self.EXTENSION) and os.path.isfile(os.path.join(dirpath, file))]
+
+        for filename in filenames:
+            try:
+                key = os.path.splitext(filename)[0]
+                with open(os.path.join(dirpath, filename), 'rb') as file:
+                    state[key] = pickle.load(file)
+            # pylint: disable=bare-except
+            except:
+                pass
+
+        return state
+
+    def __saved_digests(self, dirpath: str) -> Dict[str, str]:
+        digests = {}
+        if not os.path.isdir(dirpath):
+            return digests
+
+        for filename in os.listdir(dirpath):
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(self.EXTENSION) and os.path.isfile(path):
+                with open(path, 'rb') as file:
+                    digests[os.path.splitext(filename)[0]] = hashlib.sha1(file.read()).hexdigest()
+        return digests
+
+    @staticmethod
+    def __write_atomically(path: str, data: bytes):
+        file_descriptor, temporal_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.checkpoint')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporal_path, path)
+        except OSError:
+            if os.path.exists(temporal_path):
+                os.unlink(temporal_path)
+            raise
+
+    def __loop(self):
+        while not self.__stopped.wait(self.CHECKPOINT_INTERVAL):
+            self.checkpoint()
+
+
+# pylint: disable= invalid-name
+checkpoint_manager = CheckpointManager()
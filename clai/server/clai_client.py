@@ -10,8 +10,11 @@ import os
 import sys
 
 from clai.server.client_connector import ClientConnector
+from clai.server.client_relay import RELAY_SOCKET_PATH
 from clai.server.command_message import Action, FilesChangesValues, ProcessesValues, StateDTO
 from clai.server.socket_client_connector import SocketClientConnector
+from clai.server.unix_socket_client_connector import UnixSocketClientConnector
+from clai.server.unix_socket_server_connector import SERVER_SOCKET_PATH
 from clai.server.web_socket_client_connector import WebSocketClientConnector
 from clai.server.logger import current_logger as logger
 
@@ -29,11 +32,20 @@ class ClaiClient:
         self.connector = connector
 
         if not connector:
-            self.connector = SocketClientConnector(host=host, port=port)
+            self.connector = self.__detect_connector(host, port)
 
         self.port = port
         self.host = host
 
+    @staticmethod
+    def __detect_connector(host: str, port: int) -> ClientConnector:
+        if host == LOCALHOST:
+            for socket_path in (RELAY_SOCKET_PATH, SERVER_SOCKET_PATH):
+                if socket_path and os.path.exists(socket_path):
+                    return UnixSocketClientConnector(socket_path, host=host, port=port)
+
+        return SocketClientConnector(host=host, port=port)
+
     def send(self, message: StateDTO) -> Action:
         try:
             return self.connector.send(message)
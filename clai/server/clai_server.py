@@ -8,15 +8,18 @@
 #!/usr/bin/env python3
 # pylint: disable=invalid-name,redefined-outer-name
 import json
+from typing import Awaitable
 
 from clai.datasource.action_remote_storage import ActionRemoteStorage
 from clai.datasource.server_status_datasource import current_status_datasource, ServerStatusDatasource
 from clai.datasource.stats_tracker import StatsTracker
+from clai.datasource.telemetry_dispatcher import telemetry_dispatcher
 from clai.server.agent_datasource import AgentDatasource
 from clai.server.command_message import State, Action, StateDTO
 from clai.server.message_handler import MessageHandler
 from clai.server.server_connector import ServerConnector
 from clai.server.socket_server_connector import SocketServerConnector
+from clai.server.tracer import current_tracer as tracer
 
 
 # pylint: disable=too-many-arguments
@@ -43,8 +46,15 @@ class ClaiServer:
 
     @staticmethod
     def serialize_message(data) -> State:
+        return ClaiServer.state_of(ClaiServer.parse_message(data))
+
+    @staticmethod
+    def parse_message(data) -> StateDTO:
         StateDTO.update_forward_refs()
-        dto = StateDTO(**json.loads(data))
+        return StateDTO(**json.loads(data))
+
+    @staticmethod
+    def state_of(dto: StateDTO) -> State:
         return State(
             command_id=dto.command_id,
             user_name=dto.user_name,
@@ -61,10 +71,29 @@ class ClaiServer:
         self.connector.create_socket(host, port)
 
     def listen_client_sockets(self):
-        self.connector.loop(self.process_message)
+        self.connector.loop(self.process_message_async)
+        self.message_handler.agent_runner.wait()
+        telemetry_dispatcher.close()
         self.remote_storage.wait()
-        self.stats_tracker.wait()
 
     def process_message(self, received_data: bytes) -> Action:
-        message = self.serialize_message(received_data)
+        message = self.__traced_serialize_message(received_data)
         return self.message_handler.process_message(message)
+
+    def process_message_async(self, received_data: bytes) -> Awaitable[Action]:
+        """parses the message now, in the span of the command, and returns the coroutine that answers it"""
+        message = self.__traced_serialize_message(received_data)
+        return self.message_handler.process_message_async(message)
+
+    def __traced_serialize_message(self, received_data: bytes) -> State:
+        with tracer.span('serialize_message'):
+            dto = self.parse_message(received_data)
+            message = self.state_of(dto)
+        attributes = {'user_name': message.user_name}
+        if message.is_command():
+            attributes['command'] = message.command
+        if message.is_post_process():
+            attributes['result_code'] = message.result_code
+        tracer.set_command(message.command_id, **attributes)
+        tracer.add_client_spans(dto.client_spans)
+        return message
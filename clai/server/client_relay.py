@@ -0,0 +1,163 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import socket
+import threading
+from typing import Optional
+
+from clai.server.logger import current_logger as logger
+from clai.server.message_frame import FrameDecoder, encode_frame
+from clai.server.unix_socket_server_connector import SERVER_SOCKET_PATH
+
+RELAY_SOCKET_PATH = os.getenv('CLAI_RELAY_SOCKET')
+
+
+class ClientRelay:
+    """
+    Per shell relay that keeps a single warm connection with the CLAI server.
+
+    The commands of the shell (process-command, fswatchlog, post-execution)
+    connect to the relay through a unix socket and the relay forwards their
+    frames over the shared server connection. The server answers the frames of
+    a connection in order, so every request waits its response before the next
+    one is forwarded.
+    """
+    BUFFER_SIZE = 4024
+    OWNER_CHECK_INTERVAL = 5
+    UPSTREAM_TIMEOUT = 6
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, socket_path: str, host: str, port: int, owner_pid: Optional[int] = None,
+                 server_socket_path: str = SERVER_SOCKET_PATH):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.server_socket_path = server_socket_path
+        self.owner_pid = owner_pid
+        self.relay_socket = None
+        self.running = False
+        self.__upstream = None
+        self.__upstream_decoder = None
+        self.__upstream_lock = threading.Lock()
+
+    def create_socket(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.relay_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.relay_socket.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.relay_socket.listen()
+        self.relay_socket.settimeout(self.OWNER_CHECK_INTERVAL)
+        logger.info(f"relay listening {self.socket_path}")
+
+    def loop(self):
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    connection, _ = self.relay_socket.accept()
+                except socket.timeout:
+                    self.running = self.is_owner_alive()
+                    continue
+
+                threading.Thread(target=self.serve_connection, args=(connection,), daemon=True).start()
+        except KeyboardInterrupt:
+            logger.info("caught keyboard interrupt, exiting")
+        finally:
+            self.close()
+
+    def is_owner_alive(self) -> bool:
+        if self.owner_pid is None:
+            return True
+
+        try:
+            os.kill(self.owner_pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def serve_connection(self, connection: socket.socket):
+        decoder = FrameDecoder()
+        with connection:
+            connection.settimeout(self.UPSTREAM_TIMEOUT)
+            try:
+                while True:
+                    received_data = connection.recv(self.BUFFER_SIZE)
+                    if not received_data:
+                        return
+
+                    for frame in decoder.feed(received_data):
+                        connection.sendall(encode_frame(self.forward(frame)))
+            except (OSError, ValueError) as error:
+                logger.info(f"relay connection error: {error}")
+
+    def forward(self, frame: bytes) -> bytes:
+        with self.__upstream_lock:
+            reused = self.__upstream is not None
+            try:
+                return self.__exchange(frame)
+            except ConnectionError as error:
+                self.__close_upstream()
+                if not reused:
+                    raise
+                # the server closed the idle connection (e.g. it was restarted)
+                # before reading the frame, so it is safe to send it again
+                logger.info(f"relay reconnecting: {error}")
+                return self.__exchange(frame)
+            except OSError:
+                self.__close_upstream()
+                raise
+
+    def __exchange(self, frame: bytes) -> bytes:
+        if self.__upstream is None:
+            self.__upstream = self.__connect_upstream()
+            self.__upstream_decoder = FrameDecoder()
+
+        self.__upstream.sendall(encode_frame(frame))
+        while True:
+            received_data = self.__upstream.recv(self.BUFFER_SIZE)
+            if not received_data:
+                raise ConnectionResetError("server closed the connection")
+
+            frames = self.__upstream_decoder.feed(received_data)
+            if frames:
+                return frames[0]
+
+    def __connect_upstream(self) -> socket.socket:
+        if self.server_socket_path and os.path.exists(self.server_socket_path):
+            upstream = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            upstream.settimeout(self.UPSTREAM_TIMEOUT)
+            try:
+                upstream.connect(self.server_socket_path)
+                return upstream
+            except OSError as error:
+                upstream.close()
+                logger.info(f"relay can't use {self.server_socket_path}: {error}")
+
+        return socket.create_connection((self.host, self.port), timeout=self.UPSTREAM_TIMEOUT)
+
+    def __close_upstream(self):
+        if self.__upstream is not None:
+            self.__upstream.close()
+        self.__upstream = None
+        self.__upstream_decoder = None
+
+    def close(self):
+        with self.__upstream_lock:
+            self.__close_upstream()
+        if self.relay_socket is not None:
+            self.relay_socket.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("relay closed")
@@ -8,7 +8,6 @@
 # pylint: disable=too-many-instance-attributes,too-many-arguments,too-few-public-methods
 from enum import Enum
 from typing import Optional, List, Union
-from copy import deepcopy
 import os
 
 from pydantic import BaseModel
@@ -50,6 +49,14 @@ class NetworkValues(BaseModel):
     has_network: bool
 
 
+class ClientSpan(BaseModel):
+    """time spent by the client in a step of the message, parent is the name of the step that contains it"""
+    name: str
+    start_time_unix_nano: int
+    end_time_unix_nano: int
+    parent: Optional[str] = None
+
+
 class StateDTO(BaseModel):
     command_id: str
     user_name: str
@@ -60,6 +67,7 @@ class StateDTO(BaseModel):
     network: Optional[NetworkValues] = None
     result_code: Optional[str] = None
     stderr: Optional[str] = None
+    client_spans: List[ClientSpan] = []
 
 
 class State:
@@ -129,6 +137,9 @@ class State:
     def mark_as_processed(self):
         self.already_processed = True
 
+    def snapshot(self) -> 'StateSnapshot':
+        return StateSnapshot(self)
+
 
 NOOP_COMMAND = ":"
 BASEDIR = os.getenv('CLAI_BASEDIR',
@@ -148,15 +159,59 @@ class Action(BaseModel):
         return not self.suggested_command or self.suggested_command == self.origin_command
 
 
+class StateSnapshot(State):
+    """
+    Read only copy of a State as it was when the snapshot was taken. The values
+    that are replaced but never modified in place (processes, file_changes,
+    network) are shared with the original state, the actions are copied and the
+    previous_execution history is left out.
+    """
+
+    def __init__(self, state: State):
+        super().__init__(
+            command_id=state.command_id,
+            user_name=state.user_name,
+            command=state.command,
+            root=state.root,
+            processes=state.processes,
+            file_changes=state.file_changes,
+            network=state.network,
+            result_code=state.result_code,
+            stderr=state.stderr,
+            already_processed=state.already_processed,
+            action_suggested=snapshot_actions(state.action_suggested),
+            action_post_suggested=snapshot_actions(state.action_post_suggested))
+        self.values_executed = tuple(state.values_executed)
+        self.suggested_executed = state.suggested_executed
+        self.__dict__['_frozen'] = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(f"{self.__class__.__name__} is read only")
+        super().__setattr__(name, value)
+
+    def snapshot(self) -> 'StateSnapshot':
+        return self
+
+
+def snapshot_actions(actions: Optional[Union[Action, List[Union[Action, List[Action]]]]]):
+    """copy of the actions, the fields of an action are immutable values"""
+    if actions is None:
+        return None
+    if isinstance(actions, list):
+        return [snapshot_actions(action) for action in actions]
+    return actions.copy()
+
+
 class TerminalReplayMemory:
     def __init__(self, command: State, agent_names: List[str],
                  candidate_actions: Optional[List[Union[Action, List[Action]]]],
                  force_response: bool, suggested_command: Optional[Action]):
-        self.command = deepcopy(command)
-        self.agent_names = agent_names
-        self.candidate_actions = deepcopy(candidate_actions)
+        self.command = command.snapshot()
+        self.agent_names = list(agent_names)
+        self.candidate_actions = snapshot_actions(candidate_actions)
         self.force_response = force_response
-        self.suggested_command = deepcopy(suggested_command)
+        self.suggested_command = snapshot_actions(suggested_command)
 
 
 class TerminalReplayMemoryComplete:
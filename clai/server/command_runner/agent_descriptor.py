@@ -7,7 +7,8 @@
 
 # pylint: disable=too-few-public-methods,too-many-arguments,dangerous-default-value,too-many-instance-attributes
 class AgentDescriptor:
-    def __init__(self, pkg_name, name, exclude=[], description="", installed=False, default=False, z_default=False):
+    def __init__(self, pkg_name, name, exclude=[], description="", installed=False, default=False, z_default=False,
+                 latency_budget=None, decisive=False, isolation='thread'):
         self.pkg_name = pkg_name
         self.name = name
         self.description = description
@@ -16,3 +17,6 @@ class AgentDescriptor:
         self.installed = installed
         self.exclude = exclude
         self.ready = False
+        self.latency_budget = latency_budget
+        self.decisive = decisive
+        self.isolation = isolation
@@ -4,21 +4,49 @@
 # See LICENSE.txt file in the root directory
 # of this source tree for licensing information.
 #
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 from clai.datasource.server_status_datasource import ServerStatusDatasource
 from clai.server.command_message import State, Action, ProcessesValues, FilesChangesValues, NetworkValues
 from clai.server.command_runner.command_runner import CommandRunner, PostCommandRunner
+from clai.server.tracer import Tracer, current_tracer
+
+
+def format_trace(spans: List[dict]) -> str:
+    """the spans of a command as a tree, with the duration of each one"""
+    span_ids = {span['span_id'] for span in spans}
+    children: Dict[Optional[str], List[dict]] = {}
+    for span in sorted(spans, key=lambda span: span['start_time_unix_nano']):
+        parent = span['parent_span_id'] if span['parent_span_id'] in span_ids else None
+        children.setdefault(parent, []).append(span)
+
+    attributes = {}
+    for span in spans:
+        attributes.update(span['attributes'])
+    lines = [f"{attributes.get('command', '')} ({attributes.get('command_id', spans[0]['trace_id'])})"]
+
+    def add_lines(parent: Optional[str], depth: int):
+        for span in children.get(parent, []):
+            elapsed = (span['end_time_unix_nano'] - span['start_time_unix_nano']) / 1e6
+            detail = span['attributes'].get('agent') or span['attributes'].get('orchestrator')
+            name = f"{span['name']} {detail}" if detail else span['name']
+            lines.append(f"{'  ' * depth}{name}: {elapsed:.3f} ms")
+            add_lines(span['span_id'], depth + 1)
+
+    add_lines(None, 1)
+    return '\n'.join(lines)
 
 
 # pylint: disable=too-few-public-methods
 class ClaiLastInfoCommandRunner(CommandRunner, PostCommandRunner):
     LAST_DIRECTIVE_DIRECTIVE = 'clai last-info'
+    TIMING_DIRECTIVE = 'timing'
 
-    def __init__(self, server_status_datasource: ServerStatusDatasource):
+    def __init__(self, server_status_datasource: ServerStatusDatasource, tracer: Tracer = current_tracer):
         self.server_status_datasource = server_status_datasource
+        self.tracer = tracer
 
     def execute(self, state: State) -> Action:
         return Action(suggested_command=":",
@@ -28,6 +56,9 @@ class ClaiLastInfoCommandRunner(CommandRunner, PostCommandRunner):
 
     def execute_post(self, state: State) -> Action:
         offset_last = state.command.replace(f'{self.LAST_DIRECTIVE_DIRECTIVE}', '').strip()
+        if offset_last.startswith(self.TIMING_DIRECTIVE):
+            return self.__timing(state, offset_last[len(self.TIMING_DIRECTIVE):].strip())
+
         if not offset_last:
             offset_last = '0'
 
@@ -58,6 +89,16 @@ class ClaiLastInfoCommandRunner(CommandRunner, PostCommandRunner):
             description=str(info_to_show.json())
         )
 
+    def __timing(self, state: State, last_commands: str) -> Action:
+        count = int(last_commands) if last_commands.isdigit() else 1
+        traces = self.tracer.recent_traces(count, user_name=state.user_name, exclude_command_id=state.command_id)
+        if not traces:
+            return Action(description='no traces of the last commands')
+
+        return Action(
+            description='\n\n'.join(format_trace(spans) for spans in traces)
+        )
+
 
 class InfoDebug(BaseModel):
     command_id: str
@@ -7,6 +7,7 @@
 from clai.server.agent_datasource import AgentDatasource
 from clai.server.command_message import State, Action
 from clai.server.command_runner.command_runner import CommandRunner
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
 
 # pylint: disable=too-few-public-methods
 from clai.tools.colorize_console import Colorize
@@ -14,11 +15,13 @@ from clai.tools.colorize_console import Colorize
 
 class ClaiReloadCommandRunner(CommandRunner):
 
-    def __init__(self, agent_datasource: AgentDatasource):
+    def __init__(self, agent_datasource: AgentDatasource, orchestrator_provider: OrchestratorProvider):
         self.agent_datasource = agent_datasource
+        self.orchestrator_provider = orchestrator_provider
 
     def execute(self, state: State) -> Action:
         self.agent_datasource.reload()
+        self.orchestrator_provider.reload_shadow_orchestrators()
 
         text = Colorize() \
             .complete() \
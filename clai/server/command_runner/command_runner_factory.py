@@ -47,7 +47,7 @@ class CommandRunnerFactory:
             "auto": ClaiPowerCommandRunner(server_status_datasource),
             "install": ClaiInstallCommandRunner(agent_datasource),
             "last-info": ClaiLastInfoCommandRunner(server_status_datasource),
-            "reload": ClaiReloadCommandRunner(agent_datasource),
+            "reload": ClaiReloadCommandRunner(agent_datasource, orchestrator_provider),
             "help": ClaiHelpCommandRunner()
         }
         self.clai_post_commands: Dict[str, PostCommandRunner] = {
@@ -5,20 +5,118 @@
 # of this source tree for licensing information.
 #
 
+import atexit
+import itertools
 import logging
 import logging.handlers as handlers
 import os
+import queue
+import sys
+import threading
+from typing import Dict, Optional
+
+PAYLOAD = 'payload'
+
+
+def parse_levels(levels: Optional[str]) -> Dict[str, int]:
+    """levels by category from a text like 'payload=DEBUG,search=WARNING'"""
+    parsed = {}
+    for item in (levels or '').split(','):
+        category, _, level = item.partition('=')
+        if category.strip() and level.strip():
+            parsed[category.strip()] = logging.getLevelName(level.strip().upper())
+    return {category: level for category, level in parsed.items() if isinstance(level, int)}
+
+
+def _caller():
+    """file, line and function of the first frame outside this module"""
+    # pylint: disable=protected-access
+    frame = sys._getframe(1)
+    while frame is not None and os.path.normcase(frame.f_code.co_filename) == _SOURCE_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return '(unknown file)', 0, '(unknown function)'
+    return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
+
+
+_SOURCE_FILE = os.path.normcase(_caller.__code__.co_filename)
+
+
+def _handle(category_logger: logging.Logger, level: int, text, args):
+    """logs the record with the caller of Logger as its origin, like the stacklevel of python 3.8"""
+    filename, lineno, func = _caller()
+    record = category_logger.makeRecord(category_logger.name, level, filename, lineno, text, args, None, func)
+    category_logger.handle(record)
+
+
+class _CappedPayload:
+    """formatted only when the record is written, and cut to max_length characters"""
+
+    def __init__(self, payload, max_length: int):
+        self.payload = payload
+        self.max_length = max_length
+
+    def __str__(self):
+        text = self.payload.decode('utf8', 'replace') if isinstance(self.payload, bytes) else str(self.payload)
+        if len(text) <= self.max_length:
+            return text
+        return f"{text[:self.max_length]}... ({len(text)} chars)"
+
+
+class _DroppingQueueHandler(handlers.QueueHandler):
+    """enqueues the records without formatting them, drops them when the writer is behind"""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 class Logger:
+    """
+    Once the server calls start(), the records are put in a queue and written to
+    the rotating file by a background thread, so the callers never wait for the
+    disk; until then (and in the short-lived clients) they are written directly,
+    without a thread. The messages use
+    the logging %-style arguments, which are only formatted in that thread and
+    only if the record is enabled: the arguments must not change after the call.
+
+    Each category (e.g. logger.info("...", category='search')) has its own level,
+    set in CLAI_LOG_LEVELS like 'search=DEBUG,payload=DEBUG', the rest use
+    CLAI_LOG_LEVEL (INFO by default). The payloads (messages, requests and
+    responses) are logged with payload(), at DEBUG, so they are off by default;
+    when enabled only one in CLAI_LOG_PAYLOAD_SAMPLE is logged, cut to
+    CLAI_LOG_PAYLOAD_MAX characters.
+    """
     MAX_IN_MB = 100000000
+    QUEUE_SIZE = 10000
 
-    def __init__(self):
+    # pylint: disable=too-many-arguments
+    def __init__(self, log_file: Optional[str] = None, levels: Optional[str] = None,
+                 payload_sample: Optional[int] = None, payload_max_length: Optional[int] = None,
+                 name: str = 'clai_logger'):
 
         log_formatter = logging.Formatter(
             '%(asctime)s %(levelname)s %(funcName)s(%(lineno)d) %(message)s')
-        log_file = os.getenv('CLAI_LOG_FILE', '/var/tmp/app.log')
-        self.logger = logging.getLogger('clai_logger')
-        self.logger.setLevel(logging.INFO)
+        log_file = log_file or os.getenv('CLAI_LOG_FILE', '/var/tmp/app.log')
+        self.payload_sample = max(1, payload_sample or int(os.getenv('CLAI_LOG_PAYLOAD_SAMPLE', '1')))
+        self.payload_max_length = payload_max_length or int(os.getenv('CLAI_LOG_PAYLOAD_MAX', '1024'))
+        self.__payload_counters: Dict[str, itertools.count] = {}
+
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.getLevelName(os.getenv('CLAI_LOG_LEVEL', 'INFO').upper()))
+        self.logger.propagate = False
+        for category, level in parse_levels(levels or os.getenv('CLAI_LOG_LEVELS')).items():
+            self.logger.getChild(category).setLevel(level)
+
         self.log_handler = handlers.RotatingFileHandler(
             log_file,
             mode='a',
@@ -26,18 +124,77 @@ class Logger:
             backupCount=10,
             encoding=None,
             delay=0)
-        self.log_handler.setLevel(logging.INFO)
         self.log_handler.setFormatter(log_formatter)
+
         self.logger.addHandler(self.log_handler)
 
-    def info(self, text):
-        self.logger.info(text)
+        self.__records = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.queue_handler = _DroppingQueueHandler(self.__records)
+        self.__listener = None
+        self.__lock = threading.Lock()
+
+    def start(self):
+        """from now on the records are written by a background thread, until close()"""
+        with self.__lock:
+            if self.__listener is not None:
+                return
+            self.__listener = handlers.QueueListener(self.__records, self.log_handler)
+            self.__listener.start()
+            self.logger.removeHandler(self.log_handler)
+            self.logger.addHandler(self.queue_handler)
+        atexit.register(self.close)
+
+    def info(self, text, *args, category: Optional[str] = None):
+        self.__log(logging.INFO, category, text, args)
+
+    def warning(self, text, *args, category: Optional[str] = None):
+        self.__log(logging.WARNING, category, text, args)
+
+    def debug(self, text, *args, category: Optional[str] = None):
+        self.__log(logging.DEBUG, category, text, args)
+
+    def payload(self, text, *args, category: str = PAYLOAD):
+        """logs at DEBUG one in payload_sample calls, with each argument cut to payload_max_length"""
+        category_logger = self.__category_logger(category)
+        if not category_logger.isEnabledFor(logging.DEBUG):
+            return
+
+        counter = self.__payload_counters.setdefault(category, itertools.count())
+        if next(counter) % self.payload_sample:
+            return
+
+        capped = tuple(_CappedPayload(arg, self.payload_max_length) for arg in args)
+        _handle(category_logger, logging.DEBUG, text, capped)
+
+    def is_enabled(self, level: int, category: Optional[str] = None) -> bool:
+        return self.__category_logger(category).isEnabledFor(level)
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped
+
+    def flush(self):
+        """blocks until the records logged are written"""
+        self.__records.join()
+
+    def close(self):
+        with self.__lock:
+            if self.__listener is None:
+                return
+            self.__listener.stop()
+            self.__listener = None
+            # what is logged while the process exits is written directly
+            self.logger.removeHandler(self.queue_handler)
+            self.logger.addHandler(self.log_handler)
+        atexit.unregister(self.close)
 
-    def warning(self, text):
-        self.logger.warning(text)
+    def __category_logger(self, category: Optional[str]) -> logging.Logger:
+        return self.logger.getChild(category) if category else self.logger
 
-    def debug(self, text):
-        self.logger.debug(text)
+    def __log(self, level: int, category: Optional[str], text, args):
+        category_logger = self.__category_logger(category)
+        if category_logger.isEnabledFor(level):
+            _handle(category_logger, level, text, args)
 
 
 # pylint: disable= invalid-name
@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import struct
+from typing import List
+
+PROTOCOL_VERSION = 1
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# version (1 byte) + payload length (4 bytes, network order)
+HEADER = struct.Struct('!BI')
+
+
+def encode_frame(payload: bytes) -> bytes:
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"frame too big: {len(payload)} bytes")
+    return HEADER.pack(PROTOCOL_VERSION, len(payload)) + payload
+
+
+class FrameDecoder:
+    """Reassembles length prefixed frames from a stream of arbitrary chunks"""
+
+    def __init__(self):
+        self.__buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self.__buffer.extend(data)
+        frames = []
+        while len(self.__buffer) >= HEADER.size:
+            version, length = HEADER.unpack_from(self.__buffer)
+            if version != PROTOCOL_VERSION:
+                raise ValueError(f"unsupported protocol version: {version}")
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"frame too big: {length} bytes")
+
+            end = HEADER.size + length
+            if len(self.__buffer) < end:
+                break
+
+            frames.append(bytes(self.__buffer[HEADER.size:end]))
+            del self.__buffer[:end]
+
+        return frames
+
+    def has_pending(self) -> bool:
+        return bool(self.__buffer)
@@ -5,8 +5,9 @@
 # of this source tree for licensing information.
 #
 
+import asyncio
 import traceback
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 
 from clai.datasource.server_status_datasource import ServerStatusDatasource
 from clai.server.agent_datasource import AgentDatasource
@@ -16,8 +17,9 @@ from clai.datasource.server_pending_actions_datasource import ServerPendingActio
 from clai.server.agent_runner import AgentRunner
 from clai.server.command_message import State, Action
 from clai.server.command_runner.command_runner_factory import CommandRunnerFactory
-from clai.tools.file_util import read_history
+from clai.tools.file_util import history_reader
 from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.tracer import current_tracer as tracer
 
 STOP_COMMAND = 'clai stop'
 
@@ -32,6 +34,8 @@ class MessageHandler:
         self.agent_runner = AgentRunner(self.agent_datasource, orchestrator_provider)
         self.server_status_datasource = server_status_datasource
         self.server_pending_actions_datasource = ServerPendingActionsDatasource()
+        self.__user_locks: Dict[str, asyncio.Lock] = {}
+        self.__user_messages: Dict[str, int] = {}
         self.command_runner_factory = CommandRunnerFactory(
             self.agent_datasource,
             config_storage,
@@ -71,14 +75,14 @@ class MessageHandler:
             message.previous_execution = self.server_status_datasource.get_last_message(message.user_name)
             actions = self.__process_command_ai(message)
             message.mark_as_processed()
-            logger.info(f"after setting info: {message.is_already_processed()}")
+            logger.debug("after setting info: %s", message.is_already_processed())
             self.server_status_datasource.store_info(message)
             action = self.server_pending_actions_datasource.store_pending_actions(
                 message.command_id,
                 actions,
                 message.user_name)
         else:
-            logger.info(f"we have pending action")
+            logger.debug("we have pending action")
             action = self.server_pending_actions_datasource.get_next_action(message.command_id, message.user_name)
 
         if action is None:
@@ -99,20 +103,42 @@ class MessageHandler:
         return action
 
     def process_message(self, message: State) -> Action:
-        try:
-            message = self.server_status_datasource.store_info(message)
-            if message.is_post_process():
-                message = self.server_status_datasource.find_message_stored(message.command_id, message.user_name)
-                return self.process_post_command(message)
-            if message.is_command():
-                return self.__process_command(message)
-
-        # pylint: disable=broad-except
-        except Exception as ex:
-            logger.info(f"error processing message {ex}")
-            logger.info(traceback.format_exc())
+        with tracer.span('process_message'):
+            try:
+                message = self.server_status_datasource.store_info(message)
+                if message.is_post_process():
+                    message = self.server_status_datasource.find_message_stored(message.command_id, message.user_name)
+                    return self.process_post_command(message)
+                if message.is_command():
+                    return self.__process_command(message)
+
+            # pylint: disable=broad-except
+            except Exception as ex:
+                logger.info(f"error processing message {ex}")
+                logger.info(traceback.format_exc())
+
+            return Action(origin_command=message.command)
+
+    def process_message_async(self, message: State) -> Awaitable[Action]:
+        # wrapped now, so the executor thread records its spans in the trace of the command
+        return self.__process_in_order(message, tracer.wrap(self.process_message))
+
+    async def __process_in_order(self, message: State, process_message: Callable[[State], Action]) -> Action:
+        # the messages of a user keep their order, the rest run in parallel off the event loop; the lock of a
+        # user is dropped when none of their messages is in progress, so there is only one per active user
+        user_name = message.user_name
+        if user_name not in self.__user_locks:
+            self.__user_locks[user_name] = asyncio.Lock()
+        self.__user_messages[user_name] = self.__user_messages.get(user_name, 0) + 1
 
-        return Action(origin_command=message.command)
+        try:
+            async with self.__user_locks[user_name]:
+                return await asyncio.get_event_loop().run_in_executor(None, process_message, message)
+        finally:
+            self.__user_messages[user_name] -= 1
+            if not self.__user_messages[user_name]:
+                del self.__user_messages[user_name]
+                del self.__user_locks[user_name]
 
     def find_value(self, lines, message: State) -> Optional[int]:
         for i in reversed(range(len(lines))):
@@ -121,7 +147,7 @@ class MessageHandler:
         return None
 
     def complete_history(self, message: State):
-        lines = read_history()
+        lines = history_reader.read_tail()
 
         index = self.find_value(lines, message)
 
@@ -7,14 +7,24 @@
 
 from abc import ABC, abstractmethod
 from typing import Optional, List, Union
+import copy
+import hashlib
 import os
-import shutil
-import pickle
 
+from clai.server.checkpoint_manager import checkpoint_manager
 from clai.server.command_message import NOOP_COMMAND, State, TerminalReplayMemory, Action, BASEDIR, \
     TerminalReplayMemoryComplete
 
 
+def suggestion_of(action: Optional[Union[Action, List[Action]]], replay: TerminalReplayMemory) -> Optional[str]:
+    """command suggested by the action, None when it keeps the command of the user"""
+    if isinstance(action, list):
+        action = action[0] if action else None
+    if action is None or not action.suggested_command or action.suggested_command == replay.command.command:
+        return None
+    return action.suggested_command
+
+
 # pylint: disable=too-many-arguments
 class Orchestrator(ABC):
 
@@ -23,6 +33,8 @@ class Orchestrator(ABC):
         self._save_basedir = os.path.join(BASEDIR, 'saved_orchestrators')
         self._save_dirpath = os.path.join(self._save_basedir, self.orchestrator_name)
         self.noop_command = NOOP_COMMAND
+        self.decisive_confidence = 1.0
+        checkpoint_manager.register(self)
 
     # pylint: disable=no-self-use
     def get_orchestrator_state(self):
@@ -35,6 +47,27 @@ class Orchestrator(ABC):
                       force_response: bool, pre_post_state: str) -> Optional[Union[Action, List[Action]]]:
         """Choose an action and agent name for CLAI to respond with"""
 
+    def can_decide(self, candidate_actions: List[Union[Action, List[Action]]], decisive_agents: List[str]) -> bool:
+        """
+        Tells if the candidates received so far are enough to choose an action,
+        so the agents that are still running are not awaited
+        :param candidate_actions: Actions returned by the agents that already finished
+        :param decisive_agents: Names of the agents declared as decisive in their manifest
+        :return: True to stop waiting for the rest of the agents
+        """
+        for action in candidate_actions:
+            owner = self._agent_owner(action)
+            if owner in decisive_agents and self.__calculate_confidence__(action) >= self.decisive_confidence:
+                return True
+        return False
+
+    @staticmethod
+    def _agent_owner(action: Union[Action, List[Action]]) -> Optional[str]:
+        """owner of the action, or of the first one when the agent answered a list"""
+        if isinstance(action, Action):
+            return action.agent_owner
+        return action[0].agent_owner if action else None
+
     def record_transition(self,
                           prev_state: TerminalReplayMemoryComplete,
                           current_state_pre: TerminalReplayMemory) -> None:
@@ -47,64 +80,33 @@ class Orchestrator(ABC):
 
     def save(self):
         """Save the orchestrator state"""
-        return self.__save_orchestrator__()
+        return checkpoint_manager.save(self._save_dirpath, self.get_orchestrator_state())
+
+    def save_checkpoint(self):
+        return self.save()
 
     def load(self):
         """Load the orchestrator state"""
-        return self.__load_saved_orchestrator__()
-
-    def __prepare_state_folder__(self):
-
-        os.makedirs(self._save_dirpath, exist_ok=True)
+        return checkpoint_manager.load(self._save_dirpath)
 
-        for filename in os.listdir(self._save_dirpath):
-            filepath = os.path.join(self._save_dirpath, filename)
-            try:
-                shutil.rmtree(filepath)
-            except OSError:
-                os.remove(filepath)
+    def load_state(self):
+        """Restores the state returned by load, it is used again when the state folder changes"""
 
-    def __save_orchestrator__(self) -> bool:
-        """Saves agent state into persisting memory"""
-        try:
-            state = self.get_orchestrator_state()
-            if not state:
-                return True
-
-            self.__prepare_state_folder__()
-
-            for var_name, value in state.items():
-                with open(f'{self._save_dirpath}/{var_name}.p', 'wb') as file:
-                    pickle.dump(value, file)
-
-        # pylint: disable=broad-except
-        except Exception:
-            return False
-        else:
-            return True
-
-    def __load_saved_orchestrator__(self) -> dict:
-
-        orchestrator_state = {}
+    def user_save_dirpath(self, user_name: str) -> str:
+        """folder of the state of the user, named by the hash of the user name so any name is a safe folder"""
+        user_dirname = hashlib.sha256(user_name.encode('utf8')).hexdigest()
+        return os.path.join(self._save_basedir, 'users', user_dirname, self.orchestrator_name)
 
-        files = []
-        if os.path.exists(self._save_dirpath):
-            files = [file for file in os.listdir(self._save_dirpath)
-                     if os.path.isfile(os.path.join(self._save_dirpath, file))]
-
-        for filename in files:
-            try:
-                key = os.path.splitext(filename)[0]  # filename without extension
-                with open(os.path.join(self._save_dirpath, filename), 'rb') as file:
-                    orchestrator_state[key] = pickle.load(file)
-            # pylint: disable=bare-except
-            except:
-                pass
-
-        return orchestrator_state
-
-    def __del__(self):
-        self.save()
+    def clone_for_user(self, user_name: str) -> 'Orchestrator':
+        """
+        Copy of the orchestrator that saves its state in the folder of the user. It
+        starts from the state saved there or, if there is none, from the current one
+        """
+        clone = copy.deepcopy(self)
+        clone._save_dirpath = self.user_save_dirpath(user_name)
+        if os.path.isdir(clone._save_dirpath):
+            clone.load_state()
+        return clone
 
     @staticmethod
     def __calculate_confidence__(action_to_calculate: Union[Action, List[Action]]):
@@ -1,6 +1,7 @@
 #pylint: disable=too-few-public-methods
 class OrchestratorDescriptor:
-    def __init__(self, name: str, exclude: bool, description: str):
+    def __init__(self, name: str, exclude: bool, description: str, per_user: bool = False):
         self.name = name
         self.exclude = exclude
         self.description = description
+        self.per_user = per_user
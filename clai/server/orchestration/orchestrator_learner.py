@@ -0,0 +1,87 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import queue
+import threading
+import time
+from typing import Optional
+
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.logger import current_logger as logger
+from clai.server.orchestration.orchestrator import Orchestrator
+from clai.server.orchestration.replay_log import ReplayLog
+
+
+class OrchestratorLearner:
+    """
+    Applies the transitions recorded for the orchestrators in a background thread,
+    so the learning and the checkpoints are not part of the response time. The
+    transitions are taken in batches of up to BATCH_SIZE, but the lock of the
+    orchestrators is held for one transition at a time, so a command waits for
+    one transition at most. The orchestrators that learned are marked dirty for
+    the checkpoint manager, and the transitions are appended to the replay log,
+    if there is one, without the lock. When the queue is full the new
+    transitions are dropped.
+    """
+    QUEUE_SIZE = 1000
+    BATCH_SIZE = 32
+
+    def __init__(self, orchestrator_lock: Optional[threading.Lock] = None, replay_log: Optional[ReplayLog] = None):
+        self.orchestrator_lock = orchestrator_lock or threading.Lock()
+        self.replay_log = replay_log
+        self.transitions = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.__thread = None
+        self.__start_lock = threading.Lock()
+
+    def record_transition(self, orchestrator: Orchestrator, prev_state: TerminalReplayMemoryComplete,
+                          current_state_pre: TerminalReplayMemory):
+        self.__start()
+        try:
+            self.transitions.put_nowait((orchestrator, prev_state, current_state_pre))
+        except queue.Full:
+            logger.info("orchestrator learner is behind, transition dropped")
+
+    def wait(self):
+        """blocks until the transitions received are applied and the orchestrators saved"""
+        self.transitions.join()
+        checkpoint_manager.checkpoint()
+
+    def __start(self):
+        with self.__start_lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, name='orchestrator-learner', daemon=True)
+                self.__thread.start()
+
+    def __loop(self):
+        while True:
+            batch = [self.transitions.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.transitions.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.__learn(batch)
+            finally:
+                for _ in batch:
+                    self.transitions.task_done()
+
+    def __learn(self, batch):
+        for orchestrator, prev_state, current_state_pre in batch:
+            with self.orchestrator_lock:
+                try:
+                    orchestrator.record_transition(prev_state, current_state_pre)
+                    checkpoint_manager.mark_dirty(orchestrator, self.orchestrator_lock)
+                # pylint: disable=broad-except
+                except Exception as err:
+                    logger.info(f"error recording transition in {orchestrator.orchestrator_name}: {err}")
+            if self.replay_log:
+                self.replay_log.append(prev_state)
+            # gives the commands waiting for the lock a chance to take it before the next transition
+            time.sleep(0)
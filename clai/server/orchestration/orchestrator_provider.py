@@ -10,10 +10,12 @@ from abc import ABC
 import importlib
 import inspect
 import pkgutil as pkg
-from typing import List
+from typing import List, Optional
 
 from clai.server.agent_datasource import AgentDatasource
+from clai.server.logger import current_logger as logger
 from clai.server.orchestration.orchestrator import Orchestrator
+from clai.server.orchestration.per_user_orchestrator import PerUserOrchestrator
 
 # pylint: disable=too-few-public-methods
 import clai.server.orchestration.patterns as pattern
@@ -25,11 +27,15 @@ class OrchestratorProvider(ABC):
         self.agent_datasource = agent_datasource
         self.__current_orchestrator_name = None
         self.orchestrator_instances = {}
+        self.__failed_shadows = set()
+        self.__shadow_names: Optional[List[str]] = None
 
     def select_orchestrator(self, name: str):
         if name == self.__current_orchestrator_name:
             return
 
+        self.__shadow_names = None
+
         if name in self.orchestrator_instances:
             self.__current_orchestrator_name = name
         else:
@@ -51,6 +57,43 @@ class OrchestratorProvider(ABC):
 
         return self.get_orchestrator_instance(self.__current_orchestrator_name)
 
+    def get_shadow_orchestrator_names(self) -> List[str]:
+        """the configuration is read once, and again after reload_shadow_orchestrators or select_orchestrator"""
+        if self.__shadow_names is None:
+            self.__shadow_names = self.agent_datasource.get_shadow_orchestrators()
+
+        current_orchestrator_name = self.get_current_orchestrator_name()
+        return [name for name in self.__shadow_names
+                if name != current_orchestrator_name and name not in self.__failed_shadows]
+
+    def reload_shadow_orchestrators(self):
+        """reads the shadow orchestrators of the configuration again, and retries the ones that failed"""
+        self.__shadow_names = None
+        self.__failed_shadows = set()
+
+    def get_shadow_orchestrators(self) -> List[Orchestrator]:
+        """
+        Returns the instances of the shadow orchestrators, the ones that can't be
+        loaded are logged once and left out
+        """
+        shadows = []
+        for name in self.get_shadow_orchestrator_names():
+            orchestrator = self.orchestrator_instances.get(name)
+            if orchestrator is None:
+                try:
+                    orchestrator = self.get_orchestrator_instance(name)
+                # pylint: disable=broad-except
+                except Exception as err:
+                    logger.info(f"error loading the shadow orchestrator {name}: {err}")
+                    orchestrator = None
+
+            if orchestrator is None:
+                self.__failed_shadows.add(name)
+            else:
+                shadows.append(orchestrator)
+
+        return shadows
+
     def get_orchestrator_instance(self, orchestrator_name: str):
         """
         Returns an instance of the requested orchestration pattern
@@ -64,8 +107,12 @@ class OrchestratorProvider(ABC):
         )
 
         for _, class_member in inspect.getmembers(orchestrator_mods, inspect.isclass):
-            if issubclass(class_member, Orchestrator) and (class_member is not Orchestrator):
+            if issubclass(class_member, Orchestrator) and (class_member is not Orchestrator) and \
+                    (class_member is not PerUserOrchestrator):
                 class_member = class_member()
+                orchestrator_plugin = os.path.join(self.get_path()[0], orchestrator_name)
+                if self.load_descriptors(orchestrator_plugin, orchestrator_name).per_user:
+                    class_member = PerUserOrchestrator(class_member)
                 self.orchestrator_instances[orchestrator_name] = class_member
                 return class_member
 
@@ -98,10 +145,15 @@ class OrchestratorProvider(ABC):
             if config_parser.has_option('DEFAULT', 'description'):
                 description = config_parser.get('DEFAULT', 'description')
 
+            per_user = False
+            if config_parser.has_option('DEFAULT', 'per_user'):
+                per_user = config_parser.getboolean('DEFAULT', 'per_user')
+
             return OrchestratorDescriptor(
                 name=name,
                 exclude=exclude,
-                description=description
+                description=description,
+                per_user=per_user
             )
 
         return OrchestratorDescriptor(
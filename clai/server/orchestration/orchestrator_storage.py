@@ -1,15 +1,23 @@
-from typing import List
+import threading
+from typing import List, Optional
 
 from clai.datasource.action_remote_storage import ActionRemoteStorage
 from clai.server.command_message import TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.orchestration.orchestrator_learner import OrchestratorLearner
 from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.orchestration.replay_log import ReplayLog, default_replay_log
+from clai.server.orchestration.shadow_orchestrators import ShadowOrchestrators
 
 
 class OrchestratorStorage:
-    def __init__(self, orchestrator_provider: OrchestratorProvider, remote_storage: ActionRemoteStorage):
+    def __init__(self, orchestrator_provider: OrchestratorProvider, remote_storage: ActionRemoteStorage,
+                 orchestrator_lock: Optional[threading.Lock] = None, replay_log: Optional[ReplayLog] = None):
         self._memory: List[TerminalReplayMemoryComplete] = []
         self.orchestrator_provider = orchestrator_provider
         self.remote_storage = remote_storage
+        self.replay_log = replay_log if replay_log is not None else default_replay_log()
+        self.learner = OrchestratorLearner(orchestrator_lock, self.replay_log)
+        self.shadows = ShadowOrchestrators(orchestrator_provider)
 
     def store_pre(self, replay_pre: TerminalReplayMemory):
         terminal_replay_complete = TerminalReplayMemoryComplete()
@@ -25,5 +33,6 @@ class OrchestratorStorage:
         if len(self._memory) > 1:
             previous_replay = self._memory.pop(0)
             orchestrator = self.orchestrator_provider.get_current_orchestrator()
-            orchestrator.record_transition(previous_replay, current_pre)
+            self.learner.record_transition(orchestrator, previous_replay, current_pre)
+            self.shadows.record_transition(previous_replay, current_pre)
             self.remote_storage.store(previous_replay.post_replay)
@@ -34,6 +34,12 @@ class PreferenceOrchestrator(Orchestrator):
         self.threshold = config['threshold']
         self.preferences = config['preferences']
 
+    def can_decide(self, candidate_actions: List[Union[Action, List[Action]]], decisive_agents: List[str]) -> bool:
+        # a skill preferred over the decisive one could still answer
+        subordinated = [preference[1] for preference in self.preferences]
+        candidates = [action for action in candidate_actions if self._agent_owner(action) not in subordinated]
+        return super().can_decide(candidates, decisive_agents)
+
     def choose_action(self, command: State, agent_names: List[str],
                       candidate_actions: Optional[List[Union[Action, List[Action]]]],
                       force_response: bool, pre_post_state: str) -> Optional[Action]:
@@ -13,12 +13,14 @@ to calibrate the selector for CLAI skills
 from typing import Optional, List, Union
 from pathlib import Path
 
+import hashlib
 import os
 import json
 import numpy as np
 
 from rltk import instantiate_from_file      # pylint: disable=import-error
 
+from clai.server.checkpoint_manager import checkpoint_manager
 from clai.server.orchestration.orchestrator import Orchestrator
 from clai.server.command_message import State, Action
 from clai.server.command_message import TerminalReplayMemory, TerminalReplayMemoryComplete
@@ -43,6 +45,7 @@ class RLTKBandit(Orchestrator):
         self._warm_start = None
         self._warm_start_type = None
         self._warm_start_kwargs = None
+        self._warm_start_key = None
         self._reward_match_threshold = None
 
         self.load_bandit_state()
@@ -65,7 +68,8 @@ class RLTKBandit(Orchestrator):
         state = {
             'agent': self._agent,
             'action_order': self._action_order,
-            'warm_start': self._warm_start
+            'warm_start': self._warm_start,
+            'warm_start_key': self._warm_start_key
         }
         return state
 
@@ -84,11 +88,13 @@ class RLTKBandit(Orchestrator):
 
         self._n_actions = self._agent.num_actions
         self._warm_start = state.get('warm_start', self._warm_start)
+        self._warm_start_key = state.get('warm_start_key', None)
 
     def warm_start_orchestrator(self):
         """
         Warm starts the orchestrator (pre-trains the weights) to suit a
-        particular profile
+        particular profile. The warm started models are cached by profile and
+        kwargs, so the orchestrator is only trained again when they change
         """
 
         def noop_setup():
@@ -141,18 +147,48 @@ class RLTKBandit(Orchestrator):
             method = warm_start_methods[self._warm_start_type.lower()]
             profile, kwargs = method(**self._warm_start_kwargs)
 
-            tids, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
-                profile, **kwargs
-            )
+            warm_start_key = self.__warm_start_key__(profile, kwargs)
+
+            # saved before the key was stored, or with the warm start disabled
+            if self._warm_start_key is None and not self._warm_start:
+                self._warm_start_key = warm_start_key
+
+            if self._warm_start_key == warm_start_key:
+                return
+
+            cache_dirpath = os.path.join(self._save_dirpath, 'warm_start', warm_start_key)
+            warm_started_agent = checkpoint_manager.load(cache_dirpath).get('agent', None)
+            if warm_started_agent is None:
+                if self._warm_start_key is not None:
+                    # the profile changed, the new one is not trained on top of the old one
+                    self._agent = instantiate_from_file(self._config_filepath)
+
+                tids, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
+                    profile, **kwargs
+                )
+
+                self._agent.warm_start(tids, arm_rewards, contexts=contexts)
+                checkpoint_manager.save(cache_dirpath, {'agent': self._agent})
+            else:
+                self._agent = warm_started_agent
 
-            self._agent.warm_start(tids, arm_rewards, contexts=contexts)
             self._warm_start = False
+            self._warm_start_key = warm_start_key
 
             self.save()
         except Exception as err:
             logger.warning('Exception in warm starting orchestrator. Error: ' + str(err))
             raise err
 
+    def __warm_start_key__(self, profile, kwargs):
+
+        with open(self._config_filepath, 'rb') as config_file:
+            agent_config = config_file.read()
+
+        key = hashlib.sha1(json.dumps([profile, kwargs], sort_keys=True, default=str).encode('utf8'))
+        key.update(agent_config)
+        return key.hexdigest()
+
     def choose_action(self,
                       command: State, agent_names: List[str],
                       candidate_actions: Optional[List[Union[Action, List[Action]]]],
@@ -1,36 +1,37 @@
 import numpy as np
 
 
-def get_noop_warmstart_data(n_points, context_size, noop_position):
-    """ generates warm start data for noop behavior """
+def _shuffled_data(n_points, contexts, arms, rewards):
+    """ returns the rows selected by a random permutation as tids, contexts and (arm, reward) pairs """
 
-    confidence_vals = np.random.rand(n_points, context_size)
+    # randomise order
+    idxorder = np.random.permutation(n_points)
 
-    data_tids = []
-    data_contexts = []
-    data_arm_rewards = []
-    tid = 0
+    data_tids = [f'warm-start-tid-{tid}' for tid in idxorder]
+    data_arm_rewards = list(zip(arms[idxorder].tolist(), rewards[idxorder].tolist()))
 
-    for i in range(n_points):
-        confs = confidence_vals[i]
+    return data_tids, contexts[idxorder], data_arm_rewards
 
-        for arm in range(context_size):
-            data_tids.append(f'warm-start-tid-{tid}')
-            reward = 1.0 if arm == noop_position else -1.0
 
-            data_contexts.append(confs)
-            data_arm_rewards.append((arm, reward))
+def _one_row_per_arm(confidence_vals, rewarded_arms):
+    """ repeats every context once per arm, rewarding only the arm given for the context """
 
-            tid += 1
+    n_points, context_size = confidence_vals.shape
 
-    # randomise order
-    idxorder = np.random.permutation(n_points)
+    contexts = np.repeat(confidence_vals, context_size, axis=0)
+    arms = np.tile(np.arange(context_size), n_points)
+    rewards = np.where(arms == np.repeat(rewarded_arms, context_size), 1.0, -1.0)
 
-    data_tids = [data_tids[i] for i in idxorder]
-    data_contexts = [data_contexts[i] for i in idxorder]
-    data_arm_rewards = [data_arm_rewards[i] for i in idxorder]
+    return contexts, arms, rewards
 
-    return data_tids, np.array(data_contexts), data_arm_rewards
+
+def get_noop_warmstart_data(n_points, context_size, noop_position):
+    """ generates warm start data for noop behavior """
+
+    confidence_vals = np.random.rand(n_points, context_size)
+    contexts, arms, rewards = _one_row_per_arm(confidence_vals, np.full(n_points, noop_position))
+
+    return _shuffled_data(n_points, contexts, arms, rewards)
 
 
 def get_ignore_skill_warmstart_data(n_points, context_size, skill_idx):
@@ -38,135 +39,68 @@ def get_ignore_skill_warmstart_data(n_points, context_size, skill_idx):
 
     confidence_vals = np.random.rand(n_points, context_size)
 
-    data_tids = []
-    data_contexts = []
-    data_arm_rewards = []
-    tid = 0
-
-    for i in range(n_points):
-        confs = confidence_vals[i]
-
-        confs_sortidx = np.argsort(confs)
-        max_confidx = confs_sortidx[-1]
-        second_max_confidx = confs_sortidx[-2]
-
-        # Negative reward on choosing the specified skill
-        reward = -1.0
-        data_tids.append(f'warm-start-tid-{tid}')
-        data_contexts.append(list(confs))
-        data_arm_rewards.append((skill_idx, reward))
-        tid += 1
-
-        # Positive reward on selecting the maximum skill
-        if max_confidx != skill_idx:
-            reward = +1.0
-            data_tids.append(f'warm-start-tid-{tid}')
-            data_contexts.append(list(confs))
-            data_arm_rewards.append((max_confidx, reward))
-            tid += 1
-        else:
-            reward = +1.0
-            data_tids.append(f'warm-start-tid-{tid}')
-            data_contexts.append(list(confs))
-            data_arm_rewards.append((second_max_confidx, reward))
-            tid += 1
+    confs_sortidx = np.argsort(confidence_vals, axis=1)
+    max_confidx = confs_sortidx[:, -1]
+    second_max_confidx = confs_sortidx[:, -2]
 
-    # randomise order
-    idxorder = np.random.permutation(n_points)
+    # Negative reward on choosing the specified skill and positive reward on
+    # selecting the maximum skill, or the second one when the maximum is the specified skill
+    rewarded_idx = np.where(max_confidx != skill_idx, max_confidx, second_max_confidx)
 
-    data_tids = [data_tids[i] for i in idxorder]
-    data_contexts = [data_contexts[i] for i in idxorder]
-    data_arm_rewards = [data_arm_rewards[i] for i in idxorder]
+    contexts = np.repeat(confidence_vals, 2, axis=0)
+    arms = np.column_stack([np.full(n_points, skill_idx), rewarded_idx]).ravel()
+    rewards = np.tile([-1.0, +1.0], n_points)
 
-    return data_tids, np.array(data_contexts), data_arm_rewards
+    return _shuffled_data(n_points, contexts, arms, rewards)
 
 
 def get_max_skill_warmstart_data(n_points, context_size):
     """ generates warm start data for always ignoring a skill behavior """
 
     confidence_vals = np.random.rand(n_points, context_size)
+    contexts, arms, rewards = _one_row_per_arm(confidence_vals, np.argmax(confidence_vals, axis=1))
 
-    data_tids = []
-    data_contexts = []
-    data_arm_rewards = []
-    tid = 0
-
-    for i in range(n_points):
-        confs = confidence_vals[i]
-        maxidx = np.argmax(confs)
-
-        for arm in range(context_size):
-            data_tids.append(f'warm-start-tid-{tid}')
-            reward = +1.0 if arm == maxidx else -1.0
-
-            data_contexts.append(confs)
-            data_arm_rewards.append((arm, reward))
+    return _shuffled_data(n_points, contexts, arms, rewards)
 
-            tid += 1
-
-    # randomise order
-    idxorder = np.random.permutation(n_points)
 
-    data_tids = [data_tids[i] for i in idxorder]
-    data_contexts = [data_contexts[i] for i in idxorder]
-    data_arm_rewards = [data_arm_rewards[i] for i in idxorder]
+def _swap_columns(values, first_idx, second_idx):
+    """ swaps values[i, first_idx[i]] and values[i, second_idx[i]] in every row """
 
-    return data_tids, np.array(data_contexts), data_arm_rewards
+    rows = np.arange(values.shape[0])
+    first_values = values[rows, second_idx]
+    second_values = values[rows, first_idx]
+    values[rows, first_idx] = first_values
+    values[rows, second_idx] = second_values
 
 
-#pylint: disable=too-many-locals
 def get_preferred_skill_warmstart_data(n_points, context_size, advantage_skillidx, disadvantage_skillidx):
     """ generates warm start data to prefer one skill over another behavior """
 
     confidence_vals = np.random.rand(n_points, context_size)
-
-    data_tids = []
-    data_contexts = []
-    data_arm_rewards = []
-    tid = 0
-
-    for i in range(n_points):
-        confs = confidence_vals[i]
-        confs_sorted_idx = np.argsort(confs)
-
-        max_conf_idx = confs_sorted_idx[-1]
-        second_max_conf_idx = confs_sorted_idx[-2]
-
-        # Unless the disadvantaged skill has the max confidence and the advantaged
-        # skill has the second highest, follow the max orchestrator behavior
-        if max_conf_idx != disadvantage_skillidx and second_max_conf_idx != advantage_skillidx:
-            reward = +1.0
-            data_tids.append(f'warm-start-tid-{tid}')
-            data_contexts.append(list(confs))
-            data_arm_rewards.append((max_conf_idx, reward))
-            tid += 1
-
-        # Make disadvantaged skill highest ranked, and preferred skill second highest
-        confs[disadvantage_skillidx], confs[max_conf_idx] = confs[max_conf_idx], confs[disadvantage_skillidx]
-        confs[advantage_skillidx], confs[second_max_conf_idx] = confs[second_max_conf_idx], confs[advantage_skillidx]
-
-        # Negative reward for selecting disadvantaged skill if it has the
-        # max confidence and the advantaged skill has the second highest
-        data_tids.append(f'warm-start-tid-{tid}')
-        data_contexts.append(list(confs))
-        data_arm_rewards.append((disadvantage_skillidx, -1.0))
-        tid += 1
-
-        # Positive reward for selecting advantaged skill if it has the
-        # second highest confidence and the disadvantaged skill has the highest
-        data_tids.append(f'warm-start-tid-{tid}')
-        data_contexts.append(list(confs))
-        data_arm_rewards.append((advantage_skillidx, +1.0))
-        tid += 1
-
-    # randomise order
-    idxorder = np.random.permutation(n_points)
-
-    data_tids = [data_tids[i] for i in idxorder]
-    data_contexts = [data_contexts[i] for i in idxorder]
-    data_arm_rewards = [data_arm_rewards[i] for i in idxorder]
-
-    return data_tids, np.array(data_contexts), data_arm_rewards
+    confs_sorted_idx = np.argsort(confidence_vals, axis=1)
+
+    max_conf_idx = confs_sorted_idx[:, -1]
+    second_max_conf_idx = confs_sorted_idx[:, -2]
+
+    # Unless the disadvantaged skill has the max confidence and the advantaged
+    # skill has the second highest, follow the max orchestrator behavior
+    follows_max = (max_conf_idx != disadvantage_skillidx) & (second_max_conf_idx != advantage_skillidx)
+
+    # Make disadvantaged skill highest ranked, and preferred skill second highest
+    swapped_confs = confidence_vals.copy()
+    _swap_columns(swapped_confs, np.full(n_points, disadvantage_skillidx), max_conf_idx)
+    _swap_columns(swapped_confs, np.full(n_points, advantage_skillidx), second_max_conf_idx)
+
+    # Up to three rows by point: the max orchestrator one, a negative reward for selecting
+    # the disadvantaged skill and a positive reward for selecting the advantaged skill
+    contexts = np.stack([confidence_vals, swapped_confs, swapped_confs], axis=1)
+    arms = np.column_stack([max_conf_idx,
+                            np.full(n_points, disadvantage_skillidx),
+                            np.full(n_points, advantage_skillidx)])
+    rewards = np.tile([+1.0, -1.0, +1.0], (n_points, 1))
+    kept_rows = np.column_stack([follows_max, np.ones((n_points, 2), dtype=bool)])
+
+    return _shuffled_data(n_points, contexts[kept_rows], arms[kept_rows], rewards[kept_rows])
 
 
 def get_warmstart_data(profile, **kwargs):
@@ -76,5 +76,3 @@ class Thresholder(Orchestrator):
         else:
             self._threshold_pre[agent_executed] = self._threshold_pre.get(
                 agent_executed, self._default_threshold) + 0.05
-
-        self.save()
@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import pickle
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Union
+
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import Action, State, TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.logger import current_logger as logger
+from clai.server.orchestration.orchestrator import Orchestrator
+
+
+# pylint: disable=too-many-arguments
+class PerUserOrchestrator(Orchestrator):
+    """
+    Keeps a model of the orchestrator for every user next to the global one. The
+    model of a user is created from the global one with its first transition, is
+    saved in the folder of the user and is loaded again from there when needed.
+
+    The models are only created or loaded by record_transition, in the thread of
+    the learner, so choose_action never waits for them: until the model of a user
+    is loaded the user gets the choices of the global model. A transition is
+    learned by the model that chose the action of its command, so the global
+    model learns from the users without a model and from the first transition of
+    every user; the transitions of commands it did not see (e.g. the orchestrator
+    was not asked) go to the model that serves the user.
+
+    The models are held in a LRU of up to MAX_USERS models and MAX_MEMORY bytes,
+    measured as the size of their pickled state when they are loaded and again
+    when they are saved. The evicted models are saved before they are dropped.
+    """
+    MAX_USERS = 100
+    MAX_MEMORY = 64 * 1024 * 1024
+    MAX_SERVED = 1000
+
+    def __init__(self, global_orchestrator: Orchestrator, max_users: int = MAX_USERS, max_memory: int = MAX_MEMORY):
+        super().__init__()
+        checkpoint_manager.unregister(global_orchestrator)
+        self.global_orchestrator = global_orchestrator
+        self.orchestrator_name = global_orchestrator.orchestrator_name
+        self.max_users = max_users
+        self.max_memory = max_memory
+        self.memory = 0
+        self.__models: 'OrderedDict[str, Orchestrator]' = OrderedDict()
+        self.__sizes: Dict[str, int] = {}
+        self.__dirty: Set[str] = set()
+        # user of the model that chose the action of each command, None for the global model
+        self.__served: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+
+    def choose_action(self, command: State, agent_names: List[str],
+                      candidate_actions: Optional[List[Union[Action, List[Action]]]],
+                      force_response: bool, pre_post_state: str) -> Optional[Union[Action, List[Action]]]:
+        model = self.__models.get(command.user_name)
+        if model is None:
+            self.__serve(command.command_id, None)
+            model = self.global_orchestrator
+        else:
+            self.__models.move_to_end(command.user_name)
+            self.__serve(command.command_id, command.user_name)
+
+        return model.choose_action(
+            command=command, agent_names=agent_names, candidate_actions=candidate_actions,
+            force_response=force_response, pre_post_state=pre_post_state)
+
+    def can_decide(self, candidate_actions: List[Union[Action, List[Action]]], decisive_agents: List[str]) -> bool:
+        return self.global_orchestrator.can_decide(candidate_actions, decisive_agents)
+
+    def record_transition(self, prev_state: TerminalReplayMemoryComplete, current_state_pre: TerminalReplayMemory):
+        command = prev_state.pre_replay.command
+        user_name = command.user_name
+        if command.command_id in self.__served:
+            served_by_user = self.__served.pop(command.command_id) is not None
+        else:
+            served_by_user = user_name in self.__models
+
+        if served_by_user:
+            self.__model(user_name).record_transition(prev_state, current_state_pre)
+            self.__dirty.add(user_name)
+            return
+
+        self.global_orchestrator.record_transition(prev_state, current_state_pre)
+        self.__model(user_name)
+
+    def users(self) -> List[str]:
+        """users with a model loaded, from the least to the most recently used"""
+        return list(self.__models)
+
+    def save(self):
+        saved = self.global_orchestrator.save()
+        for user_name in list(self.__dirty):
+            model = self.__models.get(user_name)
+            if model is None:
+                self.__dirty.discard(user_name)
+                continue
+
+            if model.save():
+                self.__dirty.discard(user_name)
+            else:
+                saved = False
+            self.__measure(user_name, model)
+
+        self.__evict()
+        return saved
+
+    def load(self):
+        return self.global_orchestrator.load()
+
+    def __serve(self, command_id: str, user_name: Optional[str]):
+        self.__served[command_id] = user_name
+        self.__served.move_to_end(command_id)
+        while len(self.__served) > self.MAX_SERVED:
+            self.__served.popitem(last=False)
+
+    def __model(self, user_name: str) -> Orchestrator:
+        """model of the user, loaded from its folder or copied from the global one when it is not in memory"""
+        model = self.__models.get(user_name)
+        if model is not None:
+            self.__models.move_to_end(user_name)
+            return model
+
+        model = self.global_orchestrator.clone_for_user(user_name)
+        self.__models[user_name] = model
+        self.__measure(user_name, model)
+        self.__evict()
+        return model
+
+    def __measure(self, user_name: str, model: Orchestrator):
+        size = len(pickle.dumps(model.get_orchestrator_state()))
+        self.memory += size - self.__sizes.get(user_name, 0)
+        self.__sizes[user_name] = size
+
+    def __evict(self):
+        # the model used last is never evicted
+        while len(self.__models) > 1 and (len(self.__models) > self.max_users or self.memory > self.max_memory):
+            user_name, model = self.__models.popitem(last=False)
+            self.memory -= self.__sizes.pop(user_name)
+            if user_name in self.__dirty and not model.save():
+                logger.info(f"error saving the {self.orchestrator_name} model of {user_name}")
+            self.__dirty.discard(user_name)
@@ -0,0 +1,170 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+"""
+Streams replay logs through the orchestration patterns to compare them offline
+with the decisions taken in production:
+
+    python -m clai.server.orchestration.replay_evaluation <replay log>... [-o <orchestrator>]
+"""
+
+import argparse
+import pkgutil as pkg
+import time
+from typing import Iterable, List, Optional, Union
+
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import Action, TerminalReplayMemoryComplete, snapshot_actions
+from clai.server.orchestration.orchestrator import Orchestrator, suggestion_of
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.orchestration.per_user_orchestrator import PerUserOrchestrator
+from clai.server.orchestration.replay_log import read_replay_log
+
+
+class OrchestratorEvaluation:
+    """
+    Replays the transitions through an orchestrator and measures:
+    - agreement: fraction of decisions that suggest the same command as the one logged
+    - reward: simulated reward by decision. When the suggestion is the one served, +1 if the user
+      executed it (suggested_executed, what the orchestrators learn from) and -1 if not. When it
+      is another one, -1 if the user executed the one served and 0 if that is unknown. Nothing
+      suggested is 0
+    - latency of every choose_action call
+    The orchestrator also learns from the transitions, in the order the server would do it.
+    """
+
+    def __init__(self, orchestrator_name: str, orchestrator: Optional[Orchestrator] = None,
+                 error: Optional[str] = None):
+        self.orchestrator_name = orchestrator_name
+        self.orchestrator = orchestrator
+        self.error = error
+        self.decisions = 0
+        self.agreements = 0
+        self.reward = 0.0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+    def replay(self, previous: Optional[TerminalReplayMemoryComplete], current: TerminalReplayMemoryComplete,
+               learn: bool = True):
+        if self.orchestrator is None:
+            return
+
+        pre_replay = current.pre_replay
+        try:
+            start = time.perf_counter()
+            chosen = self.orchestrator.choose_action(
+                command=pre_replay.command, agent_names=list(pre_replay.agent_names),
+                candidate_actions=snapshot_actions(pre_replay.candidate_actions),
+                force_response=pre_replay.force_response, pre_post_state='pre')
+            self.latencies.append(time.perf_counter() - start)
+        # pylint: disable=broad-except
+        except Exception:
+            self.errors += 1
+        else:
+            self.__score(chosen, current)
+
+        if learn and previous is not None:
+            try:
+                self.orchestrator.record_transition(previous, pre_replay)
+            # pylint: disable=broad-except
+            except Exception:
+                self.errors += 1
+
+    def __score(self, chosen: Optional[Union[Action, List[Action]]], current: TerminalReplayMemoryComplete):
+        self.decisions += 1
+        suggestion = suggestion_of(chosen, current.pre_replay)
+        served = suggestion_of(current.pre_replay.suggested_command, current.pre_replay)
+        if suggestion == served:
+            self.agreements += 1
+        if suggestion is None:
+            return
+
+        executed = bool(current.post_replay.command.suggested_executed)
+        if suggestion == served:
+            self.reward += 1.0 if executed else -1.0
+        elif executed:
+            self.reward -= 1.0
+
+    @property
+    def agreement(self) -> float:
+        return self.agreements / self.decisions if self.decisions else 0.0
+
+    @property
+    def mean_reward(self) -> float:
+        return self.reward / self.decisions if self.decisions else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def report(self) -> str:
+        if self.error:
+            return f'{self.orchestrator_name:<26} unavailable: {self.error}'
+        return f'{self.orchestrator_name:<26} {self.decisions:>9} {self.agreement:>9.1%} ' \
+               f'{self.mean_reward:>7.3f} {self.latency_percentile(0.5) * 1000:>8.3f} ' \
+               f'{self.latency_percentile(0.95) * 1000:>8.3f} {self.errors:>6}'
+
+
+def all_orchestrator_names() -> List[str]:
+    return sorted(module.name for module in pkg.iter_modules(OrchestratorProvider.get_path()))
+
+
+def load_orchestrator(orchestrator_name: str) -> OrchestratorEvaluation:
+    """
+    the orchestrators are loaded with their saved global state, without the models by user, and
+    what they learn here is never saved
+    """
+    try:
+        # the warm start of an orchestrator can save it while it is built
+        with checkpoint_manager.read_only():
+            orchestrator = OrchestratorProvider(None).get_orchestrator_instance(orchestrator_name)
+    # pylint: disable=broad-except
+    except Exception as err:
+        return OrchestratorEvaluation(orchestrator_name, error=str(err))
+
+    if orchestrator is None:
+        return OrchestratorEvaluation(orchestrator_name, error='no orchestrator found')
+
+    checkpoint_manager.unregister(orchestrator)
+    if isinstance(orchestrator, PerUserOrchestrator):
+        orchestrator = orchestrator.global_orchestrator
+    return OrchestratorEvaluation(orchestrator_name, orchestrator)
+
+
+def evaluate(log_paths: Iterable[str], orchestrator_names: Optional[List[str]] = None,
+             learn: bool = True) -> List[OrchestratorEvaluation]:
+    evaluations = [load_orchestrator(name) for name in orchestrator_names or all_orchestrator_names()]
+
+    previous = None
+    with checkpoint_manager.read_only():
+        for log_path in log_paths:
+            for current in read_replay_log(log_path):
+                for evaluation in evaluations:
+                    evaluation.replay(previous, current, learn)
+                previous = current
+
+    return evaluations
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Evaluates the orchestrators with replay logs')
+    parser.add_argument('logs', nargs='+', help='replay logs written by the server (CLAI_REPLAY_LOG)')
+    parser.add_argument('-o', '--orchestrator', action='append', dest='orchestrators',
+                        help='orchestrator to evaluate, all of them by default')
+    parser.add_argument('--no-learn', action='store_true', help="don't record the transitions")
+    options = parser.parse_args(args)
+
+    print(f'{"orchestrator":<26} {"decisions":>9} {"agreement":>9} {"reward":>7} '
+          f'{"p50 ms":>8} {"p95 ms":>8} {"errors":>6}')
+    for evaluation in evaluate(options.logs, options.orchestrators, not options.no_learn):
+        print(evaluation.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import atexit
+import gzip
+import json
+import os
+import threading
+import zlib
+from typing import Iterator, List, Optional, Union
+
+from clai.server.command_message import Action, TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.logger import current_logger as logger
+from clai.server.state_serialization import state_from_dict, state_to_dict
+
+REPLAY_LOG_PATH = os.getenv('CLAI_REPLAY_LOG')
+
+
+def actions_to_values(actions: Optional[Union[Action, List[Union[Action, List[Action]]]]]):
+    if actions is None:
+        return None
+    if isinstance(actions, list):
+        return [actions_to_values(action) for action in actions]
+    return actions.dict()
+
+
+def actions_from_values(values) -> Optional[Union[Action, List[Union[Action, List[Action]]]]]:
+    if values is None:
+        return None
+    if isinstance(values, list):
+        return [actions_from_values(value) for value in values]
+    return Action(**values)
+
+
+def replay_to_dict(replay: TerminalReplayMemory) -> dict:
+    return {
+        'command': state_to_dict(replay.command, with_previous=False),
+        'agent_names': replay.agent_names,
+        'candidate_actions': actions_to_values(replay.candidate_actions),
+        'force_response': replay.force_response,
+        'suggested_command': actions_to_values(replay.suggested_command)
+    }
+
+
+def replay_from_dict(values: dict) -> TerminalReplayMemory:
+    return TerminalReplayMemory(
+        state_from_dict(values['command']),
+        values['agent_names'],
+        actions_from_values(values['candidate_actions']),
+        values['force_response'],
+        actions_from_values(values['suggested_command']))
+
+
+def read_replay_log(path: str) -> Iterator[TerminalReplayMemoryComplete]:
+    """yields the transitions of a replay log in the order they were appended"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf8') as file:
+            for line in file:
+                values = json.loads(line)
+                replay = TerminalReplayMemoryComplete()
+                replay.pre_replay = replay_from_dict(values['pre_replay'])
+                replay.post_replay = replay_from_dict(values['post_replay'])
+                yield replay
+    except (EOFError, OSError, zlib.error, json.JSONDecodeError) as err:
+        # the last batch can be cut if the server was killed while writing it
+        logger.info(f"replay log {path} ends with an incomplete batch: {err}")
+
+
+class ReplayLog:
+    """
+    Append only log of the complete transitions (pre and post replays) seen by
+    the orchestrators, stored as json lines compressed with gzip. The transitions
+    are written in batches of FLUSH_SIZE, every batch as a gzip member added at
+    the end of the file, so the file is never rewritten and it can be read with
+    read_replay_log or zcat.
+    """
+    FLUSH_SIZE = 50
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self.__pending: List[str] = []
+        self.__lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def append(self, replay: TerminalReplayMemoryComplete):
+        if replay.pre_replay is None or replay.post_replay is None:
+            return
+
+        line = json.dumps({
+            'pre_replay': replay_to_dict(replay.pre_replay),
+            'post_replay': replay_to_dict(replay.post_replay)
+        })
+        with self.__lock:
+            self.__pending.append(line + '\n')
+            if len(self.__pending) >= self.FLUSH_SIZE:
+                self.__write_pending()
+
+    def flush(self):
+        with self.__lock:
+            self.__write_pending()
+
+    def __write_pending(self):
+        if not self.__pending:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'ab') as file:
+                file.write(gzip.compress(''.join(self.__pending).encode('utf8')))
+        except OSError as err:
+            logger.info(f"error writing the replay log {self.path}: {err}")
+        self.__pending.clear()
+
+
+def default_replay_log() -> Optional[ReplayLog]:
+    if not REPLAY_LOG_PATH:
+        return None
+    return ReplayLog(REPLAY_LOG_PATH)
@@ -0,0 +1,140 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import Action, State, TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.logger import current_logger as logger
+from clai.server.orchestration.orchestrator import suggestion_of
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+
+
+class ShadowStats:
+    def __init__(self):
+        self.decisions = 0
+        self.agreements = 0
+        self.transitions = 0
+        self.errors = 0
+
+
+class ShadowOrchestrators:
+    """
+    Runs the shadow orchestrators (shadow_orchestrators in configPlugins.json)
+    next to the one that is active. They receive a copy of the candidate actions
+    and the transitions in a background thread, so their decisions and learning
+    are only logged and never delay or change the response. When the queue is
+    full the new work is dropped.
+    """
+    QUEUE_SIZE = 1000
+
+    def __init__(self, orchestrator_provider: OrchestratorProvider):
+        self.orchestrator_provider = orchestrator_provider
+        self.stats: Dict[str, ShadowStats] = {}
+        self.__tasks = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.__thread = None
+        self.__start_lock = threading.Lock()
+        # guards the state of the shadows between their thread and the checkpoints
+        self.__shadows_lock = threading.Lock()
+
+    # pylint: disable=too-many-arguments
+    def choose_action(self, command: State, agent_names: List[str],
+                      candidate_actions: Optional[List[Union[Action, List[Action]]]],
+                      force_response: bool, pre_post_state: str,
+                      suggested_command: Optional[Union[Action, List[Action]]]):
+        if not self.__has_shadows():
+            return
+
+        replay = TerminalReplayMemory(command, agent_names, candidate_actions, force_response, suggested_command)
+        self.__put((self.__choose_action, replay, pre_post_state))
+
+    def record_transition(self, prev_state: TerminalReplayMemoryComplete, current_state_pre: TerminalReplayMemory):
+        if not self.__has_shadows():
+            return
+
+        self.__put((self.__record_transition, prev_state, current_state_pre))
+
+    def wait(self):
+        """blocks until the decisions and transitions received are processed"""
+        self.__tasks.join()
+
+    def __has_shadows(self) -> bool:
+        try:
+            return bool(self.orchestrator_provider.get_shadow_orchestrator_names())
+        # pylint: disable=broad-except
+        except Exception as err:
+            logger.info(f"error reading the shadow orchestrators: {err}")
+            return False
+
+    def __put(self, task):
+        self.__start()
+        try:
+            self.__tasks.put_nowait(task)
+        except queue.Full:
+            logger.info("shadow orchestrators are behind, work dropped")
+
+    def __start(self):
+        with self.__start_lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, name='shadow-orchestrators', daemon=True)
+                self.__thread.start()
+
+    def __loop(self):
+        while True:
+            method, *args = self.__tasks.get()
+            try:
+                for shadow in self.orchestrator_provider.get_shadow_orchestrators():
+                    with self.__shadows_lock:
+                        method(shadow, *args)
+            # pylint: disable=broad-except
+            except Exception as err:
+                logger.info(f"error running the shadow orchestrators: {err}")
+            finally:
+                self.__tasks.task_done()
+
+    def __stats(self, shadow) -> ShadowStats:
+        return self.stats.setdefault(shadow.orchestrator_name, ShadowStats())
+
+    def __choose_action(self, shadow, replay: TerminalReplayMemory, pre_post_state: str):
+        stats = self.__stats(shadow)
+        try:
+            start = time.perf_counter()
+            chosen = shadow.choose_action(
+                command=replay.command, agent_names=list(replay.agent_names),
+                candidate_actions=replay.candidate_actions, force_response=replay.force_response,
+                pre_post_state=pre_post_state)
+            elapsed = time.perf_counter() - start
+        # pylint: disable=broad-except
+        except Exception as err:
+            stats.errors += 1
+            logger.info(f"shadow {shadow.orchestrator_name} failed choosing an action: {err}")
+            return
+
+        stats.decisions += 1
+        suggestion = suggestion_of(chosen, replay)
+        served = suggestion_of(replay.suggested_command, replay)
+        if suggestion == served:
+            stats.agreements += 1
+
+        logger.info("shadow %s %s %s: suggested %r, served %r in %.3f ms (agreement %d/%d)",
+                    shadow.orchestrator_name, pre_post_state, replay.command.command_id,
+                    suggestion, served, elapsed * 1000, stats.agreements, stats.decisions)
+
+    def __record_transition(self, shadow, prev_state: TerminalReplayMemoryComplete,
+                            current_state_pre: TerminalReplayMemory):
+        stats = self.__stats(shadow)
+        try:
+            shadow.record_transition(prev_state, current_state_pre)
+            checkpoint_manager.mark_dirty(shadow, self.__shadows_lock)
+            stats.transitions += 1
+        # pylint: disable=broad-except
+        except Exception as err:
+            stats.errors += 1
+            logger.info(f"shadow {shadow.orchestrator_name} failed recording a transition: {err}")
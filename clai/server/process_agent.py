@@ -0,0 +1,187 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import importlib
+import inspect
+import json
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Union
+
+import clai
+from clai.server.agent import Agent
+from clai.server.command_message import Action, State
+from clai.server.logger import current_logger as logger
+from clai.server.message_frame import FrameDecoder, encode_frame
+from clai.server.state_serialization import actions_from_dict, actions_to_dict, state_from_dict, state_to_dict
+
+PROCESS_ISOLATION = 'process'
+THREAD_ISOLATION = 'thread'
+
+
+def plugin_module_name(pkg_name: str) -> str:
+    return f'clai.server.plugins.{pkg_name}.{pkg_name}'
+
+
+def load_agent_class(module_name: str):
+    plugin = importlib.import_module(module_name)
+    for _, class_member in inspect.getmembers(plugin, inspect.isclass):
+        if issubclass(class_member, Agent) and (class_member is not Agent):
+            return class_member
+    return None
+
+
+class ProcessAgent(Agent):
+    """
+    Proxy of an agent that runs in its own warm worker process. The state and the
+    actions travel as json frames over the worker stdin and stdout, so a skill
+    that uses the cpu doesn't hold the server GIL and a crash only takes down its
+    worker, which is started again on the next command.
+    """
+    INIT_TIMEOUT = 120
+    EXECUTION_TIMEOUT = 30
+    STOP_TIMEOUT = 5
+    BUFFER_SIZE = 4024
+
+    def __init__(self, pkg_name: str, module_name: Optional[str] = None):
+        super().__init__()
+        self.pkg_name = pkg_name
+        self.module_name = module_name or plugin_module_name(pkg_name)
+        self.agent_name = pkg_name
+        self.restarts = 0
+        self.__process: Optional[subprocess.Popen] = None
+        self.__decoder = None
+        self.__lock = threading.Lock()
+
+    def init_agent(self):
+        with self.__lock:
+            self.__start_worker()
+
+    def execute(self, state: State) -> Union[Action, List[Action]]:
+        return self.__call('execute', state, Action())
+
+    def post_execute(self, state: State) -> Action:
+        return self.__call('post_execute', state, Action(origin_command=state.command))
+
+    def get_next_action(self, state: State) -> Union[Action, List[Action]]:
+        return self.execute(state)
+
+    def close(self):
+        with self.__lock:
+            self.__stop_worker()
+
+    def __call(self, method: str, state: State, default_action: Action) -> Union[Action, List[Action]]:
+        request = json.dumps({'method': method, 'state': state_to_dict(state)}).encode('utf8')
+        with self.__lock:
+            try:
+                if self.__process is None or self.__process.poll() is not None:
+                    self.restarts += 1
+                    logger.info(f"restarting the worker of {self.pkg_name}")
+                    self.__start_worker()
+
+                self.__process.stdin.write(encode_frame(request))
+                self.__process.stdin.flush()
+                response = json.loads(self.__read_frame(self.EXECUTION_TIMEOUT))
+                return actions_from_dict(response)
+            # pylint: disable=broad-except
+            except Exception as error:
+                logger.info(f"worker of {self.pkg_name} failed: {error}")
+                self.__stop_worker(timeout=0)
+                default_action.agent_owner = self.agent_name
+                return default_action
+
+    def __start_worker(self):
+        self.__stop_worker()
+        environment = dict(os.environ)
+        clai_path = os.path.dirname(os.path.dirname(os.path.abspath(clai.__file__)))
+        environment['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [clai_path, environment.get('PYTHONPATH')]))
+
+        self.__process = subprocess.Popen(
+            [sys.executable, '-m', 'clai.server.process_agent', self.module_name],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=environment)
+        self.__decoder = FrameDecoder()
+        handshake = json.loads(self.__read_frame(self.INIT_TIMEOUT))
+        self.agent_name = handshake['agent_name']
+        logger.info(f"worker {self.__process.pid} of {self.agent_name} is ready")
+
+    def __read_frame(self, timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.__process.stdout, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise TimeoutError(f"no answer in {timeout} seconds")
+
+                received_data = os.read(self.__process.stdout.fileno(), self.BUFFER_SIZE)
+                if not received_data:
+                    raise ConnectionResetError("worker exited")
+
+                frames = self.__decoder.feed(received_data)
+                if frames:
+                    return frames[0]
+
+    def __stop_worker(self, timeout: Optional[float] = None):
+        """closing stdin lets the worker save its agent and exit, it is killed after timeout seconds"""
+        if self.__process is None:
+            return
+
+        try:
+            self.__process.stdin.close()
+            try:
+                self.__process.wait(self.STOP_TIMEOUT if timeout is None else timeout)
+            except subprocess.TimeoutExpired:
+                logger.info(f"worker of {self.pkg_name} didn't exit in time, killed")
+                self.__process.kill()
+                self.__process.wait()
+            self.__process.stdout.close()
+        except OSError as error:
+            logger.info(f"error stopping the worker of {self.pkg_name}: {error}")
+        self.__process = None
+        self.__decoder = None
+
+    def __del__(self):
+        self.__stop_worker()
+
+
+def serve(module_name: str):
+    # the skills are free to print, the protocol uses a copy of the original stdout
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    agent = load_agent_class(module_name)()
+    agent.init_agent()
+    channel.write(encode_frame(json.dumps({'agent_name': agent.agent_name}).encode('utf8')))
+    channel.flush()
+
+    decoder = FrameDecoder()
+    while True:
+        received_data = os.read(sys.stdin.fileno(), ProcessAgent.BUFFER_SIZE)
+        if not received_data:
+            break
+
+        for frame in decoder.feed(received_data):
+            request = json.loads(frame)
+            state = state_from_dict(request['state'])
+            if request['method'] == 'post_execute':
+                actions = agent.post_execute(state)
+            else:
+                actions = agent.execute(state)
+
+            channel.write(encode_frame(json.dumps(actions_to_dict(actions)).encode('utf8')))
+            channel.flush()
+
+    agent.save_agent()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1])
@@ -7,13 +7,58 @@
 
 # pylint: disable=consider-iterating-dictionary,no-self-use,bad-classmethod-argument,unnecessary-pass
 import abc
-import json
 import os
 
 from typing import List, Dict
 from requests import Request, Session, Response
 from clai.server.logger import current_logger as logger
 
+SEARCH = 'search'
+
+
+class _HttpMessage:
+    """summary of a request or a response, only built when the search payloads are logged"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @staticmethod
+    def __shorten(value) -> str:
+        print_data: str = str(value)
+        if len(print_data) > 64:
+            print_data = f"{print_data[:50]} ... {print_data[-10:]}"
+        return print_data
+
+    def __str__(self):
+        data = self.data
+        output: List[str] = [""]
+        getters: List[str] = []
+
+        if isinstance(data, Request):
+            output.append(f"{data.method} --> {data.url}")
+            getters = ["files", "data", "json", "params", "auth", "cookies", "hooks"]
+        elif isinstance(data, Response):
+            output.append(f"RESPONSE[{data.status_code}] <-- {data.url}")
+            getters = ["apparent_encoding", "cookies", "elapsed", "encoding", "ok", "status_code", "reason"]
+
+        # We will always have message headers
+        if data.headers.keys():
+            output.append(".--[Headers]".ljust(80, "-"))
+            for key in data.headers.keys():
+                output.append(f"|    {key}: {self.__shorten(data.headers[key])}")
+            output.append("`".ljust(80, "-"))
+
+        # Call each of the getter methods for this object, and
+        # append the output to the stuff we will print
+        for method in getters:
+            output.append(f"{method}: {self.__shorten(getattr(data, method))}")
+
+        # the body goes last, as it was received, so the payload cap cuts it instead of the headers
+        if isinstance(data, Response):
+            output.append(f"content: {data.content.decode('utf8', 'replace')}")
+
+        return "\n\t".join(output)
+
 
 class Provider:
 
@@ -49,66 +94,18 @@ class Provider:
         return self.description
 
     def __log_info__(self, message):
-        logger.info(f"{self.name}: {message}")
+        logger.info("%s: %s", self.name, message, category=SEARCH)
 
     def __log_warning__(self, message):
-        logger.warning(f"{self.name}: {message}")
+        logger.warning("%s: %s", self.name, message, category=SEARCH)
 
     def __log_debug__(self, message):
-        logger.debug(f"{self.name}: {message}")
+        logger.debug("%s: %s", self.name, message, category=SEARCH)
 
     def __log_json__(self, data):
-        output: List[str] = [""]
-        getters: List[str] = []
-        is_json_data: bool = False
-
-        if isinstance(data, Request):
-            output.append(f"{data.method} --> {data.url}")
-            getters = ["files", "data", "json", "params", "auth", "cookies", "hooks"]
-        elif isinstance(data, Response):
-            output.append(f"RESPONSE[{data.status_code}] <-- {data.url}")
-            getters = [
-                "apparent_encoding",
-                "cookies",
-                "elapsed",
-                "encoding",
-                "ok",
-                "status_code",
-                "reason",
-                "content",
-            ]
-
-        # We will always have message headers
-        if data.headers.keys():
-            output.append(".--[Headers]".ljust(80, "-"))
-            for key in data.headers.keys():
-
-                if key == "Content-Type":
-                    if "/json" in data.headers[key]:
-                        is_json_data = True
-
-                line_header = f"|    {key}: "
-                print_data: str = str(data.headers[key])
-                if len(print_data) > 64:
-                    print_data = f"{print_data[:50]} ... {print_data[-10:]}"
-                output.append(f"{line_header}{print_data}")
-            output.append("`".ljust(80, "-"))
-
-        # Call each of the getter methods for this object, and
-        # append the output to the stuff we will print
-        for method in getters:
-            result = getattr(data, method)
-            if method == "content" and is_json_data:
-                outstr = json.dumps(json.loads(result), indent=2)
-                output.append(f"{method}: " + outstr.replace("\n", "\n\t"))
-            else:
-                print_data: str = str(result)
-                line_header = f"{method}: "
-                if len(print_data) > 64:
-                    print_data = f"{print_data[:50]} ... {print_data[-10:]}"
-                output.append(f"{line_header}{print_data}")
-
-        self.__log_info__("\n\t".join(output))
+        # formatted later by the thread of the logger: the request or response must not change after this call,
+        # pass a copy if it is going to be mutated
+        logger.payload("%s: %s", self.name, _HttpMessage(data), category=SEARCH)
 
     def __set_default_values__(self, args: dict, **kwargs) -> dict:
         for key in kwargs.keys():
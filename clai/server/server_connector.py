@@ -6,7 +6,9 @@
 #
 
 import abc
-from typing import Callable
+from typing import Awaitable, Callable, Union
+
+from clai.server.command_message import Action
 
 
 class ServerConnector(abc.ABC):
@@ -15,5 +17,5 @@ class ServerConnector(abc.ABC):
         '''This method inialize the connection'''
 
     @abc.abstractmethod
-    def loop(self, process_message: Callable[[bytes], str]):
-        '''This is the loop method for manage the connection'''
+    def loop(self, process_message: Callable[[bytes], Union[Action, Awaitable[Action]]]):
+        '''This is the loop method for manage the connection, process_message can be a coroutine'''
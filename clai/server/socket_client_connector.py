@@ -5,8 +5,11 @@
 # of this source tree for licensing information.
 #
 
+import errno
+import os
 import selectors
 import socket
+import time
 import traceback
 import types
 import uuid
@@ -14,12 +17,17 @@ from typing import Optional
 
 from clai.server.logger import current_logger as logger
 from clai.server.client_connector import ClientConnector
-from clai.server.command_message import StateDTO, Action
+from clai.server.command_message import StateDTO, Action, ClientSpan
+from clai.server.message_frame import FrameDecoder, encode_frame
 from clai.server.state_mapper import process_message
+from clai.server.tracer import now_unix_nano
 
 
 # pylint: disable=too-few-public-methods
 class SocketClientConnector(ClientConnector):
+    BUFFER_SIZE = 4024
+    READ_TIMEOUT = 6
+
     def __init__(self, host: str, port: int):
         self.sel = selectors.DefaultSelector()
         self.host = host
@@ -42,7 +50,15 @@ class SocketClientConnector(ClientConnector):
             self.close()
 
     def _internal_send(self, command_to_send):
-        self.start_connections(self.host, int(self.port))
+        # the spans travel with the message, so they only cover what the client does before writing it:
+        # client.prepare from the call until the write, with the connection inside
+        start = now_unix_nano()
+        self.connect()
+        connected = now_unix_nano()
+        command_to_send.client_spans = [
+            ClientSpan(name='client.prepare', start_time_unix_nano=start, end_time_unix_nano=now_unix_nano()),
+            ClientSpan(name='client.connect', start_time_unix_nano=start, end_time_unix_nano=connected,
+                       parent='client.prepare')]
         self.write(command_to_send)
         action = self.read()
         if action:
@@ -52,13 +68,19 @@ class SocketClientConnector(ClientConnector):
             origin_command=command_to_send.command,
             suggested_command=command_to_send.command)
 
-    def start_connections(self, host, port):
+    def connect(self):
+        self.start_connections(self.host, int(self.port))
 
-        server_address = (host, port)
+    def start_connections(self, host, port):
+        self.register_socket(socket.AF_INET, (host, port))
 
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    def register_socket(self, family, server_address):
+        client_socket = socket.socket(family, socket.SOCK_STREAM)
         client_socket.setblocking(False)
-        client_socket.connect_ex(server_address)
+        error = client_socket.connect_ex(server_address)
+        if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            client_socket.close()
+            raise ConnectionRefusedError(error, os.strerror(error))
         events = selectors.EVENT_READ | selectors.EVENT_WRITE
         data = types.SimpleNamespace(
             connid=self.uuid,
@@ -72,23 +94,37 @@ class SocketClientConnector(ClientConnector):
         client_socket = key.fileobj
         data = key.data
         self.sel.modify(client_socket, selectors.EVENT_WRITE, data)
-        logger.info(f'echoing ${data}')
-        data.outb = str(message.json())
-        sent = client_socket.send(data.outb.encode('utf-8'))
-        data.outb = data.outb[sent:]
+        logger.payload('echoing %s', data)
+        data.outb = encode_frame(str(message.json()).encode('utf-8'))
+        while data.outb:
+            self.sel.select(timeout=5)
+            sent = client_socket.send(data.outb)
+            data.outb = data.outb[sent:]
         self.sel.modify(client_socket, selectors.EVENT_READ, data)
 
     def read(self) -> Optional[Action]:
-        events = self.sel.select(timeout=6)
-        if events and events[0]:
+        decoder = FrameDecoder()
+        deadline = time.monotonic() + self.READ_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            events = self.sel.select(timeout=remaining)
+            if not events or not events[0]:
+                return None
+
             key = events[0][0]
             client_socket = key.fileobj
-            received_data = client_socket.recv(4024)
-            if received_data:
-                message = process_message(received_data)
-                return message
+            received_data = client_socket.recv(self.BUFFER_SIZE)
+            if not received_data:
+                return None
 
-        return None
+            frames = decoder.feed(received_data)
+            if frames:
+                return process_message(frames[0])
 
     def close(self):
+        for key in list(self.sel.get_map().values()):
+            key.fileobj.close()
         self.sel.close()
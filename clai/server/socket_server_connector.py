@@ -5,24 +5,34 @@
 # of this source tree for licensing information.
 #
 
-import selectors
+import asyncio
+import inspect
 import socket
-import types
-from typing import Callable
+from typing import Awaitable, Callable, Set, Union
 
 from clai.datasource.server_status_datasource import ServerStatusDatasource
 from clai.server.command_message import Action
+from clai.server.message_frame import FrameDecoder, encode_frame
 from clai.server.server_connector import ServerConnector
 from clai.server.logger import current_logger as logger
+from clai.server.tracer import current_tracer as tracer
+from clai.tools.async_utils import run_coroutine
 
 
 class SocketServerConnector(ServerConnector):
+    """
+    asyncio server for the framed messages of the clients. The messages of a
+    connection are answered in order, while different connections are served
+    concurrently when process_message is a coroutine.
+    """
     BUFFER_SIZE = 4024
 
     def __init__(self, server_status_datasource: ServerStatusDatasource):
         self.server_status_datasource = server_status_datasource
-        self.sel = selectors.DefaultSelector()
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listening_sockets = [self.server_socket]
+        self.connections: Set[asyncio.StreamWriter] = set()
+        self.__stopped = None
 
     def create_socket(self, host: str, port: int):
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -31,61 +41,71 @@ class SocketServerConnector(ServerConnector):
         logger.info(f"Listening {host} {port}")
         self.server_socket.setblocking(False)
 
-    def loop(self, process_message: Callable[[bytes], Action]):
-        self.sel.register(self.server_socket, selectors.EVENT_READ, data=None)
+    def loop(self, process_message: Callable[[bytes], Union[Action, Awaitable[Action]]]):
         try:
-            while self.server_status_datasource.running:
-                events = self.sel.select(timeout=None)
-                for key, mask in events:
-                    if key.data is None:
-                        self.__accept_wrapper(key.fileobj)
-                    else:
-                        self.__service_connection(key, mask, process_message)
-            self.sel.unregister(self.server_socket)
-            self.server_socket.close()
+            run_coroutine(self.serve(process_message))
         except KeyboardInterrupt:
             logger.info("caught keyboard interrupt, exiting")
         finally:
             logger.info("server closed")
-            self.sel.close()
+            self.close_listening_sockets()
+
+    async def serve(self, process_message: Callable[[bytes], Union[Action, Awaitable[Action]]]):
+        self.__stopped = asyncio.Event()
+
+        async def on_connection(reader, writer):
+            await self.__service_connection(reader, writer, process_message)
 
-    def __accept_wrapper(self, server_socket):
-        connection, address = server_socket.accept()
-        connection.setblocking(False)
-        data = types.SimpleNamespace(addr=address, inb=b"", outb=b"")
-        events = selectors.EVENT_READ | selectors.EVENT_WRITE
-        self.sel.register(connection, events, data=data)
+        servers = [await self.__start_server(listening_socket, on_connection)
+                   for listening_socket in self.listening_sockets]
+        try:
+            await self.__stopped.wait()
+        finally:
+            for server in servers:
+                server.close()
+            for writer in list(self.connections):
+                writer.close()
 
-    def __service_connection(self, key, mask, process_message):
-        fileobj = key.fileobj
-        data = key.data
-        if mask & selectors.EVENT_READ:
-            data = self.__read(data, fileobj, process_message)
-        if mask & selectors.EVENT_WRITE:
-            self.__write(data, fileobj)
+    def close_listening_sockets(self):
+        for listening_socket in self.listening_sockets:
+            listening_socket.close()
 
     @staticmethod
-    def __write(data, server_socket):
-        if data.outb:
-            logger.info(f"sending from client ${data.outb}")
-            server_socket.send(data.outb)
-            data.outb = b''
+    async def __start_server(listening_socket: socket.socket, on_connection):
+        if listening_socket.family == getattr(socket, 'AF_UNIX', None):
+            return await asyncio.start_unix_server(on_connection, sock=listening_socket)
+        return await asyncio.start_server(on_connection, sock=listening_socket)
 
-    def __read(self, data, server_socket, process_message):
-        recv_data = b''
-        chewing = True
-        logger.info(f"receiving from client")
-        while chewing:
-            part = server_socket.recv(self.BUFFER_SIZE)
-            recv_data += part
-            if len(part) < self.BUFFER_SIZE:
-                chewing = False
+    async def __service_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                                   process_message):
+        self.connections.add(writer)
+        decoder = FrameDecoder()
+        try:
+            while self.server_status_datasource.running:
+                recv_data = await reader.read(self.BUFFER_SIZE)
+                if not recv_data:
+                    break
 
-        if recv_data:
-            logger.info(f"receiving from client ${recv_data}")
-            action = process_message(recv_data)
-            data.outb = str(action.json()).encode('utf8')
-        else:
-            self.sel.unregister(server_socket)
-            server_socket.close()
-        return data
+                for frame in decoder.feed(recv_data):
+                    # the coroutines of the connections share the thread, the span is only current until an await
+                    with tracer.detached_span('server.command') as command_span:
+                        with tracer.activate(command_span):
+                            logger.payload("receiving from client %s", frame)
+                            action = process_message(frame)
+                        if inspect.isawaitable(action):
+                            action = await action
+
+                        with tracer.detached_span('response.write', parent=command_span):
+                            outb = encode_frame(str(action.json()).encode('utf8'))
+                            logger.payload("sending to client %s", outb)
+                            writer.write(outb)
+                            await writer.drain()
+        except ConnectionError as error:
+            logger.info(f"connection lost: {error}")
+        except ValueError as error:
+            logger.info(f"invalid frame from client: {error}")
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+            if not self.server_status_datasource.running:
+                self.__stopped.set()
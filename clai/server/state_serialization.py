@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+from typing import List, Optional, Union
+
+from clai.server.command_message import (Action, FilesChangesValues, NetworkValues, ProcessesValues, State,
+                                         StateDTO)
+
+
+def state_to_dict(state: State, with_previous: bool = True) -> dict:
+    """plain json values of the state, the previous execution is sent without its own history"""
+    values = StateDTO(
+        command_id=state.command_id,
+        user_name=state.user_name,
+        command=state.command,
+        root=state.root,
+        processes=state.processes,
+        file_changes=state.file_changes,
+        network=state.network,
+        result_code=state.result_code,
+        stderr=state.stderr).dict(exclude={'client_spans'})
+    values['already_processed'] = state.already_processed
+    values['action_suggested'] = _action_to_dict(state.action_suggested)
+    values['action_post_suggested'] = _action_to_dict(state.action_post_suggested)
+    values['values_executed'] = list(state.values_executed)
+    values['suggested_executed'] = state.suggested_executed
+    values['previous_execution'] = None
+    if with_previous and state.previous_execution is not None:
+        values['previous_execution'] = state_to_dict(state.previous_execution, with_previous=False)
+    return values
+
+
+def state_from_dict(values: dict) -> State:
+    previous_execution = None
+    if values.get('previous_execution'):
+        previous_execution = state_from_dict(values['previous_execution'])
+
+    state = State(
+        command_id=values['command_id'],
+        user_name=values['user_name'],
+        command=values.get('command'),
+        root=values.get('root', False),
+        processes=_parse_optional(ProcessesValues, values.get('processes')),
+        file_changes=_parse_optional(FilesChangesValues, values.get('file_changes')),
+        network=_parse_optional(NetworkValues, values.get('network')),
+        result_code=values.get('result_code'),
+        stderr=values.get('stderr'),
+        previous_execution=previous_execution,
+        already_processed=values.get('already_processed', False),
+        action_suggested=_parse_optional(Action, values.get('action_suggested')),
+        action_post_suggested=_parse_optional(Action, values.get('action_post_suggested')))
+    state.values_executed = values.get('values_executed', [])
+    state.suggested_executed = values.get('suggested_executed', False)
+    return state
+
+
+def _action_to_dict(action: Optional[Action]) -> Optional[dict]:
+    if action is None:
+        return None
+    return action.dict()
+
+
+def _parse_optional(model, values: Optional[dict]):
+    if values is None:
+        return None
+    return model(**values)
+
+
+def actions_to_dict(actions: Union[Action, List[Action]]) -> dict:
+    if isinstance(actions, list):
+        return {'actions': [action.dict() for action in actions], 'many': True}
+    return {'actions': [actions.dict()], 'many': False}
+
+
+def actions_from_dict(values: dict) -> Union[Action, List[Action]]:
+    actions = [Action(**action) for action in values['actions']]
+    if values['many']:
+        return actions
+    return actions[0]
@@ -0,0 +1,289 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import atexit
+import functools
+import json
+import logging
+import logging.handlers as handlers
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from clai.server.command_message import BASEDIR, ClientSpan
+
+TRACE_PATH = os.getenv('CLAI_TRACE_FILE', os.path.join(BASEDIR, 'traces.jsonl'))
+TRACE_ENABLED = os.getenv('CLAI_TRACE', '1') != '0'
+
+
+def now_unix_nano() -> int:
+    return int(time.time() * 1e9)
+
+
+def trace_id_of(command_id: str) -> str:
+    """the command ids are uuids, their 32 hex digits are the trace id"""
+    try:
+        return uuid.UUID(command_id).hex
+    except (AttributeError, TypeError, ValueError):
+        return uuid.uuid5(uuid.NAMESPACE_OID, str(command_id)).hex
+
+
+class _Trace:
+    """spans of a trace in this process, exported together once the root span ends"""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.root: Optional[Span] = None
+        self.finished: List[Span] = []
+        self.exported = False
+
+
+class Span:
+    def __init__(self, trace: _Trace, name: str, parent: Optional['Span'], attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_time_unix_nano = now_unix_nano()
+        self.end_time_unix_nano: Optional[int] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_span_id': self.parent_span_id,
+            'name': self.name,
+            'start_time_unix_nano': self.start_time_unix_nano,
+            'end_time_unix_nano': self.end_time_unix_nano,
+            'attributes': self.attributes,
+            'status': {'code': 'ERROR', 'message': self.error} if self.error else {'code': 'OK'}
+        }
+
+
+class _SpanLines:
+    """json lines of the spans, only serialized by the writer thread"""
+
+    def __init__(self, spans: List[Span]):
+        self.spans = spans
+
+    def __str__(self):
+        return '\n'.join(json.dumps(span.to_dict(), default=str) for span in self.spans)
+
+
+class _SilentRotatingFileHandler(handlers.RotatingFileHandler):
+    """the errors writing the spans are ignored, the tracing must never break the server"""
+
+    def handleError(self, record):
+        pass
+
+
+class Tracer:
+    """
+    Records the time spent in each step of a command as spans. A span started
+    inside another one in the same thread is its child; the current span is
+    carried to other threads with wrap(). The event loop serves many commands
+    in one thread, so a span that spans an await is started with detached_span()
+    and only made current with activate() around the code that does not await.
+
+    The spans of a command share the command_id as trace id, so the pre and post
+    messages are grouped in the same trace. The clients don't write any span:
+    they send the timing of their steps before the write in the message
+    (client_spans), and the server adds them to the trace of the message.
+
+    The spans are written when the root span ends, from a background thread, to a
+    rotating file of json lines with the span fields of OpenTelemetry
+    (trace_id, span_id, parent_span_id, name, start_time_unix_nano,
+    end_time_unix_nano, attributes, status).
+    """
+    MAX_BYTES = 10 * 1024 * 1024
+    BACKUP_COUNT = 2
+    QUEUE_SIZE = 1000
+    RECENT_BYTES = 1024 * 1024
+
+    def __init__(self, path: str = TRACE_PATH, enabled: bool = TRACE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self.dropped = 0
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__records: Optional[queue.Queue] = None
+        self.__listener: Optional[handlers.QueueListener] = None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """child of the current span, and the current span within the block"""
+        with self.detached_span(name, **attributes) as span:
+            with self.activate(span):
+                yield span
+
+    @contextmanager
+    def detached_span(self, name: str, parent: Optional[Span] = None, **attributes):
+        """child of parent (or of the current span), that is not made the current span"""
+        if not self.enabled:
+            yield None
+            return
+
+        parent = parent if parent is not None else self.current_span()
+        trace = parent.trace if parent is not None else _Trace()
+        span = Span(trace, name, parent, attributes)
+        if parent is None:
+            trace.root = span
+
+        try:
+            yield span
+        except BaseException as err:
+            span.error = repr(err)
+            raise
+        finally:
+            span.end_time_unix_nano = now_unix_nano()
+            self.__finish(span)
+
+    @contextmanager
+    def activate(self, span: Optional[Span]):
+        """makes span the current span of the thread within the block"""
+        previous = self.current_span()
+        self.__local.span = span
+        try:
+            yield span
+        finally:
+            self.__local.span = previous
+
+    def wrap(self, function: Callable) -> Callable:
+        """function that runs with the current span of the caller, for the work sent to other threads"""
+        span = self.current_span()
+
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            with self.activate(span):
+                return function(*args, **kwargs)
+
+        return traced
+
+    def current_span(self) -> Optional[Span]:
+        return getattr(self.__local, 'span', None)
+
+    def set_command(self, command_id: str, **attributes):
+        """links the current trace to its command, the attributes are added to the root span"""
+        span = self.current_span()
+        if span is None:
+            return
+
+        span.trace.trace_id = trace_id_of(command_id)
+        span.trace.root.attributes.update(command_id=command_id, **attributes)
+
+    def add_client_spans(self, client_spans: List[ClientSpan]):
+        """adds the spans measured by the client to the current trace"""
+        current = self.current_span()
+        if current is None:
+            return
+
+        added: Dict[str, Span] = {}
+        for client_span in client_spans:
+            span = Span(current.trace, client_span.name, added.get(client_span.parent), {})
+            span.start_time_unix_nano = client_span.start_time_unix_nano
+            span.end_time_unix_nano = client_span.end_time_unix_nano
+            added[client_span.name] = span
+            self.__finish(span)
+
+    def flush(self):
+        """blocks until the spans finished are written"""
+        if self.__records is not None:
+            self.__records.join()
+
+    def close(self):
+        with self.__lock:
+            if self.__listener is not None:
+                self.__listener.stop()
+                self.__listener = None
+                self.__records = None
+
+    def recent_traces(self, count: int, user_name: Optional[str] = None,
+                      exclude_command_id: Optional[str] = None) -> List[List[dict]]:
+        """spans of the last count traces in the file, of the commands of user_name"""
+        self.flush()
+        excluded = trace_id_of(exclude_command_id) if exclude_command_id else None
+        traces: Dict[str, List[dict]] = {}
+        for span in self.__read_recent():
+            traces.setdefault(span['trace_id'], []).append(span)
+
+        selected = [spans for trace_id, spans in traces.items()
+                    if trace_id != excluded
+                    and (user_name is None
+                         or any(span['attributes'].get('user_name') == user_name for span in spans))]
+        selected.sort(key=lambda spans: min(span['start_time_unix_nano'] for span in spans))
+        return selected[-count:] if count > 0 else []
+
+    def __finish(self, span: Span):
+        trace = span.trace
+        with self.__lock:
+            if trace.exported:
+                spans = [span]
+            elif span is trace.root:
+                spans = trace.finished + [span]
+                trace.finished = []
+                trace.exported = True
+            else:
+                trace.finished.append(span)
+                return
+
+        self.__export(spans)
+
+    def __export(self, spans: List[Span]):
+        records = self.__start()
+        try:
+            records.put_nowait(logging.makeLogRecord({'msg': '%s', 'args': (_SpanLines(spans),)}))
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def __start(self) -> queue.Queue:
+        with self.__lock:
+            if self.__records is None:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                except OSError:
+                    pass
+                handler = _SilentRotatingFileHandler(self.path, maxBytes=self.MAX_BYTES,
+                                                     backupCount=self.BACKUP_COUNT, delay=True)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self.__records = queue.Queue(maxsize=self.QUEUE_SIZE)
+                self.__listener = handlers.QueueListener(self.__records, handler)
+                self.__listener.start()
+                atexit.register(self.close)
+            return self.__records
+
+    def __read_recent(self) -> List[dict]:
+        try:
+            with open(self.path, 'rb') as trace_file:
+                size = trace_file.seek(0, os.SEEK_END)
+                trace_file.seek(max(0, size - self.RECENT_BYTES))
+                lines = trace_file.read().splitlines()
+                if size > self.RECENT_BYTES:
+                    lines = lines[1:]
+        except OSError:
+            return []
+
+        spans = []
+        for line in lines:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+        return spans
+
+
+# pylint: disable= invalid-name
+current_tracer = Tracer()
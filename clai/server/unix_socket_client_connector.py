@@ -0,0 +1,27 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import socket
+
+from clai.server.logger import current_logger as logger
+from clai.server.socket_client_connector import SocketClientConnector
+
+
+# pylint: disable=too-few-public-methods
+class UnixSocketClientConnector(SocketClientConnector):
+    """Sends the messages through a local unix socket, or to the tcp port if nobody listens on it"""
+
+    def __init__(self, socket_path: str, host: str, port: int):
+        super().__init__(host, port)
+        self.socket_path = socket_path
+
+    def connect(self):
+        try:
+            self.register_socket(socket.AF_UNIX, self.socket_path)
+        except OSError as error:
+            logger.info(f"unix socket {self.socket_path} not available: {error}")
+            self.start_connections(self.host, int(self.port))
@@ -0,0 +1,51 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import socket
+
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.command_message import BASEDIR
+from clai.server.logger import current_logger as logger
+from clai.server.socket_server_connector import SocketServerConnector
+
+SERVER_SOCKET_PATH = os.getenv('CLAI_SOCKET', os.path.join(BASEDIR, 'clai.sock'))
+
+
+class UnixSocketServerConnector(SocketServerConnector):
+    """
+    Listens on a unix socket for the local shells besides the tcp port.
+    The socket file is only accessible by the user running the server.
+    """
+
+    def __init__(self, server_status_datasource: ServerStatusDatasource, socket_path: str = SERVER_SOCKET_PATH):
+        super().__init__(server_status_datasource)
+        self.socket_path = socket_path
+        self.unix_socket = None
+
+    def create_socket(self, host: str, port: int):
+        super().create_socket(host, port)
+
+        os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.unix_socket.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.unix_socket.listen()
+        self.unix_socket.setblocking(False)
+        self.listening_sockets.append(self.unix_socket)
+        logger.info(f"Listening {self.socket_path}")
+
+    def close_listening_sockets(self):
+        super().close_listening_sockets()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
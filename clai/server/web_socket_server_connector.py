@@ -6,10 +6,12 @@
 #
 
 import asyncio
-from typing import Callable
+import inspect
+from typing import Awaitable, Callable, Union
 import websockets
 
 
+from clai.server.command_message import Action
 from clai.server.server_connector import ServerConnector
 from clai.server.logger import current_logger as logger
 
@@ -22,7 +24,7 @@ class WebSocketServerConnector(ServerConnector):
     def create_socket(self, host: str, port: int):
         self.server_socket = websockets.serve(self.manage_messages, host, port)
 
-    def loop(self, process_message: Callable[[bytes], str]):
+    def loop(self, process_message: Callable[[bytes], Union[Action, Awaitable[Action]]]):
         self.process_message = process_message
         asyncio.get_event_loop().run_until_complete(self.server_socket)
         asyncio.get_event_loop().run_forever()
@@ -30,8 +32,10 @@ class WebSocketServerConnector(ServerConnector):
     # pylint: disable=unused-argument
     async def manage_messages(self, websocket, path):
         data = await websocket.recv()
-        logger.info(f" read from the web socket < {data}")
+        logger.payload("read from the web socket < %s", data)
         action = self.process_message(data)
+        if inspect.isawaitable(action):
+            action = await action
         print(f"> {action}")
         action_to_send = str(action.json()).encode('utf8')
         await websocket.send(action_to_send)
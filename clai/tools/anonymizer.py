@@ -5,19 +5,44 @@
 # of this source tree for licensing information.
 #
 
+import hashlib
+import hmac
 import json
 import os
+import secrets
+import tempfile
+import threading
 import uuid
 from typing import Mapping, Optional
 
 import clai
+from clai.server.command_message import BASEDIR
+from clai.server.logger import current_logger as logger
+
+SECRET_FILENAME = 'anonymize.key'
+SECRET_SIZE = 32
 
 
 # pylint: disable=too-few-public-methods
 class Anonymizer:
-    def __init__(self, alternate_path: Optional[str] = None):
+    """
+    Replaces a key (the user name) with a keyed hash of it, a HMAC-SHA256 with a
+    secret generated once for every user in $CLAI_BASEDIR/anonymize.key (only
+    readable by its owner), formatted as an uuid. The keys already in
+    anonymize.json, which kept a random uuid by key, keep their uuid. Both files
+    are read with the first key, after that anonymize doesn't do any I/O and
+    anonymize.json is never written again.
+
+    When the secret can't be read or written a random one is used for the life
+    of the process, so anonymize never fails and never returns the key.
+    """
+
+    def __init__(self, alternate_path: Optional[str] = None, secret_path: Optional[str] = None):
         self.__cache: Mapping[str, str] = None
+        self.__secret: Optional[bytes] = None
+        self.__lock = threading.Lock()
         self.alternate_path = alternate_path
+        self.secret_path = secret_path or os.path.join(BASEDIR, SECRET_FILENAME)
 
     def __get_config_path__(self):
         if self.alternate_path:
@@ -28,26 +53,61 @@ class Anonymizer:
         return filename
 
     def anonymize(self, key: str) -> str:
-        if not self.__cache:
+        if self.__secret is None:
             self.__init_cache__()
 
         if key in self.__cache:
             return self.__cache[key]
 
-        return self.__create_anonymize(key)
+        digest = hmac.new(self.__secret, key.encode('utf8'), hashlib.sha256).digest()
+        return str(uuid.UUID(bytes=digest[:16], version=4))
 
     def __init_cache__(self):
-        path = self.__get_config_path__()
+        with self.__lock:
+            if self.__secret is not None:
+                return
+
+            self.__cache = self.__load_cache(self.__get_config_path__())
+            try:
+                self.__secret = self.__load_secret(self.secret_path)
+            except (OSError, ValueError) as err:
+                logger.warning(f"error reading the anonymization secret {self.secret_path}, "
+                               f"the ids of this process won't match the other ones: {err}")
+                self.__secret = secrets.token_bytes(SECRET_SIZE)
 
-        if not os.path.exists(path):
-            self.__cache = {}
-            return
+    @staticmethod
+    def __load_cache(path: str) -> Mapping[str, str]:
+        try:
+            with open(path) as verify_file:
+                cache = json.load(verify_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning(f"error reading the anonymized ids {path}: {err}")
+            return {}
+        return cache if isinstance(cache, dict) else {}
 
-        with open(path) as verify_file:
-            self.__cache = json.load(verify_file)
+    @staticmethod
+    def __load_secret(secret_path: str) -> bytes:
+        if not os.path.exists(secret_path):
+            secret_dir = os.path.dirname(os.path.abspath(secret_path))
+            os.makedirs(secret_dir, exist_ok=True)
+            # written aside and linked, so every process reads the secret of the first one; mkstemp
+            # creates it readable only by its owner
+            file_descriptor, temporal_path = tempfile.mkstemp(dir=secret_dir, prefix='.anonymize')
+            try:
+                with os.fdopen(file_descriptor, 'w') as secret_file:
+                    secret_file.write(secrets.token_hex(SECRET_SIZE))
+                    secret_file.flush()
+                    os.fsync(secret_file.fileno())
+                os.link(temporal_path, secret_path)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temporal_path)
 
-    def __create_anonymize(self, key: str) -> str:
-        self.__cache[key] = str(uuid.uuid4())
-        with open(self.__get_config_path__(), 'w+') as json_file:
-            json.dump(self.__cache, json_file)
-        return self.__cache[key]
+        with open(secret_path) as secret_file:
+            secret = bytes.fromhex(secret_file.read().strip())
+        if not secret:
+            raise ValueError('empty secret')
+        return secret
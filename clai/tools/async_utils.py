@@ -0,0 +1,18 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import asyncio
+from typing import Any, Awaitable
+
+
+def run_coroutine(awaitable: Awaitable) -> Any:
+    """runs the awaitable in a new event loop of the calling thread, like asyncio.run of python 3.7"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
@@ -9,6 +9,13 @@
 import io
 import os
 import platform
+import threading
+from collections import deque
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+HISTORY_TAIL_LINES = 1000
+HISTORY_BLOCK_SIZE = 8192
+HISTORY_FINGERPRINT_SIZE = 256
 
 
 def is_windows():
@@ -74,3 +81,116 @@ def read_history():
                        encoding='utf-8',
                        errors='ignore').readlines()
     return []
+
+
+def read_lines_backwards(file: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """yields the lines of the file, with their offset, from the last one to the first one"""
+    position = file.seek(0, os.SEEK_END)
+    pending = b''
+    while position > 0:
+        read_size = min(HISTORY_BLOCK_SIZE, position)
+        position -= read_size
+        file.seek(position)
+        pending = file.read(read_size) + pending
+
+        line_start = pending.rfind(b'\n', 0, len(pending) - 1) + 1
+        while line_start > 0:
+            yield position + line_start, pending[line_start:]
+            pending = pending[:line_start]
+            line_start = pending.rfind(b'\n', 0, len(pending) - 1) + 1
+
+    if pending:
+        yield 0, pending
+
+
+def append_to_last_history_line(value: str):
+    """replaces the trailing whitespace of the last line of the history with value"""
+    with open(get_history_file_name(), 'a+b') as file:
+        for offset, line in read_lines_backwards(file):
+            file.truncate(offset + len(line.rstrip()))
+            break
+        file.write(value.encode('utf-8'))
+
+
+class HistoryFileTail:
+    def __init__(self, inode: int, size: int, fingerprint: bytes, lines: deque, last_line_offset: int):
+        self.inode = inode
+        self.size = size
+        self.fingerprint = fingerprint
+        self.lines = lines
+        self.last_line_offset = last_line_offset
+
+
+class HistoryReader:
+    """
+    Keeps the last lines of the history files. After the first read from the end
+    of the file, only the bytes appended since the previous call are read; the
+    tail is read again when the file is replaced, truncated or edited.
+    """
+
+    def __init__(self, max_lines: int = HISTORY_TAIL_LINES):
+        self.max_lines = max_lines
+        self.__tails: Dict[str, HistoryFileTail] = {}
+        self.__lock = threading.Lock()
+
+    def read_tail(self, history_file_name: Optional[str] = None) -> List[str]:
+        history_file_name = history_file_name or get_history_file_name()
+        if not os.path.isfile(history_file_name):
+            return []
+
+        with self.__lock, open(history_file_name, 'rb') as file:
+            tail = self.__tails.get(history_file_name)
+            if tail is None or not self.__is_appended(file, tail):
+                tail = self.__read_from_end(file)
+            else:
+                tail = self.__read_appended(file, tail)
+            self.__tails[history_file_name] = tail
+            return list(tail.lines)
+
+    @staticmethod
+    def __is_appended(file: BinaryIO, tail: HistoryFileTail) -> bool:
+        stat = os.fstat(file.fileno())
+        if stat.st_ino != tail.inode or stat.st_size < tail.size:
+            return False
+
+        file.seek(tail.size - len(tail.fingerprint))
+        return file.read(len(tail.fingerprint)) == tail.fingerprint
+
+    def __read_from_end(self, file: BinaryIO) -> HistoryFileTail:
+        lines = deque(maxlen=self.max_lines)
+        last_line_offset = 0
+        for offset, line in read_lines_backwards(file):
+            if not lines:
+                last_line_offset = offset
+            lines.appendleft(line.decode('utf-8', errors='ignore'))
+            if len(lines) == self.max_lines:
+                break
+
+        return self.__new_tail(file, lines, last_line_offset)
+
+    def __read_appended(self, file: BinaryIO, tail: HistoryFileTail) -> HistoryFileTail:
+        file.seek(tail.last_line_offset)
+        appended_lines = io.BytesIO(file.read()).readlines()
+        if tail.lines:
+            tail.lines.pop()
+
+        last_line_offset = tail.last_line_offset
+        for line in appended_lines:
+            tail.lines.append(line.decode('utf-8', errors='ignore'))
+            last_line_offset += len(line)
+        if appended_lines:
+            last_line_offset -= len(appended_lines[-1])
+
+        return self.__new_tail(file, tail.lines, last_line_offset)
+
+    @staticmethod
+    def __new_tail(file: BinaryIO, lines: deque, last_line_offset: int) -> HistoryFileTail:
+        size = file.seek(0, os.SEEK_END)
+        fingerprint_size = min(HISTORY_FINGERPRINT_SIZE, size)
+        file.seek(size - fingerprint_size)
+        return HistoryFileTail(os.fstat(file.fileno()).st_ino, size, file.read(fingerprint_size), lines,
+                               last_line_offset)
+
+
+# pylint: disable= invalid-name
+history_reader = HistoryReader()
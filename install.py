@@ -281,6 +281,7 @@ def install_orchestration_dependencies(path, orchestrator_name):
 
 def cli_executable(cli_path):
     os.system(f'chmod 777 {cli_path}/clai-run')
+    os.system(f'chmod 777 {cli_path}/clai-relay')
     os.system(f'chmod 777 {cli_path}/fswatchlog')
     os.system(f'chmod 777 {cli_path}/obtain-command-id')
     os.system(f'chmod 777 {cli_path}/post-execution')
@@ -343,6 +344,7 @@ def save_report_info(unassisted, agent_datasource, bin_path, demo_mode):
                 "to the CLAI team in order to help improve it?")
 
     agent_datasource.mark_report_enable(enable_report)
+    agent_datasource.config_storage.flush()
     stats_tracker = StatsTracker(sync=True, anonymizer=Anonymizer(alternate_path=f'{bin_path}/anonymize.json'))
     stats_tracker.report_enable = enable_report
     stats_tracker.log_install(getpass.getuser())
@@ -354,6 +356,7 @@ def mark_user_flag(bin_path: str, value: bool):
     plugins_config = config_storage.read_config(None)
     plugins_config.user_install = value
     config_storage.store_config(plugins_config, None)
+    config_storage.flush()
 
 def execute(args):
     unassisted = args.unassisted
@@ -109,6 +109,14 @@ preexec_override_invoke() {
 #subscribe the function
 preexec_functions+=(preexec_override_invoke)
 
+#launch the relay that keeps the connection of this shell with the server
+if [[ -f $CLAI_PATH/bin/clai-relay ]]; then
+  CLAI_RELAY_SOCKET="${CLAI_BASEDIR:-$HOME/.clai}/relay-$$.sock"
+  mkdir -p "$(dirname "$CLAI_RELAY_SOCKET")"
+  export CLAI_RELAY_SOCKET
+  ($CLAI_PATH/bin/clai-relay $$ "$CLAI_RELAY_SOCKET" > /dev/null 2>&1 &)
+fi
+
 #launch server
 if ! ps -Ao args | grep "[c]lai-run" > /dev/null 2>&1; then
   eval nohup $CLAI_PATH/bin/clai-run new $flags &
@@ -5,7 +5,7 @@
 # of this source tree for licensing information.
 #
 
-from typing import List
+from typing import Callable, List, Optional
 
 from clai.server.agent import Agent
 from clai.server.agent_datasource_executor import AgentDatasourceExecutor
@@ -15,7 +15,8 @@ from clai.server.command_message import State, Action
 
 # pylint: disable=too-few-public-methods
 class MockExecutor(AgentExecutor):
-    def execute_agents(self, command: State, agents: List[Agent]) -> List[Action]:
+    def execute_agents(self, command: State, agents: List[Agent],
+                       can_decide: Optional[Callable[[List[Action]], bool]] = None) -> List[Optional[Action]]:
         return list(map(lambda agent: self.execute(command, agent), agents))
 
     @staticmethod
@@ -0,0 +1,57 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TelemetryEndpoint:
+    """Local stand-in of the telemetry endpoint that keeps the batches received"""
+
+    def __init__(self):
+        self.batches = []
+        self.connections = set()
+        self.status_code = 200
+        self.received = threading.Event()
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            # pylint: disable=invalid-name
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                endpoint.connections.add(self.client_address)
+                if endpoint.status_code == 200:
+                    endpoint.batches.append(json.loads(gzip.decompress(body)))
+                    endpoint.received.set()
+
+                self.send_response(endpoint.status_code)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/store'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def records(self):
+        return [record for batch in self.batches for record in batch]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,37 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import pkgutil
+
+from clai.datasource.config_storage import ConfigStorage
+from clai.server.agent_datasource import AgentDatasource
+
+
+def test_should_scan_the_plugins_only_once(mocker):
+    mocker.patch.object(ConfigStorage, 'load_installed', return_value=['nlc2cmd'], autospec=True)
+    spy_iter_modules = mocker.spy(pkgutil, 'iter_modules')
+    agent_datasource = AgentDatasource()
+
+    by_pkg_name = agent_datasource.get_agent_descriptor('nlc2cmd')
+    by_name = agent_datasource.get_agent_descriptor(by_pkg_name.name)
+    agent_datasource.all_plugins()
+
+    assert by_name is by_pkg_name
+    assert by_pkg_name.installed
+    assert agent_datasource.get_agent_descriptor('wrong_agent') is None
+    assert spy_iter_modules.call_count == 1
+
+
+def test_should_scan_the_plugins_again_on_reload(mocker):
+    mocker.patch.object(ConfigStorage, 'load_installed', return_value=[], autospec=True)
+    spy_iter_modules = mocker.spy(pkgutil, 'iter_modules')
+    agent_datasource = AgentDatasource()
+    agent_datasource.all_plugins()
+
+    agent_datasource.reload()
+
+    assert spy_iter_modules.call_count == 2
@@ -0,0 +1,149 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import threading
+import time
+
+from test.state_mother import command_state
+from clai.server.agent import Agent
+from clai.server.agent_executor import ThreadExecutor
+from clai.server.agent_runner import AgentRunner
+from clai.server.command_message import Action
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.orchestration.patterns.max_orchestrator.max_orchestrator import MaxOrchestrator
+from clai.server.orchestration.patterns.preference_orchestrator.preference_orchestrator import \
+    PreferenceOrchestrator
+
+MAX_TIME = 0.2
+
+
+class FastAgent(Agent):
+    def get_next_action(self, state):
+        return Action(suggested_command="fast")
+
+
+class DecisiveAgent(Agent):
+    def get_next_action(self, state):
+        return Action(suggested_command="decisive", confidence=1.0)
+
+
+class SlowAgent(Agent):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.executions = 0
+
+    def get_next_action(self, state):
+        self.executions += 1
+        self.release.wait(5)
+        return Action(suggested_command="slow")
+
+
+def test_should_answer_before_the_deadline_and_discard_slow_agents(mocker):
+    mocker.patch.object(ThreadExecutor, 'MAX_TIME_PLUGIN_EXECUTION', MAX_TIME)
+    slow_agent = SlowAgent()
+    executor = ThreadExecutor()
+
+    start = time.monotonic()
+    actions = executor.execute_agents(command_state(), [slow_agent, FastAgent()])
+    elapsed = time.monotonic() - start
+    slow_agent.release.set()
+
+    assert elapsed < MAX_TIME * 3
+    assert actions[0] is None
+    assert actions[1].suggested_command == "fast"
+
+
+def test_should_skip_an_agent_while_its_overdue_execution_is_running(mocker):
+    mocker.patch.object(ThreadExecutor, 'MAX_TIME_PLUGIN_EXECUTION', MAX_TIME)
+    slow_agent = SlowAgent()
+    executor = ThreadExecutor()
+
+    executor.execute_agents(command_state(), [slow_agent])
+    actions = executor.execute_agents(command_state(), [slow_agent, FastAgent()])
+    slow_agent.release.set()
+
+    assert slow_agent.executions == 1
+    assert actions[0] is None
+    assert actions[1].suggested_command == "fast"
+
+
+def test_should_pair_the_agents_that_answered_with_their_actions(mocker):
+    mocker.patch.object(ThreadExecutor, 'MAX_TIME_PLUGIN_EXECUTION', MAX_TIME)
+    mocker.patch('clai.server.agent_runner.ActionRemoteStorage')
+    slow_agent = SlowAgent()
+    agent_datasource = mocker.MagicMock()
+    agent_datasource.get_current_orchestrator.return_value = 'max_orchestrator'
+    agent_datasource.get_shadow_orchestrators.return_value = []
+    agent_datasource.get_instances.return_value = [slow_agent, FastAgent()]
+    orchestrator = MaxOrchestrator()
+    choose_action = mocker.spy(orchestrator, 'choose_action')
+    orchestrator_provider = OrchestratorProvider(agent_datasource)
+    orchestrator_provider.orchestrator_instances['max_orchestrator'] = orchestrator
+    runner = AgentRunner(agent_datasource, orchestrator_provider)
+
+    runner.process(command_state(), True)
+    slow_agent.release.set()
+
+    assert choose_action.call_args[1]['agent_names'] == ["FastAgent"]
+    candidate_actions = choose_action.call_args[1]['candidate_actions']
+    assert [action.suggested_command for action in candidate_actions] == ["fast"]
+
+
+def test_should_reuse_the_same_pool_for_every_command():
+    executor = ThreadExecutor()
+    pool = executor.executor
+
+    executor.execute_agents(command_state(), [FastAgent()])
+    actions = executor.execute_agents(command_state(), [FastAgent()])
+
+    assert executor.executor is pool
+    assert actions[0].agent_owner == "FastAgent"
+
+
+def test_should_discard_an_agent_after_its_own_latency_budget(mocker):
+    mocker.patch.object(ThreadExecutor, 'MAX_TIME_PLUGIN_EXECUTION', 5)
+    slow_agent = SlowAgent()
+    slow_agent.latency_budget = MAX_TIME
+    executor = ThreadExecutor()
+
+    start = time.monotonic()
+    actions = executor.execute_agents(command_state(), [slow_agent, FastAgent()])
+    elapsed = time.monotonic() - start
+    slow_agent.release.set()
+
+    assert elapsed < MAX_TIME * 3
+    assert actions[0] is None
+    assert actions[1].suggested_command == "fast"
+
+
+def test_should_stop_waiting_when_the_orchestrator_can_decide(mocker):
+    mocker.patch.object(ThreadExecutor, 'MAX_TIME_PLUGIN_EXECUTION', 5)
+    slow_agent = SlowAgent()
+    executor = ThreadExecutor()
+    orchestrator = MaxOrchestrator()
+
+    start = time.monotonic()
+    actions = executor.execute_agents(
+        command_state(), [slow_agent, DecisiveAgent()],
+        lambda candidates: orchestrator.can_decide(candidates, ["DecisiveAgent"]))
+    elapsed = time.monotonic() - start
+    slow_agent.release.set()
+
+    assert elapsed < 1
+    assert actions[0] is None
+    assert actions[1].suggested_command == "decisive"
+
+
+def test_should_decide_with_the_actions_listed_by_an_agent():
+    orchestrator = PreferenceOrchestrator()
+    listed = [Action(suggested_command="decisive", confidence=1.0, agent_owner="DecisiveAgent"),
+              Action(suggested_command="other", confidence=0.5, agent_owner="DecisiveAgent")]
+    subordinated = [Action(suggested_command="nlc2cmd", confidence=1.0, agent_owner="NLC2CMD")]
+
+    assert orchestrator.can_decide([[], listed], ["DecisiveAgent"])
+    assert not orchestrator.can_decide([subordinated], ["NLC2CMD"])
@@ -0,0 +1,90 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import json
+import os
+import stat
+import uuid
+
+from clai.tools.anonymizer import Anonymizer, SECRET_FILENAME
+
+LEGACY_ID = '7d1f0bd2-54c0-4fb8-9bd5-3c0b3f0f1a9e'
+
+
+def create_anonymizer(directory, secret_directory=None) -> Anonymizer:
+    return Anonymizer(alternate_path=str(directory / 'anonymize.json'),
+                      secret_path=str((secret_directory or directory) / SECRET_FILENAME))
+
+
+def test_should_anonymize_the_same_key_with_the_same_id(tmp_path):
+    anonymizer = create_anonymizer(tmp_path)
+
+    anonymized = anonymizer.anonymize('any_user')
+
+    assert anonymized == anonymizer.anonymize('any_user')
+    assert anonymized != anonymizer.anonymize('other_user')
+    assert anonymized != 'any_user'
+    assert uuid.UUID(anonymized).version == 4
+
+
+def test_should_keep_the_ids_between_instances_without_storing_the_keys(tmp_path):
+    path = tmp_path / 'anonymize.json'
+    path.write_text('{}')
+
+    anonymized = create_anonymizer(tmp_path).anonymize('any_user')
+
+    assert create_anonymizer(tmp_path).anonymize('any_user') == anonymized
+    assert path.read_text() == '{}'
+    assert (tmp_path / SECRET_FILENAME).exists()
+
+
+def test_should_keep_the_secret_readable_only_by_its_owner(tmp_path):
+    create_anonymizer(tmp_path, tmp_path / 'basedir').anonymize('any_user')
+
+    assert stat.S_IMODE(os.stat(str(tmp_path / 'basedir' / SECRET_FILENAME)).st_mode) == 0o600
+
+
+def test_should_use_a_different_id_with_a_different_secret(tmp_path):
+    first = create_anonymizer(tmp_path, tmp_path / 'first').anonymize('any_user')
+    second = create_anonymizer(tmp_path, tmp_path / 'second').anonymize('any_user')
+
+    assert first != second
+
+
+def test_should_keep_the_ids_already_stored(tmp_path):
+    path = tmp_path / 'anonymize.json'
+    path.write_text(json.dumps({'old_user': LEGACY_ID}))
+    anonymizer = create_anonymizer(tmp_path)
+
+    assert anonymizer.anonymize('old_user') == LEGACY_ID
+    assert anonymizer.anonymize('new_user') != LEGACY_ID
+    assert json.loads(path.read_text()) == {'old_user': LEGACY_ID}
+
+
+def test_should_anonymize_when_the_secret_can_not_be_read(tmp_path, mocker):
+    path = tmp_path / 'anonymize.json'
+    path.write_text(json.dumps({'old_user': LEGACY_ID}))
+    (tmp_path / SECRET_FILENAME).write_text('not a secret')
+    warning = mocker.patch('clai.tools.anonymizer.logger.warning')
+    anonymizer = create_anonymizer(tmp_path)
+
+    anonymized = anonymizer.anonymize('any_user')
+
+    assert anonymizer.anonymize('old_user') == LEGACY_ID
+    assert anonymized == anonymizer.anonymize('any_user')
+    assert uuid.UUID(anonymized).version == 4
+    warning.assert_called_once()
+
+
+def test_should_anonymize_when_the_secret_can_not_be_written(tmp_path, mocker):
+    mocker.patch('clai.tools.anonymizer.tempfile.mkstemp', side_effect=PermissionError('read only'))
+    mocker.patch('clai.tools.anonymizer.logger.warning')
+
+    anonymized = create_anonymizer(tmp_path).anonymize('any_user')
+
+    assert uuid.UUID(anonymized).version == 4
+    assert not (tmp_path / SECRET_FILENAME).exists()
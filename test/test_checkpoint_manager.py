@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import threading
+
+from clai.server.checkpoint_manager import CheckpointManager
+
+
+class Component:
+    def __init__(self, manager, dirpath):
+        self.manager = manager
+        self.dirpath = dirpath
+        self.state = {'counts': {'ls': 1}, 'threshold': 0.2}
+
+    def save_checkpoint(self):
+        return self.manager.save(self.dirpath, self.state)
+
+
+def test_should_write_only_the_variables_that_changed(tmp_path, mocker):
+    manager = CheckpointManager()
+    dirpath = str(tmp_path / 'component')
+    manager.save(dirpath, {'counts': {'ls': 1}, 'threshold': 0.2})
+    spy_replace = mocker.spy(os, 'replace')
+
+    manager.save(dirpath, {'counts': {'ls': 2}, 'threshold': 0.2})
+
+    assert spy_replace.call_count == 1
+    assert manager.load(dirpath) == {'counts': {'ls': 2}, 'threshold': 0.2}
+    assert sorted(os.listdir(dirpath)) == ['counts.p', 'threshold.p']
+
+
+def test_should_save_the_dirty_components_on_checkpoint_and_all_of_them_on_close(tmp_path):
+    manager = CheckpointManager()
+    dirty = Component(manager, str(tmp_path / 'dirty'))
+    clean = Component(manager, str(tmp_path / 'clean'))
+    manager.register(clean)
+    manager.mark_dirty(dirty)
+
+    manager.checkpoint()
+    saved_on_checkpoint = sorted(os.listdir(tmp_path))
+    manager.close()
+
+    assert saved_on_checkpoint == ['dirty']
+    assert sorted(os.listdir(tmp_path)) == ['clean', 'dirty']
+    assert manager.load(clean.dirpath) == clean.state
+
+
+def test_should_hold_the_lock_of_the_component_while_it_is_saved(tmp_path):
+    manager = CheckpointManager()
+    lock = threading.Lock()
+    component = Component(manager, str(tmp_path / 'component'))
+    held = []
+    component.save_checkpoint = lambda: held.append(lock.locked()) or True
+    manager.mark_dirty(component, lock)
+
+    manager.checkpoint()
+    manager.close()
+
+    assert held == [True, True]
+    assert not lock.locked()
@@ -0,0 +1,68 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import threading
+
+from test.test_message_frame import get_free_port
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.client_relay import ClientRelay
+from clai.server.command_message import Action, StateDTO
+from clai.server.socket_server_connector import SocketServerConnector
+from clai.server.unix_socket_client_connector import UnixSocketClientConnector
+
+ANY_USER = 'user'
+
+
+def start_server(port):
+    server_status = ServerStatusDatasource()
+    server_status.running = True
+    connector = SocketServerConnector(server_status)
+    connector.create_socket('localhost', port)
+
+    def echo_command(received_data: bytes) -> Action:
+        dto = StateDTO.parse_raw(received_data)
+        return Action(origin_command=dto.command, description=dto.command_id)
+
+    threading.Thread(target=connector.loop, args=(echo_command,), daemon=True).start()
+    return connector
+
+
+def start_relay(socket_path, port):
+    relay = ClientRelay(socket_path, 'localhost', port, server_socket_path=None)
+    relay.create_socket()
+    threading.Thread(target=relay.loop, daemon=True).start()
+    return relay
+
+
+def test_should_share_one_server_connection_for_all_the_messages_of_the_shell(tmp_path):
+    port = get_free_port()
+    socket_path = str(tmp_path / 'relay.sock')
+    server = start_server(port)
+    relay = start_relay(socket_path, port)
+
+    actions = [
+        UnixSocketClientConnector(socket_path, 'localhost', port).send(
+            StateDTO(command_id=command_id, user_name=ANY_USER, command='ls'))
+        for command_id in ('pre', 'files', 'post')
+    ]
+    relay.running = False
+
+    assert [action.description for action in actions] == ['pre', 'files', 'post']
+    assert len(server.connections) == 1
+
+
+def test_should_go_straight_to_the_server_when_the_relay_is_not_running(tmp_path):
+    port = get_free_port()
+    start_server(port)
+    socket_path = str(tmp_path / 'missing.sock')
+
+    action = UnixSocketClientConnector(socket_path, 'localhost', port).send(
+        StateDTO(command_id='1', user_name=ANY_USER, command='ls'))
+
+    assert not os.path.exists(socket_path)
+    assert action.description == '1'
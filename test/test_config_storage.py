@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import json
+import os
+
+import pytest
+
+from clai.datasource.config_storage import ConfigStorage
+
+ANY_USER = 'user'
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / 'configPlugins.json'
+    path.write_text(json.dumps({'default': ['demo_agent'], 'installed': ['demo_agent']}))
+    return path
+
+
+def test_should_not_read_the_file_again_while_it_does_not_change(config_path, mocker):
+    config_storage = ConfigStorage(alternate_path=str(config_path))
+    config_storage.read_config(ANY_USER)
+    spy_open = mocker.patch('builtins.open', side_effect=AssertionError('file read'))
+
+    plugins_config = config_storage.read_config(ANY_USER)
+
+    assert plugins_config.installed == ['demo_agent']
+    spy_open.assert_not_called()
+
+
+def test_should_read_the_file_again_when_it_changes(config_path, mocker):
+    mocker.patch.object(ConfigStorage, 'CHANGE_CHECK_INTERVAL', 0)
+    config_storage = ConfigStorage(alternate_path=str(config_path))
+    config_storage.read_config(ANY_USER)
+
+    config_path.write_text(json.dumps({'default': ['demo_agent'], 'installed': ['demo_agent', 'nlc2cmd']}))
+    os.utime(config_path, ns=(0, 0))
+
+    assert config_storage.read_config(ANY_USER).installed == ['demo_agent', 'nlc2cmd']
+
+
+def test_should_write_the_changes_together_when_flushed(config_path, mocker):
+    mocker.patch.object(ConfigStorage, 'WRITE_DELAY', 60)
+    config_storage = ConfigStorage(alternate_path=str(config_path))
+    plugins_config = config_storage.read_config(ANY_USER)
+    plugins_config.selected = ['nlc2cmd']
+    config_storage.store_config(plugins_config, ANY_USER)
+    plugins_config.installed.append('nlc2cmd')
+    config_storage.store_config(plugins_config, None)
+
+    not_flushed = json.loads(config_path.read_text())
+    config_storage.flush()
+    flushed = json.loads(config_path.read_text())
+
+    assert config_storage.read_config(ANY_USER).selected == ['nlc2cmd']
+    assert not_flushed['installed'] == ['demo_agent']
+    assert flushed['installed'] == ['demo_agent', 'nlc2cmd']
+    assert flushed['selected'] == {ANY_USER: ['nlc2cmd']}
+    assert os.listdir(config_path.parent) == ['configPlugins.json']
@@ -0,0 +1,68 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import io
+
+import pytest
+
+from clai.process_command import override_last_command
+from clai.restore_history import restore_history
+from clai.tools.file_util import HistoryReader, read_lines_backwards
+
+
+@pytest.fixture
+def history_file(tmp_path, monkeypatch):
+    history_path = tmp_path / 'history'
+    monkeypatch.setenv('HISTFILE', str(history_path))
+    return history_path
+
+
+def test_should_read_the_lines_from_the_end_with_their_offset(mocker):
+    mocker.patch('clai.tools.file_util.HISTORY_BLOCK_SIZE', 3)
+
+    lines = list(read_lines_backwards(io.BytesIO(b'ls\npwd\n\ncd /tmp')))
+
+    assert lines == [(8, b'cd /tmp'), (7, b'\n'), (3, b'pwd\n'), (0, b'ls\n')]
+
+
+def test_should_read_only_the_last_lines_and_the_appended_ones(history_file):
+    history_file.write_text(''.join(f'command {index}\n' for index in range(10)))
+    reader = HistoryReader(max_lines=3)
+
+    first_read = reader.read_tail(str(history_file))
+    with open(history_file, 'a') as file:
+        file.write('ls\npwd\n')
+    second_read = reader.read_tail(str(history_file))
+
+    assert first_read == ['command 7\n', 'command 8\n', 'command 9\n']
+    assert second_read == ['command 9\n', 'ls\n', 'pwd\n']
+
+
+def test_should_read_the_tail_again_when_the_history_is_rewritten(history_file):
+    history_file.write_text('ls\npwd\n')
+    reader = HistoryReader()
+    reader.read_tail(str(history_file))
+
+    history_file.write_text('cd\ngit status\n')
+
+    assert reader.read_tail(str(history_file)) == ['cd\n', 'git status\n']
+
+
+def test_should_override_the_last_command_in_place(history_file):
+    history_file.write_text('ls\nclai  \n')
+
+    override_last_command('\ngit status\n')
+
+    assert history_file.read_text() == 'ls\nclai\ngit status\n'
+
+
+def test_should_truncate_the_history_after_the_original_command(history_file):
+    history_file.write_text('pwd\nls\nls\n:\ncd\n')
+
+    restore_history('ls')
+
+    assert history_file.read_text() == 'pwd\nls\n'
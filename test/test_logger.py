@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import logging
+import threading
+
+import pytest
+
+from clai.server.logger import Logger, parse_levels
+
+
+class Spy:
+    def __init__(self, text):
+        self.text = text
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return self.text
+
+
+@pytest.fixture(name='log_path')
+def fixture_log_path(tmp_path):
+    return tmp_path / 'app.log'
+
+
+def create_logger(log_path, request, **kwargs):
+    logger = Logger(log_file=str(log_path), name=f'test_logger.{request.node.name}', **kwargs)
+    logger.start()
+    request.addfinalizer(logger.close)
+    return logger
+
+
+def test_should_write_directly_without_a_thread_until_started(log_path, request):
+    threads = threading.active_count()
+    logger = Logger(log_file=str(log_path), name=f'test_logger.{request.node.name}')
+    request.addfinalizer(logger.close)
+
+    logger.info("from a client")
+
+    assert threading.active_count() == threads
+    assert 'from a client' in log_path.read_text()
+
+
+def test_should_format_the_arguments_only_when_the_level_is_enabled(log_path, request):
+    logger = create_logger(log_path, request)
+    skipped = Spy('skipped')
+    written = Spy('written')
+
+    logger.debug("debug %s", skipped)
+    logger.info("info %s", written)
+    logger.flush()
+
+    assert skipped.formatted == 0
+    assert written.formatted > 0
+    assert 'info written' in log_path.read_text()
+    assert 'skipped' not in log_path.read_text()
+
+
+def test_should_use_the_level_of_each_category(log_path, request):
+    logger = create_logger(log_path, request, levels='search=DEBUG,orchestration=WARNING')
+
+    logger.debug("search detail", category='search')
+    logger.info("orchestration detail", category='orchestration')
+    logger.warning("orchestration warning", category='orchestration')
+    logger.debug("other detail")
+    logger.flush()
+
+    lines = log_path.read_text()
+    assert 'search detail' in lines
+    assert 'orchestration warning' in lines
+    assert 'orchestration detail' not in lines
+    assert 'other detail' not in lines
+
+
+def test_should_not_log_the_payloads_by_default(log_path, request):
+    logger = create_logger(log_path, request)
+    payload = Spy('payload')
+
+    logger.payload("received %s", payload)
+    logger.flush()
+
+    assert payload.formatted == 0
+    assert 'received' not in log_path.read_text()
+
+
+def test_should_sample_and_cap_the_payloads(log_path, request):
+    logger = create_logger(log_path, request, levels='payload=DEBUG', payload_sample=3, payload_max_length=10)
+
+    for index in range(6):
+        logger.payload("received %s", f'{index}' * 20)
+    logger.flush()
+
+    lines = [line for line in log_path.read_text().splitlines() if 'received' in line]
+    assert len(lines) == 2
+    assert lines[0].endswith('received 0000000000... (20 chars)')
+    assert lines[1].endswith('received 3333333333... (20 chars)')
+
+
+def test_should_show_the_caller_in_the_records(log_path, request):
+    logger = create_logger(log_path, request, levels='payload=DEBUG')
+
+    logger.info("from the test")
+    logger.payload("payload from the test %s", 'sent')
+    logger.flush()
+
+    lines = log_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert all(' test_should_show_the_caller_in_the_records(' in line for line in lines)
+
+
+def test_should_parse_the_levels_by_category():
+    assert parse_levels('search=debug, payload=DEBUG,wrong=LOUD,,empty=') == {
+        'search': logging.DEBUG,
+        'payload': logging.DEBUG
+    }
+    assert parse_levels(None) == {}
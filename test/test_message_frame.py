@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import socket
+import threading
+
+import pytest
+
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.command_message import Action, StateDTO
+from clai.server.message_frame import FrameDecoder, encode_frame, HEADER
+from clai.server.socket_client_connector import SocketClientConnector
+from clai.server.socket_server_connector import SocketServerConnector
+
+ANY_PAYLOAD = b'{"command": "ls"}'
+
+
+def get_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as free_socket:
+        free_socket.bind(('localhost', 0))
+        return free_socket.getsockname()[1]
+
+
+def test_should_decode_a_frame_received_in_one_chunk():
+    decoder = FrameDecoder()
+
+    frames = decoder.feed(encode_frame(ANY_PAYLOAD))
+
+    assert frames == [ANY_PAYLOAD]
+    assert not decoder.has_pending()
+
+
+def test_should_reassemble_a_frame_received_byte_by_byte():
+    decoder = FrameDecoder()
+    frame = encode_frame(ANY_PAYLOAD)
+
+    frames = []
+    for position in range(len(frame)):
+        frames += decoder.feed(frame[position:position + 1])
+
+    assert frames == [ANY_PAYLOAD]
+
+
+def test_should_split_several_frames_received_together():
+    decoder = FrameDecoder()
+
+    frames = decoder.feed(encode_frame(b'first') + encode_frame(b'') + encode_frame(b'second')[:4])
+
+    assert frames == [b'first', b'']
+    assert decoder.has_pending()
+
+
+def test_should_reject_frames_with_unknown_version():
+    decoder = FrameDecoder()
+
+    with pytest.raises(ValueError):
+        decoder.feed(HEADER.pack(99, 0))
+
+
+def test_should_send_and_receive_messages_bigger_than_the_buffer():
+    port = get_free_port()
+    server_status = ServerStatusDatasource()
+    server_status.running = True
+    connector = SocketServerConnector(server_status)
+    connector.create_socket('localhost', port)
+    big_stderr = 'e' * (SocketServerConnector.BUFFER_SIZE * 10)
+
+    def echo_stderr(received_data: bytes) -> Action:
+        dto = StateDTO.parse_raw(received_data)
+        return Action(origin_command=dto.command, description=dto.stderr)
+
+    server_thread = threading.Thread(target=connector.loop, args=(echo_stderr,), daemon=True)
+    server_thread.start()
+
+    client = SocketClientConnector('localhost', port)
+    action = client.send(StateDTO(command_id='1', user_name='user', command='ls', stderr=big_stderr))
+
+    assert action.origin_command == 'ls'
+    assert action.description == big_stderr
@@ -5,6 +5,8 @@
 # of this source tree for licensing information.
 #
 
+import asyncio
+import time
 from unittest import mock
 from unittest.mock import Mock
 
@@ -20,7 +22,8 @@ from clai.datasource.config_storage import ConfigStorage
 from clai.datasource.model.plugin_config import PluginConfig
 from clai.server.agent import Agent
 from clai.server.agent_datasource import AgentDatasource
-from clai.server.command_message import Action, NOOP_COMMAND
+from clai.server.command_message import Action, NOOP_COMMAND, State
+from clai.tools.async_utils import run_coroutine
 from clai.tools.colorize_console import Colorize
 
 NO_SELECTED = PluginConfig(default_orchestrator="max_orchestrator")
@@ -92,6 +95,7 @@ def test_should_return_the_list_of_plugins_with_selected_when_the_server_receive
     agent_selected = 'nlc2cmd'
     mocker.patch.object(AgentDatasource, 'all_plugins', return_value=ALL_PLUGINS, autospec=True)
     mocker.patch.object(ConfigStorage, 'read_all_user_config', return_value=None, autospec=True)
+    mocker.patch.object(ConfigStorage, 'load_installed', return_value=[], autospec=True)
     mocker.patch.object(
         ConfigStorage, 'read_config', return_value=PluginConfig(
             selected=[agent_selected], default_orchestrator="max_orchestrator"), autospec=True)
@@ -145,6 +149,7 @@ def test_should_return_the_list_with_the_new_selected_values_if_exists_and_is_in
         selected=["demo_agent"], default_orchestrator="max_orchestrator"), autospec=True)
     mocker.patch.object(ConfigStorage, 'store_config', return_value=None, autospec=True)
     mocker.patch.object(AgentDatasource, 'all_plugins', return_value=ALL_PLUGINS_WITH_TAR_INSTALLED, autospec=True)
+    mocker.patch.object(ConfigStorage, 'load_installed', return_value=['demo_agent', 'nlc2cmd'], autospec=True)
     message_handler = MessageHandler(ServerStatusDatasource(), AgentDatasource())
 
     select_agent = clai_select_state('nlc2cmd')
@@ -280,3 +285,49 @@ def test_should_return_valid_action_if_the_select_agent_return_none(mocker):
     assert action.origin_command == command_state().command
     assert not action.execute
     assert not action.description
+
+
+def test_should_return_the_action_of_an_agent_with_async_get_next_action(mocker):
+    action_to_execute = Action(suggested_command="command", confidence=1.0)
+
+    class AsyncAgent(Agent):
+        async def get_next_action(self, state):
+            return action_to_execute
+
+    agent = AsyncAgent()
+    mocker.patch.object(AgentDatasource, 'get_instances', return_value=[agent], autospec=True)
+    mocker.patch.object(ConfigStorage, 'read_config', return_value=PluginConfig(
+        selected=["demo_agent"], default_orchestrator="max_orchestrator"), autospec=True)
+    message_handler = MessageHandler(ServerStatusDatasource(), AgentDatasource())
+
+    action = run_coroutine(message_handler.process_message_async(command_state()))
+
+    assert action.suggested_command == action_to_execute.suggested_command
+    assert action.agent_owner == "AsyncAgent"
+
+
+def test_should_keep_the_order_of_a_user_and_drop_the_lock_when_idle(mocker):
+    mocker.patch.object(ConfigStorage, 'read_config', return_value=PluginConfig(
+        selected=["demo_agent"], default_orchestrator="max_orchestrator"), autospec=True)
+    message_handler = MessageHandler(ServerStatusDatasource(), AgentDatasource())
+    processed = []
+
+    def process_message(message):
+        time.sleep(0.1 if message.command == 'first' else 0)
+        processed.append(message.command)
+        return Action(origin_command=message.command)
+
+    mocker.patch.object(message_handler, 'process_message', side_effect=process_message)
+
+    async def send_all():
+        return await asyncio.gather(
+            message_handler.process_message_async(State('1', 'user', 'first')),
+            message_handler.process_message_async(State('2', 'user', 'second')),
+            message_handler.process_message_async(State('3', 'other_user', 'other')))
+
+    actions = run_coroutine(send_all())
+
+    assert [action.origin_command for action in actions] == ['first', 'second', 'other']
+    assert processed.index('first') < processed.index('second')
+    # pylint: disable=protected-access
+    assert not message_handler._MessageHandler__user_locks
@@ -0,0 +1,82 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import threading
+
+from clai.server.orchestration.orchestrator_learner import OrchestratorLearner
+from clai.server.orchestration.patterns.max_orchestrator.max_orchestrator import MaxOrchestrator
+
+
+class LearningOrchestrator(MaxOrchestrator):
+    def __init__(self):
+        super().__init__()
+        self.transitions = []
+        self.saves = 0
+        self.release = threading.Event()
+
+    def record_transition(self, prev_state, current_state_pre):
+        self.release.wait(5)
+        self.transitions.append((prev_state, current_state_pre))
+
+    def save(self):
+        self.saves += 1
+
+
+def test_should_record_the_transitions_without_waiting_for_the_orchestrator():
+    orchestrator = LearningOrchestrator()
+    learner = OrchestratorLearner()
+
+    for transition in range(3):
+        learner.record_transition(orchestrator, transition, transition + 1)
+    recorded_before_release = len(orchestrator.transitions)
+    orchestrator.release.set()
+    learner.wait()
+
+    assert recorded_before_release == 0
+    assert orchestrator.transitions == [(0, 1), (1, 2), (2, 3)]
+    assert orchestrator.saves == 1
+
+
+def test_should_drop_the_transitions_when_the_queue_is_full(mocker):
+    mocker.patch.object(OrchestratorLearner, 'QUEUE_SIZE', 1)
+    orchestrator = LearningOrchestrator()
+    learner = OrchestratorLearner()
+
+    for transition in range(5):
+        learner.record_transition(orchestrator, transition, transition + 1)
+    orchestrator.release.set()
+    learner.wait()
+
+    assert 1 <= len(orchestrator.transitions) < 5
+
+
+class CountingLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.acquisitions += 1
+
+    def __exit__(self, *args):
+        self.lock.release()
+
+
+def test_should_hold_the_lock_for_one_transition_at_a_time():
+    orchestrator = LearningOrchestrator()
+    lock = CountingLock()
+    learner = OrchestratorLearner(lock)
+
+    for transition in range(3):
+        learner.record_transition(orchestrator, transition, transition + 1)
+    orchestrator.release.set()
+    learner.wait()
+
+    assert len(orchestrator.transitions) == 3
+    # one by transition and one to save the checkpoint in wait
+    assert lock.acquisitions == 3 + 1
@@ -0,0 +1,164 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import uuid
+
+import pytest
+
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import Action, State, TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.orchestration.per_user_orchestrator import PerUserOrchestrator
+from clai.server.orchestration.patterns.threshold_orchestrator.threshold_orchestrator import Thresholder
+
+AGENT = 'demo_agent'
+
+
+@pytest.fixture(name='thresholder')
+def fixture_thresholder(tmp_path):
+    thresholder = Thresholder()
+    thresholder._save_basedir = str(tmp_path)
+    thresholder._save_dirpath = os.path.join(str(tmp_path), thresholder.orchestrator_name)
+    return thresholder
+
+
+def transition(user_name: str, executed: bool, command_id: str = '1',
+               agent: str = AGENT) -> TerminalReplayMemoryComplete:
+    suggestion = Action(suggested_command='ls', confidence=0.3, agent_owner=agent)
+    post_state = State(command_id, user_name, 'ls' if executed else 'pwd')
+    post_state.action_suggested = suggestion
+    post_state.suggested_executed = executed
+
+    replay = TerminalReplayMemoryComplete()
+    replay.pre_replay = TerminalReplayMemory(State(command_id, user_name, 'lss'), [agent], [suggestion], False,
+                                             suggestion)
+    replay.post_replay = TerminalReplayMemory(post_state, [agent], [], False, Action())
+    return replay
+
+
+def choose(orchestrator, user_name: str, command_id: str = '2'):
+    return orchestrator.choose_action(
+        command=State(command_id, user_name, 'lss'), agent_names=[AGENT],
+        candidate_actions=[Action(suggested_command='ls', confidence=0.3, agent_owner=AGENT)],
+        force_response=False, pre_post_state='pre')
+
+
+def current_state(user_name: str) -> TerminalReplayMemory:
+    return TerminalReplayMemory(State('2', user_name, 'ls'), [AGENT], [], False, Action())
+
+
+def serve(orchestrator, user_name: str, executed: bool, agent: str = AGENT):
+    """chooses the action of a new command of the user and learns its transition"""
+    command_id = str(uuid.uuid4())
+    choose(orchestrator, user_name, command_id)
+    orchestrator.record_transition(transition(user_name, executed, command_id, agent), current_state(user_name))
+
+
+def test_should_use_the_global_model_for_the_users_without_model(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder)
+
+    assert choose(orchestrator, 'cold_user').suggested_command == 'ls'
+    assert orchestrator.users() == []
+
+
+def test_should_learn_a_model_by_user(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder)
+
+    serve(orchestrator, 'accepts', executed=True)
+    for _ in range(3):
+        serve(orchestrator, 'rejects', executed=False)
+
+    assert choose(orchestrator, 'accepts').suggested_command == 'ls'
+    assert choose(orchestrator, 'rejects') is None
+    assert orchestrator.users() == ['accepts', 'rejects']
+
+
+def test_should_learn_in_the_global_model_only_the_transitions_it_served(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder)
+
+    for _ in range(3):
+        serve(orchestrator, 'rejects', executed=False)
+
+    assert thresholder._threshold_pre[AGENT] == pytest.approx(0.25)
+    assert choose(orchestrator, 'cold_user').suggested_command == 'ls'
+    assert choose(orchestrator, 'rejects') is None
+
+
+def test_should_serve_the_global_model_until_the_model_of_the_user_is_loaded(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder, max_users=1)
+    for _ in range(3):
+        serve(orchestrator, 'rejects', executed=False)
+    serve(orchestrator, 'other', executed=True)
+
+    assert orchestrator.users() == ['other']
+    assert choose(orchestrator, 'rejects').suggested_command == 'ls'
+    assert orchestrator.users() == ['other']
+
+    orchestrator.record_transition(transition('rejects', executed=False, command_id='2'), current_state('rejects'))
+
+    assert orchestrator.users() == ['rejects']
+    assert choose(orchestrator, 'rejects') is None
+
+
+def test_should_save_the_evicted_models_and_load_them_again(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder, max_users=2)
+
+    for _ in range(3):
+        serve(orchestrator, 'rejects', executed=False)
+    for user_name in ['first', 'second']:
+        serve(orchestrator, user_name, executed=True)
+
+    assert orchestrator.users() == ['first', 'second']
+    assert os.path.isdir(thresholder.user_save_dirpath('rejects'))
+
+    serve(orchestrator, 'rejects', executed=False)
+
+    assert orchestrator.users() == ['second', 'rejects']
+    assert choose(orchestrator, 'rejects') is None
+
+
+def test_should_keep_the_models_under_the_memory_cap(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder, max_memory=1)
+
+    for user_name in ['first', 'second', 'third']:
+        serve(orchestrator, user_name, executed=True)
+
+    assert orchestrator.users() == ['third']
+
+
+def test_should_measure_the_models_again_when_they_are_saved(thresholder):
+    orchestrator = PerUserOrchestrator(thresholder)
+    for user_name in ['first', 'second']:
+        serve(orchestrator, user_name, executed=True)
+    orchestrator.max_memory = orchestrator.memory
+
+    for index in range(20):
+        serve(orchestrator, 'second', executed=True, agent=f'agent_{index}')
+    orchestrator.save()
+
+    assert orchestrator.users() == ['second']
+
+
+def test_should_save_the_models_in_a_folder_named_after_the_hash_of_the_user(thresholder):
+    user_dirpaths = {thresholder.user_save_dirpath(user_name) for user_name in ['..', '../..', '/', 'user']}
+
+    assert len(user_dirpaths) == 4
+    assert all(os.path.dirname(dirpath).startswith(os.path.join(thresholder._save_basedir, 'users', ''))
+               for dirpath in user_dirpaths)
+    assert all('..' not in dirpath.split(os.sep) for dirpath in user_dirpaths)
+
+
+def test_should_wrap_the_orchestrators_declared_per_user(mocker):
+    orchestrator_provider = OrchestratorProvider(mocker.MagicMock())
+
+    orchestrator = orchestrator_provider.get_orchestrator_instance('threshold_orchestrator')
+    checkpoint_manager.unregister(orchestrator)
+
+    assert isinstance(orchestrator, PerUserOrchestrator)
+    assert isinstance(orchestrator.global_orchestrator, Thresholder)
+    assert orchestrator.orchestrator_name == 'Thresholder'
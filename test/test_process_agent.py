@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import subprocess
+
+import pytest
+
+from test.state_mother import command_state
+from clai.server.checkpoint_manager import checkpoint_manager
+from clai.server.command_message import State
+from clai.server.process_agent import ProcessAgent
+from clai.server.state_serialization import state_from_dict, state_to_dict
+
+WORKER_AGENT_MODULE = 'test.worker_agent'
+
+
+@pytest.fixture
+def process_agent(tmp_path, monkeypatch):
+    # the workers save their agent in the base dir of their environment
+    monkeypatch.setenv('CLAI_BASEDIR', str(tmp_path))
+    agent = ProcessAgent('worker_agent', WORKER_AGENT_MODULE)
+    agent.init_agent()
+    yield agent
+    agent.close()
+
+
+def state_with_command(command, previous_execution=None):
+    return State(command_id='1', user_name='user', command=command, previous_execution=previous_execution)
+
+
+def test_should_keep_the_state_values_when_it_is_serialized():
+    state = command_state()
+    state.previous_execution = state_with_command('previous', state_with_command('too old'))
+    state.values_executed = ['ls']
+
+    restored = state_from_dict(state_to_dict(state))
+
+    assert restored.command == state.command
+    assert restored.processes == state.processes
+    assert restored.values_executed == ['ls']
+    assert restored.previous_execution.command == 'previous'
+    assert restored.previous_execution.previous_execution is None
+
+
+def test_should_execute_the_agent_in_a_warm_worker_process(process_agent):
+    first = process_agent.execute(state_with_command('ls', state_with_command('pwd')))
+    second = process_agent.execute(state_with_command('cd'))
+
+    assert process_agent.agent_name == 'WorkerAgent'
+    assert first.suggested_command == 'ls'
+    assert first.origin_command == 'pwd'
+    assert first.agent_owner == 'WorkerAgent'
+    assert first.description == second.description != str(os.getpid())
+
+
+def test_should_return_the_list_of_actions_of_the_agent(process_agent):
+    actions = process_agent.execute(state_with_command('many'))
+
+    assert [action.suggested_command for action in actions] == ['first', 'second']
+
+
+def test_should_restart_the_worker_after_a_crash(process_agent):
+    before = process_agent.execute(state_with_command('ls'))
+    crashed = process_agent.execute(state_with_command('crash'))
+    after = process_agent.execute(state_with_command('ls'))
+
+    assert not crashed.suggested_command
+    assert crashed.agent_owner == 'WorkerAgent'
+    assert after.suggested_command == 'ls'
+    assert after.description != before.description
+    assert process_agent.restarts == 1
+
+
+def test_should_save_the_agent_of_the_worker_when_it_is_closed(process_agent, tmp_path):
+    process_agent.execute(state_with_command('ls'))
+    process_agent.execute(state_with_command('pwd'))
+
+    process_agent.close()
+
+    assert checkpoint_manager.load(str(tmp_path / 'saved_agents' / 'WorkerAgent')) == {'executions': 2}
+
+
+def test_should_kill_a_worker_that_does_not_exit(process_agent, mocker):
+    mocker.patch.object(ProcessAgent, 'STOP_TIMEOUT', 0.1)
+    process = process_agent._ProcessAgent__process  # pylint: disable=protected-access
+    mocker.patch.object(process, 'wait', side_effect=[subprocess.TimeoutExpired('worker', 0.1), 0])
+    mocker.patch.object(process, 'kill')
+
+    process_agent.close()
+
+    process.kill.assert_called_once()
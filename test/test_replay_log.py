@@ -0,0 +1,149 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import threading
+
+from clai.datasource.action_remote_storage import ActionRemoteStorage
+from clai.server.checkpoint_manager import CheckpointManager, checkpoint_manager
+from clai.server.command_message import Action, State, TerminalReplayMemory, TerminalReplayMemoryComplete
+from clai.server.orchestration import replay_evaluation
+from clai.server.orchestration.orchestrator import Orchestrator
+from clai.server.orchestration.orchestrator_storage import OrchestratorStorage
+from clai.server.orchestration.replay_log import ReplayLog, read_replay_log
+
+ANY_USER = 'any_user'
+
+
+def transition(index: int, confidence: float = 0.9, accepted: bool = True) -> TerminalReplayMemoryComplete:
+    typed = f'command {index}'
+    candidate = Action(suggested_command=f'suggested {index}', confidence=confidence, agent_owner='demo_agent')
+    suggested = candidate if confidence >= 0.5 else Action()
+
+    replay = TerminalReplayMemoryComplete()
+    replay.pre_replay = TerminalReplayMemory(State(f'{index}', ANY_USER, typed), ['demo_agent'], [candidate],
+                                             False, suggested)
+    # like the server, the post state keeps the command typed and tells if the suggestion was executed
+    executed = State(f'{index}', ANY_USER, typed, result_code='0')
+    executed.action_suggested = suggested
+    executed.suggested_executed = accepted and suggested.suggested_command is not None
+    replay.post_replay = TerminalReplayMemory(executed, ['demo_agent'], [], False, Action())
+    return replay
+
+
+def write_log(path, transitions):
+    replay_log = ReplayLog(str(path))
+    for replay in transitions:
+        replay_log.append(replay)
+    replay_log.flush()
+
+
+def test_should_read_the_transitions_in_the_order_they_were_appended(tmp_path, mocker):
+    mocker.patch.object(ReplayLog, 'FLUSH_SIZE', 3)
+    log_path = tmp_path / 'replay.log.gz'
+
+    write_log(log_path, [transition(index) for index in range(10)])
+    replays = list(read_replay_log(str(log_path)))
+
+    assert [replay.pre_replay.command.command for replay in replays] == [f'command {index}' for index in range(10)]
+    assert replays[4].pre_replay.candidate_actions[0].agent_owner == 'demo_agent'
+    assert replays[4].post_replay.command.suggested_executed
+    assert replays[4].pre_replay.suggested_command.suggested_command == 'suggested 4'
+
+
+def test_should_keep_appending_to_an_existing_log(tmp_path):
+    log_path = tmp_path / 'replay.log.gz'
+
+    write_log(log_path, [transition(0)])
+    write_log(log_path, [transition(1)])
+
+    assert len(list(read_replay_log(str(log_path)))) == 2
+
+
+def test_should_read_the_complete_batches_of_a_cut_log(tmp_path, mocker):
+    mocker.patch.object(ReplayLog, 'FLUSH_SIZE', 2)
+    log_path = tmp_path / 'replay.log.gz'
+    write_log(log_path, [transition(0), transition(1)])
+    complete_size = log_path.stat().st_size
+    write_log(log_path, [transition(2), transition(3)])
+
+    log_path.write_bytes(log_path.read_bytes()[:complete_size + 20])
+
+    assert len(list(read_replay_log(str(log_path)))) == 2
+
+
+def test_should_log_the_complete_transitions_from_the_storage(tmp_path, mocker):
+    mocker.patch.object(ActionRemoteStorage, 'store')
+    orchestrator_provider = mocker.MagicMock()
+    replay_log = ReplayLog(str(tmp_path / 'replay.log.gz'))
+    storage = OrchestratorStorage(orchestrator_provider, ActionRemoteStorage(), replay_log=replay_log)
+
+    for index in range(3):
+        replay = transition(index)
+        storage.store_pre(replay.pre_replay)
+        storage.store_post(replay.post_replay)
+    storage.learner.transitions.join()
+    replay_log.flush()
+
+    logged = [replay.pre_replay.command.command for replay in read_replay_log(replay_log.path)]
+    assert logged == ['command 0', 'command 1']
+
+
+def test_should_write_the_replay_log_from_the_learner_thread(tmp_path, mocker):
+    mocker.patch.object(ActionRemoteStorage, 'store')
+    replay_log = ReplayLog(str(tmp_path / 'replay.log.gz'))
+    threads = []
+    mocker.patch.object(replay_log, 'append', lambda replay: threads.append(threading.current_thread().name))
+    storage = OrchestratorStorage(mocker.MagicMock(), ActionRemoteStorage(), replay_log=replay_log)
+
+    for index in range(3):
+        replay = transition(index)
+        storage.store_pre(replay.pre_replay)
+        storage.store_post(replay.post_replay)
+    storage.learner.transitions.join()
+
+    assert threads == ['orchestrator-learner', 'orchestrator-learner']
+
+
+def test_should_evaluate_the_orchestrators_with_a_log(tmp_path):
+    log_path = tmp_path / 'replay.log.gz'
+    write_log(log_path, [transition(index, confidence) for index, confidence in enumerate([0.9, 0.1, 0.9, 0.8])])
+
+    evaluations = replay_evaluation.evaluate([str(log_path)], ['max_orchestrator', 'not_an_orchestrator'])
+
+    max_orchestrator, missing = evaluations
+    assert max_orchestrator.decisions == 4
+    assert max_orchestrator.agreement == 1.0
+    assert max_orchestrator.mean_reward == 0.75
+    assert len(max_orchestrator.latencies) == 4
+    assert missing.error
+
+
+def test_should_reward_the_suggestions_the_user_executed(tmp_path):
+    log_path = tmp_path / 'replay.log.gz'
+    write_log(log_path, [transition(index, accepted=accepted)
+                         for index, accepted in enumerate([True, True, True, False])])
+
+    [max_orchestrator] = replay_evaluation.evaluate([str(log_path)], ['max_orchestrator'])
+
+    assert max_orchestrator.agreement == 1.0
+    assert max_orchestrator.mean_reward == 0.5
+
+
+def test_should_not_save_the_orchestrators_it_evaluates(tmp_path, mocker):
+    log_path = tmp_path / 'replay.log.gz'
+    write_log(log_path, [transition(0)])
+
+    def warm_start(orchestrator):
+        checkpoint_manager.save(orchestrator.user_save_dirpath(ANY_USER), {'warm_start': 1})
+        return {}
+
+    mocker.patch.object(Orchestrator, 'load', warm_start)
+    write = mocker.patch.object(CheckpointManager, '_CheckpointManager__write_atomically')
+
+    replay_evaluation.evaluate([str(log_path)], ['threshold_orchestrator'])
+
+    write.assert_not_called()
@@ -0,0 +1,47 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+from clai.datasource.server_pending_actions_datasource import ServerPendingActionsDatasource
+from clai.server.command_message import Action
+
+ANY_USER = 'user'
+
+
+def actions(*commands):
+    return [Action(suggested_command=command) for command in commands]
+
+
+def test_should_return_the_pending_actions_of_the_command_in_order():
+    datasource = ServerPendingActionsDatasource()
+
+    first = datasource.store_pending_actions('1', actions('ls', 'pwd'), ANY_USER)
+    second = datasource.get_next_action('1', ANY_USER)
+
+    assert first.suggested_command == 'ls'
+    assert first.pending_actions
+    assert second.suggested_command == 'pwd'
+    assert not second.pending_actions
+    assert datasource.get_next_action('1', ANY_USER) is None
+
+
+def test_should_forget_the_oldest_commands_after_the_limit():
+    datasource = ServerPendingActionsDatasource(max_commands=2)
+    for command_id in ('1', '2', '3'):
+        datasource.store_pending_actions(command_id, actions('ls', 'pwd'), ANY_USER)
+
+    assert datasource.get_next_action('1', ANY_USER) is None
+    assert datasource.get_next_action('3', ANY_USER).suggested_command == 'pwd'
+
+
+def test_should_forget_the_expired_commands(mocker):
+    datasource = ServerPendingActionsDatasource(ttl=10)
+    mock_time = mocker.patch('time.monotonic', return_value=100)
+    datasource.store_pending_actions('1', actions('ls', 'pwd'), ANY_USER)
+
+    mock_time.return_value = 111
+
+    assert datasource.get_next_action('1', ANY_USER) is None
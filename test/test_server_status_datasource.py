@@ -0,0 +1,67 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import gc
+import tracemalloc
+import weakref
+
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.command_message import State
+
+ANY_USER = 'user'
+
+
+def state(command_id: str, **kwargs) -> State:
+    return State(command_id=command_id, user_name=ANY_USER, **kwargs)
+
+
+def test_should_merge_the_messages_with_the_same_command_id():
+    datasource = ServerStatusDatasource()
+    stored = datasource.store_info(state('1', command='ls'))
+
+    merged = datasource.store_info(state('1', result_code='0'))
+
+    assert merged is stored
+    assert merged.command == 'ls'
+    assert merged.result_code == '0'
+    assert len(datasource.get_last_messages(ANY_USER)) == 1
+
+
+def test_should_forget_the_oldest_messages_after_the_history_depth():
+    datasource = ServerStatusDatasource(history_depth=2)
+    for command_id in ('1', '2', '3'):
+        datasource.store_info(state(command_id, command=command_id))
+
+    assert datasource.find_message_stored('1', ANY_USER) is None
+    assert datasource.find_message_stored('3', ANY_USER).command == '3'
+    assert [message.command_id for message in datasource.get_last_messages(ANY_USER)] == ['2', '3']
+    assert datasource.get_last_message(ANY_USER).command_id == '2'
+
+
+def test_should_keep_the_memory_flat_while_the_commands_are_processed():
+    datasource = ServerStatusDatasource(history_depth=50)
+    alive_states = weakref.WeakSet()
+
+    def process_commands(first_id: int, last_id: int):
+        for command_id in range(first_id, last_id):
+            message = datasource.store_info(state(str(command_id), command='ls', stderr='error' * 20))
+            message.previous_execution = datasource.get_last_message(ANY_USER)
+            alive_states.add(message)
+
+    tracemalloc.start()
+    try:
+        process_commands(0, 10_000)
+        gc.collect()
+        memory_after_warm_up, _ = tracemalloc.get_traced_memory()
+        process_commands(10_000, 100_000)
+        gc.collect()
+        memory_at_the_end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(alive_states) == 50
+    assert memory_at_the_end < memory_after_warm_up * 1.1
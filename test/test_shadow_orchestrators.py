@@ -0,0 +1,105 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import threading
+import time
+
+from test.state_mother import command_state
+from clai.server.agent import Agent
+from clai.server.agent_runner import AgentRunner
+from clai.server.command_message import Action
+from clai.server.orchestration.orchestrator_provider import OrchestratorProvider
+from clai.server.orchestration.patterns.max_orchestrator.max_orchestrator import MaxOrchestrator
+
+
+class ConfidentAgent(Agent):
+    def get_next_action(self, state):
+        return Action(suggested_command="suggested", confidence=0.9)
+
+
+class SlowShadow(MaxOrchestrator):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.transitions = []
+
+    def choose_action(self, command, agent_names, candidate_actions, force_response, pre_post_state):
+        self.release.wait(5)
+        candidate_actions[0].suggested_command = "changed by the shadow"
+        return None
+
+    def record_transition(self, prev_state, current_state_pre):
+        self.transitions.append(current_state_pre.command.command)
+
+
+def create_runner(mocker, shadow_names):
+    agent_datasource = mocker.MagicMock()
+    agent_datasource.get_current_orchestrator.return_value = 'max_orchestrator'
+    agent_datasource.get_shadow_orchestrators.return_value = shadow_names
+    agent_datasource.get_instances.return_value = [ConfidentAgent()]
+
+    orchestrator_provider = OrchestratorProvider(agent_datasource)
+    shadow = SlowShadow()
+    orchestrator_provider.orchestrator_instances['slow_shadow'] = shadow
+    mocker.patch('clai.server.agent_runner.ActionRemoteStorage')
+    return AgentRunner(agent_datasource, orchestrator_provider), shadow
+
+
+def test_should_answer_without_waiting_for_the_shadow_orchestrators(mocker):
+    runner, shadow = create_runner(mocker, ['slow_shadow'])
+
+    start = time.monotonic()
+    action = runner.process(command_state(), False)
+    elapsed = time.monotonic() - start
+    shadow.release.set()
+    runner.orchestrator_storage.shadows.wait()
+
+    assert elapsed < 1
+    assert action.suggested_command == "suggested"
+    stats = runner.orchestrator_storage.shadows.stats['SlowShadow']
+    assert stats.decisions == 1
+    assert stats.agreements == 0
+
+
+def test_should_send_the_transitions_to_the_shadow_orchestrators(mocker):
+    runner, shadow = create_runner(mocker, ['slow_shadow'])
+    shadow.release.set()
+
+    for _ in range(3):
+        runner.process(command_state(), False)
+        runner.process_post(command_state(), False)
+    runner.orchestrator_storage.shadows.wait()
+
+    assert shadow.transitions == ["command", "command"]
+
+
+def test_should_not_shadow_the_active_orchestrator(mocker):
+    runner, shadow = create_runner(mocker, ['max_orchestrator', 'not_an_orchestrator'])
+
+    runner.process(command_state(), False)
+    runner.orchestrator_storage.shadows.wait()
+
+    assert not runner.orchestrator_storage.shadows.stats
+    assert runner.orchestrator_provider.get_shadow_orchestrator_names() == []
+    assert shadow.transitions == []
+
+
+def test_should_read_the_shadow_orchestrators_again_only_on_reload(mocker):
+    runner, shadow = create_runner(mocker, ['slow_shadow'])
+    shadow.release.set()
+    agent_datasource = runner.orchestrator_provider.agent_datasource
+
+    for _ in range(3):
+        runner.process(command_state(), False)
+    runner.orchestrator_storage.shadows.wait()
+    agent_datasource.get_shadow_orchestrators.return_value = []
+    runner.orchestrator_provider.reload_shadow_orchestrators()
+    runner.process(command_state(), False)
+    runner.orchestrator_storage.shadows.wait()
+
+    assert agent_datasource.get_shadow_orchestrators.call_count == 2
+    assert runner.orchestrator_storage.shadows.stats['SlowShadow'].decisions == 3
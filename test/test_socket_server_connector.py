@@ -0,0 +1,52 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import asyncio
+import threading
+import time
+
+from test.test_message_frame import get_free_port
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.command_message import Action, StateDTO
+from clai.server.socket_client_connector import SocketClientConnector
+from clai.server.socket_server_connector import SocketServerConnector
+
+SLOW_COMMAND = 'slow'
+SLOW_TIME = 1
+
+
+def test_should_not_block_other_clients_while_a_message_is_slow():
+    port = get_free_port()
+    server_status = ServerStatusDatasource()
+    server_status.running = True
+    connector = SocketServerConnector(server_status)
+    connector.create_socket('localhost', port)
+
+    async def process_message(received_data: bytes) -> Action:
+        dto = StateDTO.parse_raw(received_data)
+        if dto.command == SLOW_COMMAND:
+            await asyncio.sleep(SLOW_TIME)
+        return Action(origin_command=dto.command, suggested_command=dto.command)
+
+    threading.Thread(target=connector.loop, args=(process_message,), daemon=True).start()
+
+    finished = []
+
+    def send(command):
+        SocketClientConnector('localhost', port).send(StateDTO(command_id=command, user_name='user', command=command))
+        finished.append(command)
+
+    slow_client = threading.Thread(target=send, args=(SLOW_COMMAND,))
+    slow_client.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    send('fast')
+    fast_time = time.monotonic() - start
+    slow_client.join()
+
+    assert fast_time < SLOW_TIME
+    assert finished == ['fast', SLOW_COMMAND]
@@ -0,0 +1,118 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import multiprocessing as mp
+import threading
+import time
+
+import pytest
+
+from clai.datasource.action_remote_storage import ActionRemoteStorage
+from clai.datasource.stats_tracker import StatsTracker
+from clai.datasource.telemetry_dispatcher import TelemetryDispatcher
+from clai.server.command_message import Action, State, TerminalReplayMemory
+
+ANY_USER = 'any_user'
+
+
+@pytest.fixture(name='dispatcher')
+def fixture_dispatcher(mocker):
+    dispatcher = TelemetryDispatcher()
+    mocker.patch('clai.datasource.stats_tracker.telemetry_dispatcher', dispatcher)
+    mocker.patch('clai.datasource.action_remote_storage.telemetry_dispatcher', dispatcher)
+    yield dispatcher
+    dispatcher.close()
+
+
+@pytest.fixture(name='stats_tracker')
+def fixture_stats_tracker(mocker):
+    stats_tracker = StatsTracker()
+    mocker.patch.object(stats_tracker, 'sync', False)
+    mocker.patch.object(stats_tracker, 'report_enable', False)
+    mocker.patch.object(stats_tracker, 'anonymizer')
+    stats_tracker.anonymizer.anonymize.side_effect = lambda user: f'anonymous {user}'
+    return stats_tracker
+
+
+def test_should_deliver_the_events_in_order():
+    dispatcher = TelemetryDispatcher()
+    delivered = []
+
+    for event in range(5):
+        dispatcher.dispatch(delivered.append, event)
+    dispatcher.wait()
+    dispatcher.close()
+
+    assert delivered == [0, 1, 2, 3, 4]
+    assert not dispatcher.running()
+
+
+def test_should_close_without_blocking_and_drain_a_full_queue(mocker):
+    mocker.patch.object(TelemetryDispatcher, 'QUEUE_SIZE', 2)
+    dispatcher = TelemetryDispatcher()
+    started = threading.Event()
+    release = threading.Event()
+    delivered = []
+
+    def slow_sink(event):
+        started.set()
+        release.wait(5)
+        delivered.append(event)
+
+    dispatcher.dispatch(slow_sink, 0)
+    started.wait(5)
+    dispatcher.dispatch(delivered.append, 1)
+    dispatcher.dispatch(delivered.append, 2)
+    start = time.monotonic()
+    dispatcher.close(timeout=0.1)
+    elapsed = time.monotonic() - start
+    release.set()
+    dispatcher.wait()
+
+    assert elapsed < 1
+    assert delivered == [0, 1, 2]
+    assert not dispatcher.running()
+
+
+def test_should_not_start_anything_when_the_report_is_disabled(dispatcher, stats_tracker):
+    remote_storage = ActionRemoteStorage()
+
+    stats_tracker.log_activate_skills(ANY_USER, 'nlc2cmd')
+    remote_storage.store(TerminalReplayMemory(State('1', ANY_USER, 'ls'), [], [], False, Action()))
+
+    assert not dispatcher.running()
+    assert not mp.active_children()
+    stats_tracker.anonymizer.anonymize.assert_not_called()
+
+
+def test_should_send_the_stats_from_the_dispatcher(dispatcher, stats_tracker, mocker):
+    send_event = mocker.patch('clai.datasource.stats_tracker.__send_event__')
+    stats_tracker.report_enable = True
+
+    stats_tracker.log_activate_skills(ANY_USER, 'nlc2cmd')
+    stats_tracker.log_deactivate_skills(ANY_USER, 'nlc2cmd')
+    dispatcher.wait()
+
+    events = [call.args[0] for call in send_event.call_args_list]
+    assert [event.event_type for event in events] == ['activate', 'deactivate']
+    assert events[0].user == f'anonymous {ANY_USER}'
+    assert events[0].data == {'skill': 'nlc2cmd'}
+
+
+def test_should_send_the_replays_from_the_dispatcher(dispatcher, mocker):
+    remote_storage = ActionRemoteStorage()
+    mocker.patch.object(remote_storage, 'report_enable', True)
+    mocker.patch.object(remote_storage, 'uploader')
+    mocker.patch.object(remote_storage, 'anonymizer')
+    remote_storage.anonymizer.anonymize.return_value = 'anonymous'
+
+    remote_storage.store(TerminalReplayMemory(State('1', ANY_USER, 'ls'), ['demo_agent'], [], False, Action()))
+    dispatcher.wait()
+
+    record = remote_storage.uploader.submit.call_args.args[0]
+    assert '"user_name": "anonymous"' in record
+    assert '"command_id": "1"' in record
@@ -0,0 +1,99 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import json
+import time
+
+import pytest
+
+from test.telemetry_endpoint import TelemetryEndpoint
+from clai.datasource.telemetry_uploader import TelemetryUploader
+
+
+@pytest.fixture(name='endpoint')
+def fixture_endpoint():
+    endpoint = TelemetryEndpoint()
+    yield endpoint
+    endpoint.close()
+
+
+def record(index: int) -> str:
+    return json.dumps({'index': index})
+
+
+def test_should_send_the_records_in_batches_through_one_connection(endpoint, tmp_path, mocker):
+    mocker.patch.object(TelemetryUploader, 'BATCH_SIZE', 3)
+    uploader = TelemetryUploader(endpoint.url, str(tmp_path))
+
+    for index in range(7):
+        uploader.submit(record(index))
+    assert uploader.flush(timeout=5)
+    uploader.close()
+
+    assert [len(batch) for batch in endpoint.batches] == [3, 3, 1]
+    assert endpoint.records() == [{'index': index} for index in range(7)]
+    assert len(endpoint.connections) == 1
+
+
+def test_should_send_a_partial_batch_after_the_flush_interval(endpoint, tmp_path, mocker):
+    mocker.patch.object(TelemetryUploader, 'FLUSH_INTERVAL', 0.1)
+    uploader = TelemetryUploader(endpoint.url, str(tmp_path))
+
+    uploader.submit(record(0))
+
+    assert endpoint.received.wait(5)
+    assert endpoint.records() == [{'index': 0}]
+    uploader.close()
+
+
+def test_should_spool_the_batches_while_the_endpoint_is_down(endpoint, tmp_path, mocker):
+    mocker.patch.object(TelemetryUploader, 'BATCH_SIZE', 2)
+    mocker.patch.object(TelemetryUploader, 'BACKOFF_MIN', 0.1)
+    uploader = TelemetryUploader(endpoint.url, str(tmp_path))
+    endpoint.status_code = 503
+
+    for index in range(4):
+        uploader.submit(record(index))
+    uploader.flush(timeout=5)
+
+    assert len(uploader.spooled_files()) == 2
+    assert not endpoint.batches
+
+    endpoint.status_code = 200
+    time.sleep(0.2)
+    uploader.submit(record(4))
+    uploader.flush(timeout=5)
+    uploader.close()
+
+    assert not uploader.spooled_files()
+    assert [item['index'] for item in endpoint.records()] == list(range(5))
+
+
+def test_should_keep_the_spool_under_its_size(tmp_path, mocker):
+    mocker.patch.object(TelemetryUploader, 'BATCH_SIZE', 1)
+    mocker.patch.object(TelemetryUploader, 'MAX_SPOOL_BYTES', 100)
+    uploader = TelemetryUploader('http://127.0.0.1:1/store', str(tmp_path))
+
+    for index in range(10):
+        uploader.submit(record(index))
+    uploader.flush(timeout=5)
+    uploader.close()
+
+    assert sum(len(open(path, 'rb').read()) for path in uploader.spooled_files()) <= 100
+    assert uploader.dropped > 0
+
+
+def test_should_drop_the_oldest_records_when_too_many_are_waiting(tmp_path, mocker):
+    mocker.patch.object(TelemetryUploader, 'MAX_PENDING', 5)
+    mocker.patch.object(TelemetryUploader, 'FLUSH_INTERVAL', 60)
+    uploader = TelemetryUploader('http://127.0.0.1:1/store', str(tmp_path))
+
+    for index in range(8):
+        uploader.submit(record(index))
+
+    assert uploader.dropped == 3
+    uploader.close()
@@ -0,0 +1,39 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import pytest
+
+from test.state_mother import command_state
+from clai.server.command_message import Action, Process, ProcessesValues, TerminalReplayMemory
+
+
+def test_should_keep_the_values_of_the_command_when_the_memory_was_stored():
+    command = command_state()
+    command.processes = ProcessesValues(last_processes=[Process(name='bash')])
+    command.previous_execution = command_state()
+    suggested = Action(suggested_command='ls')
+    candidates = [suggested, [Action(suggested_command='pwd')]]
+
+    memory = TerminalReplayMemory(command, ['agent'], candidates, False, suggested)
+    command.action_suggested = suggested
+    command.mark_as_processed()
+    suggested.execute = True
+
+    assert memory.command.processes is command.processes
+    assert memory.command.previous_execution is None
+    assert memory.command.action_suggested is None
+    assert not memory.command.already_processed
+    assert not memory.suggested_command.execute
+    assert not memory.candidate_actions[0].execute
+    assert memory.candidate_actions[1][0].suggested_command == 'pwd'
+
+
+def test_should_not_allow_to_change_the_stored_command():
+    memory = TerminalReplayMemory(command_state(), [], None, False, None)
+
+    with pytest.raises(AttributeError):
+        memory.command.command = 'rm'
@@ -0,0 +1,200 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import pytest
+
+from test.test_message_frame import get_free_port
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.agent import Agent
+from clai.server.agent_executor import ThreadExecutor
+from clai.server.command_message import Action, ClientSpan, State, StateDTO
+from clai.server.command_runner.clai_last_info_command_runner import ClaiLastInfoCommandRunner
+from clai.server.socket_client_connector import SocketClientConnector
+from clai.server.socket_server_connector import SocketServerConnector
+from clai.server.tracer import Tracer, trace_id_of
+
+ANY_USER = 'any_user'
+
+
+class TracedAgent(Agent):
+    def get_next_action(self, state: State) -> Action:
+        return Action(suggested_command='ls')
+
+
+@pytest.fixture(name='tracer')
+def fixture_tracer(tmp_path, mocker):
+    tracer = Tracer(path=str(tmp_path / 'traces.jsonl'), enabled=True)
+    mocker.patch('clai.server.agent_executor.tracer', tracer)
+    yield tracer
+    tracer.close()
+
+
+def read_spans(tracer):
+    tracer.flush()
+    with open(tracer.path) as trace_file:
+        return [json.loads(line) for line in trace_file]
+
+
+def trace_command(tracer, command_id, command='ls', user_name=ANY_USER):
+    with tracer.span('server.command'):
+        tracer.set_command(command_id, user_name=user_name, command=command)
+        with tracer.span('process_message'):
+            pass
+
+
+def test_should_write_the_spans_of_a_command_in_the_same_trace(tracer):
+    command_id = str(uuid.uuid4())
+
+    with tracer.span('server.command'):
+        with tracer.span('serialize_message'):
+            pass
+        tracer.set_command(command_id, user_name=ANY_USER)
+        with tracer.span('process_message'):
+            with tracer.span('choose_action'):
+                pass
+
+    spans = {span['name']: span for span in read_spans(tracer)}
+    assert set(spans) == {'server.command', 'serialize_message', 'process_message', 'choose_action'}
+    assert {span['trace_id'] for span in spans.values()} == {uuid.UUID(command_id).hex}
+    assert spans['server.command']['parent_span_id'] is None
+    assert spans['serialize_message']['parent_span_id'] == spans['server.command']['span_id']
+    assert spans['choose_action']['parent_span_id'] == spans['process_message']['span_id']
+    assert spans['server.command']['attributes'] == {'command_id': command_id, 'user_name': ANY_USER}
+    assert all(span['end_time_unix_nano'] >= span['start_time_unix_nano'] for span in spans.values())
+
+
+def test_should_mark_the_span_of_an_error(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span('server.command'):
+            raise ValueError('wrong frame')
+
+    [span] = read_spans(tracer)
+    assert span['status']['code'] == 'ERROR'
+    assert 'wrong frame' in span['status']['message']
+
+
+def test_should_trace_the_agents_in_the_executor_threads(tracer):
+    agent = TracedAgent()
+    agent.agent_name = 'traced_agent'
+
+    with tracer.span('server.command'):
+        ThreadExecutor().execute_agents(State(command_id='1', user_name=ANY_USER, command='ls'), [agent])
+
+    spans = {span['name']: span for span in read_spans(tracer)}
+    assert spans['agent.execute']['parent_span_id'] == spans['server.command']['span_id']
+    assert spans['agent.execute']['attributes'] == {'agent': 'traced_agent'}
+
+
+def test_should_not_make_the_detached_spans_current(tracer):
+    with tracer.detached_span('server.command') as command_span:
+        assert tracer.current_span() is None
+        with tracer.activate(command_span):
+            with tracer.span('process_message'):
+                pass
+        assert tracer.current_span() is None
+        with tracer.detached_span('response.write', parent=command_span):
+            pass
+
+    spans = {span['name']: span for span in read_spans(tracer)}
+    assert spans['process_message']['parent_span_id'] == spans['server.command']['span_id']
+    assert spans['response.write']['parent_span_id'] == spans['server.command']['span_id']
+
+
+def test_should_add_the_spans_sent_by_the_client_to_the_trace_of_the_command(tracer):
+    command_id = str(uuid.uuid4())
+    client_spans = [
+        ClientSpan(name='client.prepare', start_time_unix_nano=100, end_time_unix_nano=400),
+        ClientSpan(name='client.connect', start_time_unix_nano=100, end_time_unix_nano=300, parent='client.prepare')]
+
+    with tracer.span('server.command'):
+        tracer.set_command(command_id, user_name=ANY_USER)
+        tracer.add_client_spans(client_spans)
+
+    spans = {span['name']: span for span in read_spans(tracer)}
+    assert {span['trace_id'] for span in spans.values()} == {uuid.UUID(command_id).hex}
+    assert spans['client.prepare']['parent_span_id'] is None
+    assert spans['client.connect']['parent_span_id'] == spans['client.prepare']['span_id']
+    assert spans['client.connect']['end_time_unix_nano'] - spans['client.connect']['start_time_unix_nano'] == 200
+
+
+def test_should_keep_apart_the_traces_of_the_commands_served_at_the_same_time(tracer, mocker):
+    mocker.patch('clai.server.socket_server_connector.tracer', tracer)
+    port = get_free_port()
+    server_status = ServerStatusDatasource()
+    server_status.running = True
+    connector = SocketServerConnector(server_status)
+    connector.create_socket('localhost', port)
+
+    async def answer(dto: StateDTO) -> Action:
+        await asyncio.sleep(0.5 if dto.command == 'slow' else 0)
+        return Action(origin_command=dto.command)
+
+    def process_message(received_data: bytes):
+        dto = StateDTO.parse_raw(received_data)
+        tracer.set_command(dto.command_id, user_name=dto.user_name, command=dto.command)
+        tracer.add_client_spans(dto.client_spans)
+        return answer(dto)
+
+    threading.Thread(target=connector.loop, args=(process_message,), daemon=True).start()
+    command_ids = {command: str(uuid.uuid4()) for command in ['slow', 'fast']}
+
+    def send(command):
+        SocketClientConnector('localhost', port).send(
+            StateDTO(command_id=command_ids[command], user_name=ANY_USER, command=command))
+
+    slow_client = threading.Thread(target=send, args=('slow',))
+    slow_client.start()
+    time.sleep(0.1)
+    send('fast')
+    slow_client.join()
+
+    for command, command_id in command_ids.items():
+        [trace] = tracer.recent_traces(2, exclude_command_id=command_ids['fast' if command == 'slow' else 'slow'])
+        assert sorted(span['name'] for span in trace) == ['client.connect', 'client.prepare', 'response.write',
+                                                          'server.command']
+        assert {span['trace_id'] for span in trace} == {uuid.UUID(command_id).hex}
+
+
+def test_should_not_write_anything_when_disabled(tmp_path):
+    tracer = Tracer(path=str(tmp_path / 'traces.jsonl'), enabled=False)
+
+    with tracer.span('server.command') as span:
+        tracer.set_command('1')
+
+    assert span is None
+    assert not (tmp_path / 'traces.jsonl').exists()
+
+
+def test_should_show_the_timing_of_the_last_commands_of_the_user(tracer):
+    first, second, other_user, current = (str(uuid.uuid4()) for _ in range(4))
+    trace_command(tracer, first, command='ls')
+    trace_command(tracer, second, command='pwd')
+    trace_command(tracer, other_user, command='whoami', user_name='other_user')
+    trace_command(tracer, current, command='clai last-info timing 5')
+    runner = ClaiLastInfoCommandRunner(None, tracer=tracer)
+
+    action = runner.execute_post(State(command_id=current, user_name=ANY_USER, command='clai last-info timing 5'))
+
+    lines = action.description.splitlines()
+    assert lines[0] == f'ls ({first})'
+    assert lines[1].startswith('  server.command: ')
+    assert lines[2].startswith('    process_message: ')
+    assert f'pwd ({second})' in lines
+    assert not [line for line in lines if 'whoami' in line or 'last-info' in line]
+
+
+def test_should_use_the_command_id_as_trace_id():
+    command_id = str(uuid.uuid4())
+
+    assert trace_id_of(command_id) == command_id.replace('-', '')
+    assert len(trace_id_of('4')) == 32
@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+import stat
+import threading
+
+from test.test_message_frame import get_free_port
+from clai.datasource.server_status_datasource import ServerStatusDatasource
+from clai.server.clai_client import ClaiClient
+from clai.server.command_message import Action, StateDTO
+from clai.server.unix_socket_client_connector import UnixSocketClientConnector
+from clai.server.unix_socket_server_connector import UnixSocketServerConnector
+
+
+def echo_command(received_data: bytes) -> Action:
+    dto = StateDTO.parse_raw(received_data)
+    return Action(origin_command=dto.command, suggested_command=dto.command_id)
+
+
+def test_should_answer_through_the_unix_socket_only_accessible_by_the_owner(tmp_path):
+    socket_path = str(tmp_path / 'clai.sock')
+    server_status = ServerStatusDatasource()
+    server_status.running = True
+    connector = UnixSocketServerConnector(server_status, socket_path=socket_path)
+    connector.create_socket('localhost', get_free_port())
+    threading.Thread(target=connector.loop, args=(echo_command,), daemon=True).start()
+
+    # an unreachable port proves the message went through the unix socket
+    action = UnixSocketClientConnector(socket_path, 'localhost', 1).send(
+        StateDTO(command_id='1', user_name='user', command='ls'))
+
+    assert action.suggested_command == '1'
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_should_use_the_server_unix_socket_when_it_exists(tmp_path, mocker):
+    socket_path = tmp_path / 'clai.sock'
+    socket_path.touch()
+    mocker.patch('clai.server.clai_client.RELAY_SOCKET_PATH', None)
+    mocker.patch('clai.server.clai_client.SERVER_SOCKET_PATH', str(socket_path))
+
+    clai_client = ClaiClient()
+
+    assert isinstance(clai_client.connector, UnixSocketClientConnector)
+    assert clai_client.connector.socket_path == str(socket_path)
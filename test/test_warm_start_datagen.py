@@ -0,0 +1,66 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import numpy as np
+
+from clai.server.orchestration.patterns.rltk_bandit_orchestrator import warm_start_datagen
+
+N_POINTS = 200
+CONTEXT_SIZE = 4
+
+
+def test_should_reward_only_the_noop_arm():
+    np.random.seed(1)
+    tids, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
+        'noop-always', n_points=N_POINTS, context_size=CONTEXT_SIZE, noop_position=0)
+
+    assert len(tids) == len(arm_rewards) == N_POINTS
+    assert contexts.shape == (N_POINTS, CONTEXT_SIZE)
+    assert all(reward == (1.0 if arm == 0 else -1.0) for arm, reward in arm_rewards)
+
+
+def test_should_reward_only_the_arm_with_the_max_confidence():
+    np.random.seed(1)
+    _, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
+        'max-orchestrator', n_points=N_POINTS, context_size=CONTEXT_SIZE)
+
+    for context, (arm, reward) in zip(contexts, arm_rewards):
+        assert reward == (1.0 if arm == np.argmax(context) else -1.0)
+
+
+def test_should_never_reward_the_ignored_skill():
+    np.random.seed(1)
+    _, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
+        'ignore-skill', n_points=N_POINTS, context_size=CONTEXT_SIZE, skill_idx=2)
+
+    for context, (arm, reward) in zip(contexts, arm_rewards):
+        if arm == 2:
+            assert reward == -1.0
+        else:
+            assert reward == 1.0
+            assert arm in np.argsort(context)[-2:]
+
+
+def test_should_only_penalize_the_disadvantaged_skill():
+    np.random.seed(1)
+    _, contexts, arm_rewards = warm_start_datagen.get_warmstart_data(
+        'preferred-skill', n_points=N_POINTS, context_size=CONTEXT_SIZE,
+        advantage_skillidx=1, disadvantage_skillidx=3)
+
+    assert contexts.shape == (N_POINTS, CONTEXT_SIZE)
+    assert all(reward == (-1.0 if arm == 3 else 1.0) for arm, reward in arm_rewards)
+
+
+def test_should_generate_the_same_data_with_the_same_seed():
+    np.random.seed(7)
+    first = warm_start_datagen.get_warmstart_data('max-orchestrator', n_points=N_POINTS, context_size=CONTEXT_SIZE)
+    np.random.seed(7)
+    second = warm_start_datagen.get_warmstart_data('max-orchestrator', n_points=N_POINTS, context_size=CONTEXT_SIZE)
+
+    assert first[0] == second[0]
+    assert np.array_equal(first[1], second[1])
+    assert first[2] == second[2]
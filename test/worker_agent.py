@@ -0,0 +1,31 @@
+#
+# Copyright (C) 2020 IBM. All Rights Reserved.
+#
+# See LICENSE.txt file in the root directory
+# of this source tree for licensing information.
+#
+
+import os
+
+from clai.server.agent import Agent
+from clai.server.command_message import Action, State
+
+
+class WorkerAgent(Agent):
+    def __init__(self):
+        super().__init__()
+        self.executions = 0
+
+    def get_agent_state(self) -> dict:
+        return {'executions': self.executions}
+
+    def get_next_action(self, state: State) -> Action:
+        self.executions += 1
+        if state.command == 'crash':
+            os._exit(1)  # pylint: disable=protected-access
+        if state.command == 'many':
+            return [Action(suggested_command='first'), Action(suggested_command='second')]
+
+        print('skills can print without breaking the protocol')
+        return Action(suggested_command=state.command, description=str(os.getpid()),
+                      origin_command=state.previous_execution.command if state.previous_execution else None)